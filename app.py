@@ -1,17 +1,24 @@
-import os
-import json
+import time
+import threading
 import warnings
 import streamlit as st
+from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
 from dotenv import load_dotenv
 from utils.logger import get_logger
+from utils.executor import StageExecutor
+from utils.metrics import start_metrics_server
+from utils.manifest import SiteManifest
+from utils.artifacts import get_artifact_store, site_key
+from utils.vector_index import VectorIndex
+from utils.workspace_pool import get_workspace_pool
 from utils.scraper import (
-    fetch_and_summarize_content,
+    scrape_website,
+    summarize_website,
     save_summary_markdown,
 )
 from utils.ibm_waston import (
-    list_workspaces,
-    delete_workspace,
-    create_workspace,
+    reuse_or_create_workspace,
+    load_predefined_intents_and_actions,
     get_intents_and_actions,
     generate_intents_and_actions,
     save_workspace_json,
@@ -24,86 +31,255 @@ load_dotenv()
 # Initialize the logger
 log = get_logger(__name__)
 
+# Expose Prometheus metrics if METRICS_PORT is set; started once per process
+start_metrics_server()
+
 warnings.filterwarnings("ignore")
 
 
-def display_summary(summary, title):
+def display_summary(summary, title, url=None):
     """
     Display the summarized content and title in a collapsible bordered section.
+
+    Args:
+        summary (str or generator): The summary, or a stream of summary text pieces
+            that is rendered progressively as it arrives.
+        title (str): The website title.
+        url (str): The website URL, which keys the saved summary.
+
+    Returns:
+        str: The complete summary text, or None if the stream failed.
     """
-    st.success("Website content summarized successfully!")
+    status = st.empty()
     with st.expander(f"📄 Summary of {title}", expanded=True):
-        st.markdown(summary)
+        if isinstance(summary, str):
+            st.markdown(summary)
+        else:
+            try:
+                summary = st.write_stream(summary)
+            except Exception as e:
+                # A summary cut off mid-stream must not be saved or built upon
+                log.error(f"Summary stream failed: {e}")
+                status.error("The summary was interrupted before it was complete.")
+                return None
+
+    if not summary:
+        return None
+
+    status.success("Website content summarized successfully!")
 
     # Save the summary to a markdown file
-    save_summary_markdown(summary, title)
+    save_summary_markdown(summary, title, url=url)
+    return summary
 
 
-def show_workspace_download_buttons(workspace_name):
+def show_workspace_download_buttons(workspace_name, url=None):
     """
     Display the download buttons for markdown and JSON files after workspace is selected.
 
+    The files are served from the artifact store's in-memory bytes, without
+    reading or parsing them again.
+
     Args:
         workspace_name (str): The selected workspace name.
+        url (str): The website URL, which keys the saved files.
     """
-    filename = f"{workspace_name.lower().replace(' ', '')}_assistant"
-    markdown_file_path = os.path.join("samples", "output", f"{filename}.md")
-    json_file_path = os.path.join("samples", "output", f"{filename}.json")
-
-    # Display download buttons if the markdown and JSON files exist
-    if os.path.exists(markdown_file_path):
-        with open(markdown_file_path, "r", encoding="utf-8") as f:
-            markdown_content = f.read()
-        st.download_button(
-            label="📄 Download Markdown",
-            data=markdown_content,
-            file_name=f"{filename}.md",
-            mime="text/markdown",
-        )
-
-    if os.path.exists(json_file_path):
-        with open(json_file_path, "r", encoding="utf-8") as f:
-            json_content = json.load(f)
-        st.download_button(
-            label="📦 Download Watson Assistant JSON",
-            data=json.dumps(json_content, indent=2),
-            file_name=f"{filename}.json",
-            mime="application/json",
-        )
+    store = get_artifact_store()
+    site = site_key(workspace_name, url)
+    buttons = {
+        "summary": "📄 Download Markdown",
+        "assistant": "📦 Download Watson Assistant JSON",
+    }
+    for kind, label in buttons.items():
+        artifact = store.get(site, kind)
+        if artifact is not None:
+            st.download_button(
+                label=label,
+                data=artifact.data,
+                file_name=artifact.file_name,
+                mime=artifact.mime,
+            )
 
 
 def manage_delete_workspace():
     """
     Manage workspace deletion if the maximum workspace limit is exceeded.
+
+    The workspace pool normally recycles workspaces before the limit is hit; this
+    covers workspaces created outside the app, by recycling the least recently
+    updated workspace the app built.
     """
     try:
-        workspaces = list_workspaces()
-
-        if workspaces:
-            sorted_workspaces = sorted(workspaces, key=lambda ws: ws.get("created", ""))
-
-            # Get the Latest workspace (first in sorted list)
-            oldest_workspace = sorted_workspaces[4]
-            selected_workspace_id = oldest_workspace["id"]
-            selected_workspace_name = oldest_workspace["name"]
-
-            with st.spinner(f"Deleting workspace: {selected_workspace_name}..."):
-                try:
-                    delete_workspace(selected_workspace_id)
-                    st.success(
-                        f"Latest workspace '{selected_workspace_name}' deleted successfully!"
-                    )
-                    st.rerun()
-                except Exception as e:
-                    log.error(f"Failed to delete workspace: {e}")
-                    st.error(
-                        f"An error occurred while deleting the workspace '{selected_workspace_name}'."
-                    )
+        with st.spinner("Recycling the least recently used workspace..."):
+            recycled = get_workspace_pool().recycle()
+
+        if recycled:
+            st.success(f"Workspace '{recycled['name']}' deleted successfully!")
+            st.rerun()
+        else:
+            st.error(
+                "No workspace built by this app can be deleted. "
+                "Please delete a workspace in Watson Assistant and try again."
+            )
     except Exception as e:
         log.error(f"Error in managing workspace deletion: {e}")
         st.error("An error occurred while trying to manage workspace deletion.")
 
 
+def attach_script_run_context():
+    """
+    Return a thread initializer that lets pipeline stages running in background
+    threads report errors to the current Streamlit session.
+    """
+    ctx = get_script_run_ctx()
+    return lambda: add_script_run_ctx(threading.current_thread(), ctx)
+
+
+def build_assistant(url, stages):
+    """
+    Build the assistant for a website, showing each step's progress.
+
+    Independent stages run in the background as soon as their inputs exist: the
+    intent/action templates load at once, and the workspace is created as soon as
+    the start page has given the website title, while the rest of the site is
+    still being crawled. If the site was built before, its workspace may be
+    reused, which is only known once the crawl has found whether the site
+    changed, so the workspace then waits for the crawl.
+
+    Args:
+        url (str): The website URL.
+        stages (StageExecutor): The executor running the background stages.
+    """
+    # Load the record of the website's previous build, if any
+    manifest = SiteManifest.load(url)
+    index = VectorIndex()
+
+    def previous_build(crawl):
+        # Reuse the previous intents, actions and workspace if nothing changed
+        return manifest.load_intents_and_actions() if manifest.unchanged else None
+
+    def crawl():
+        try:
+            pages, title = scrape_website(
+                url,
+                manifest=manifest,
+                index=index,
+                on_title=lambda title: stages.provide("title", title),
+            )
+        except Exception as e:
+            stages.fail("title", e)
+            raise
+        if not pages:
+            stages.fail("title", ValueError("No website content to build a workspace for."))
+        return pages, title
+
+    def workspace(title, previous=None):
+        return reuse_or_create_workspace(
+            title,
+            f"I'm an IBM Watson Assistant for {title}",
+            workspace_id=manifest.workspace_id if previous else None,
+        )
+
+    def intents(summary, templates, previous):
+        return previous or get_intents_and_actions(
+            summary, templates=templates, index=index
+        )
+
+    def upload(workspace, intents):
+        workspace_id, reused = workspace
+        if reused:
+            return []
+        return generate_intents_and_actions(
+            intents=intents[0], actions=intents[1], workspace_id=workspace_id
+        )
+
+    stages.submit("templates", load_predefined_intents_and_actions)
+    stages.submit("crawl", crawl)
+    stages.submit("previous_build", previous_build, deps=["crawl"])
+    stages.submit(
+        "workspace",
+        workspace,
+        deps=["title", "previous_build"] if manifest.workspace_id else ["title"],
+    )
+    stages.submit(
+        "intents", intents, deps=["summary", "templates", "previous_build"]
+    )
+    stages.submit("upload", upload, deps=["workspace", "intents"])
+
+    # Step 2: Fetch and summarize website content
+    st.markdown("### Step 2: 📑 Summarize Website Content")
+    with st.spinner("Fetching website content..."):
+        pages, title = stages.result("crawl")
+
+    with pages:
+        if not pages:
+            st.error(
+                "Unable to fetch website content. Please check the URL and try again."
+            )
+            return
+
+        started = time.perf_counter()
+        with st.spinner("Summarizing website content..."):
+            summary = summarize_website(url, pages, manifest=manifest, stream=True)
+
+    if summary:
+        summary = display_summary(summary, title, url=url)
+
+    if not summary:
+        st.error(
+            "Unable to summarize website content. Please check the URL and try again."
+        )
+        return
+
+    stages.provide("summary", summary, seconds=time.perf_counter() - started)
+
+    # Step 3: Create a Watson Assistant workspace
+    st.markdown("### Step 3: 🛠️ Initialize Watson Assistant Workspace")
+    description = f"I'm an IBM Watson Assistant for {title}"
+    with st.spinner("Creating a Watson Assistant workspace..."):
+        workspace_id, reused_workspace = stages.result("workspace")
+
+    if reused_workspace:
+        st.success(f"No changes since the last build, reusing workspace: **{title}**")
+    else:
+        st.success(f"Workspace created successfully: **{title}**")
+
+    # Step 4: Generate intents and actions
+    st.markdown("### Step 4: 🤖 Generate Intents and Actions")
+    with st.spinner("Generating intents and actions..."):
+        intents, actions = stages.result("intents")
+        upload_errors = stages.result("upload")
+
+    if reused_workspace:
+        st.success("Intents and actions are up to date.")
+    elif upload_errors:
+        st.warning(
+            "Some intents and actions could not be uploaded: "
+            + ", ".join(name for name, _ in upload_errors)
+        )
+    else:
+        st.success("Intents and actions generated successfully!")
+
+    # Step 5: Generate the Watson Assistant JSON
+    st.markdown("### Step 5: 📦 Generate Watson Assistant JSON")
+    with st.spinner("Generating JSON structure..."):
+        assistant_json = generate_watson_workspace_json(
+            intents=intents,
+            actions=actions,
+            workspace_name=title,
+            workspace_description=description,
+        )
+
+    # Step 6: Save and provide download link for the Watson Assistant JSON
+    save_workspace_json(data=assistant_json, filename=title, url=url)
+
+    # Record the successful build for incremental re-runs
+    manifest.save(title=title, workspace_id=workspace_id)
+
+    # Show action buttons
+    show_workspace_download_buttons(workspace_name=title, url=url)
+
+
 def main():
     """
     Main function for running the Streamlit app to scrape and summarize website content,
@@ -125,62 +301,29 @@ def main():
         unsafe_allow_html=True,
     )
 
+    # Start pre-creating a workspace while the user enters the URL
+    get_workspace_pool()
+
     # Step 1: User input for website URL
     st.markdown("### Step 1: 🌐 Enter Website URL")
     url = st.text_input("Enter the URL of your website:")
 
     if url:
         try:
-            # Step 2: Fetch and summarize website content
-            st.markdown("### Step 2: 📑 Summarize Website Content")
-            with st.spinner("Fetching and summarizing website content..."):
-                summary, title = fetch_and_summarize_content(url)
-
-            if not summary:
-                st.error(
-                    "Unable to summarize website content. Please check the URL and try again."
-                )
-                return
-
-            display_summary(summary, title)
-
-            # Step 3: Create a Watson Assistant workspace
-            st.markdown("### Step 3: 🛠️ Initialize Watson Assistant Workspace")
-            description = f"I'm an IBM Watson Assistant for {title}"
-            with st.spinner("Creating a Watson Assistant workspace..."):
-                workspace_id = create_workspace(title, description)
-
-            st.success(f"Workspace created successfully: **{title}**")
-
-            # Step 4: Generate intents and actions
-            st.markdown("### Step 4: 🤖 Generate Intents and Actions")
-            with st.spinner("Generating intents and actions..."):
-                intents, actions = get_intents_and_actions(summary)
-                generate_intents_and_actions(
-                    intents=intents, actions=actions, workspace_id=workspace_id
-                )
-
-            st.success("Intents and actions generated successfully!")
-
-            # Step 5: Generate the Watson Assistant JSON
-            st.markdown("### Step 5: 📦 Generate Watson Assistant JSON")
-            with st.spinner("Generating JSON structure..."):
-                assistant_json = generate_watson_workspace_json(
-                    intents=intents,
-                    actions=actions,
-                    workspace_name=title,
-                    workspace_description=description,
+            with StageExecutor(initializer=attach_script_run_context()) as stages:
+                build_assistant(url, stages)
+
+            # Show how long each pipeline stage took
+            st.caption(
+                "⏱️ "
+                + " · ".join(
+                    f"{name}: {seconds:.1f}s" for name, seconds in stages.timings.items()
                 )
-
-            # Step 6: Save and provide download link for the Watson Assistant JSON
-            save_workspace_json(data=assistant_json, filename=title)
-
-            # Show action buttons
-            show_workspace_download_buttons(workspace_name=title)
+            )
 
         except Exception as e:
             log.error(f"An error occurred: {e}")
-            st.error(e.message)
+            st.error(getattr(e, "message", str(e)))
 
             # Check if maximum workspaces limit exceeded
             if "Maximum workspaces limit exceeded" in str(e):
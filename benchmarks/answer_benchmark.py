@@ -0,0 +1,98 @@
+"""
+Measure the throughput and latency of the local answer engine on the sample
+intents in samples/intents and actions in samples/actions.
+
+Queries are the intent examples with their words shuffled, so they never match
+an example exactly. The engine is measured in-process and through its HTTP
+endpoint over a keep-alive connection.
+
+Usage:
+    python -m benchmarks.answer_benchmark --queries 20000
+"""
+
+import random
+import argparse
+import logging
+import time
+import requests
+from utils.answer_engine import AnswerEngine, serve
+from utils.ibm_waston import (
+    load_predefined_intents_and_actions,
+    generate_watson_workspace_json,
+)
+
+
+def make_queries(workspace: dict, count: int) -> list:
+    """
+    Build `count` queries by shuffling the words of the workspace's examples.
+    """
+    rng = random.Random(0)
+    examples = [
+        example["text"]
+        for intent in workspace["intents"]
+        for example in intent.get("examples", [])
+    ]
+    queries = []
+    for _ in range(count):
+        words = rng.choice(examples).split()
+        rng.shuffle(words)
+        queries.append(" ".join(words))
+    return queries
+
+
+def report(name: str, latencies: list, elapsed: float):
+    latencies = sorted(latencies)
+    p50 = latencies[len(latencies) // 2] * 1000
+    p99 = latencies[int(len(latencies) * 0.99)] * 1000
+    print(
+        f"{name:>10} {len(latencies):>8} {len(latencies) / elapsed:>10.0f} "
+        f"{p50:>8.3f} {p99:>8.3f}"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--queries", type=int, default=20000)
+    parser.add_argument("--http-queries", type=int, default=2000)
+    args = parser.parse_args()
+
+    logging.getLogger("utils.answer_engine").setLevel(logging.WARNING)
+
+    intents, actions = load_predefined_intents_and_actions()
+    workspace = generate_watson_workspace_json(
+        intents=intents,
+        actions=actions,
+        workspace_name="benchmark",
+        workspace_description="Sample intents",
+    )
+    engine = AnswerEngine(workspace)
+    queries = make_queries(workspace, args.queries)
+
+    print(f"{'mode':>10} {'queries':>8} {'queries/s':>10} {'p50 ms':>8} {'p99 ms':>8}")
+
+    latencies = []
+    started = time.perf_counter()
+    for query in queries:
+        begin = time.perf_counter()
+        engine.answer(query)
+        latencies.append(time.perf_counter() - begin)
+    report("in-process", latencies, time.perf_counter() - started)
+
+    server = serve(engine, port=0)
+    url = f"http://127.0.0.1:{server.server_address[1]}/message"
+    try:
+        with requests.Session() as session:
+            latencies = []
+            started = time.perf_counter()
+            for query in queries[: args.http_queries]:
+                begin = time.perf_counter()
+                session.post(url, json={"text": query}).raise_for_status()
+                latencies.append(time.perf_counter() - begin)
+            report("http", latencies, time.perf_counter() - started)
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
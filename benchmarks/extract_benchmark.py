@@ -0,0 +1,62 @@
+"""
+Compare the HTML extractors on a corpus of saved HTML pages.
+
+For each installed extractor, reports the parse time per page and the content
+kept after removing boilerplate regions and blocks repeated across pages.
+
+Usage:
+    python -m benchmarks.extract_benchmark --fixtures benchmarks/fixtures --repeat 200
+"""
+
+import os
+import glob
+import time
+import argparse
+from utils.extractor import EXTRACTORS, BoilerplateFilter, _available
+
+FIXTURES_DIR = os.path.join(os.path.dirname(__file__), "fixtures")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--fixtures", default=FIXTURES_DIR)
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    pages = []
+    for path in sorted(glob.glob(os.path.join(args.fixtures, "*.html"))):
+        with open(path, "rb") as f:
+            pages.append((f"https://example.com/{os.path.basename(path)}", f.read()))
+
+    html_bytes = sum(len(html) for _, html in pages)
+    print(f"{len(pages)} pages, {html_bytes} bytes of HTML\n")
+    print(
+        f"{'extractor':<11} {'ms/page':>8} {'speedup':>8} {'links':>6} "
+        f"{'text bytes':>11} {'after dedup':>12}"
+    )
+
+    baseline = None
+    for name in reversed(list(EXTRACTORS)):
+        if not _available(name):
+            continue
+        extract = EXTRACTORS[name]
+
+        started = time.perf_counter()
+        for _ in range(args.repeat):
+            results = [extract(html, url) for url, html in pages]
+        per_page = (time.perf_counter() - started) / (args.repeat * len(pages)) * 1000
+        baseline = baseline or per_page
+
+        boilerplate = BoilerplateFilter()
+        text_bytes = sum(len(" ".join(r.blocks)) for r in results)
+        kept_bytes = sum(len(" ".join(boilerplate.filter(r.blocks))) for r in results)
+        links = sum(len(r.links) for r in results)
+
+        print(
+            f"{name:<11} {per_page:>8.3f} {baseline / per_page:>7.1f}x {links:>6} "
+            f"{text_bytes:>11} {kept_bytes:>12}"
+        )
+
+
+if __name__ == "__main__":
+    main()
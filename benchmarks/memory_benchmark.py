@@ -0,0 +1,80 @@
+"""
+Measure the peak memory of crawling a large local synthetic website and chunking
+its content for summarization.
+
+Two strategies are compared on the same site: collecting every page and joining
+them into one aggregated string, and streaming pages through a disk spool that
+the summarization chunker reads lazily. No LLM calls are made.
+
+Usage:
+    python -m benchmarks.memory_benchmark --pages 10000
+"""
+
+import os
+import argparse
+import logging
+import tempfile
+import time
+import tracemalloc
+
+# Keep benchmark responses out of the real HTTP cache
+os.environ.setdefault("HTTP_CACHE_DIR", tempfile.mkdtemp())
+
+from benchmarks.site import serve_synthetic_site
+from utils.crawler import CrawlConfig, crawl
+from utils.http_client import get_cache
+from utils.scraper import scrape_website
+from utils.summarizer import chunk_texts, iter_chunks, split_pages
+
+
+def aggregated(url: str, config: CrawlConfig) -> int:
+    """
+    Crawl into a list of pages, join them into one string and chunk it.
+    """
+    pages = crawl(url, config)
+    content = "".join(f"Title: {page.title}\n{page.text}\n\n" for page in pages)
+    return len(chunk_texts(split_pages(content)))
+
+
+def streamed(url: str, config: CrawlConfig) -> int:
+    """
+    Crawl into a spool and chunk the spooled pages lazily.
+    """
+    with scrape_website(url, config)[0] as pages:
+        texts = (f"Title: {page.title}\n{page.text}" for page in pages)
+        return sum(1 for _ in iter_chunks(texts))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--pages", type=int, default=10000)
+    parser.add_argument("--links", type=int, default=5)
+    parser.add_argument("--concurrency", type=int, default=16)
+    args = parser.parse_args()
+
+    # Per-page logging would dominate the measurement
+    for name in ("utils.crawler", "utils.scraper", "utils.manifest"):
+        logging.getLogger(name).setLevel(logging.WARNING)
+
+    config = CrawlConfig(
+        max_pages=args.pages,
+        max_depth=args.pages,
+        concurrency=args.concurrency,
+        per_host_concurrency=args.concurrency,
+    )
+
+    with serve_synthetic_site(args.pages, args.links, latency=0) as url:
+        print(f"{'strategy':>10} {'chunks':>7} {'seconds':>8} {'peak MiB':>9}")
+        for name, run in (("aggregated", aggregated), ("streamed", streamed)):
+            get_cache().clear()
+            tracemalloc.start()
+            started = time.perf_counter()
+            chunks = run(url, config)
+            elapsed = time.perf_counter() - started
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            print(f"{name:>10} {chunks:>7} {elapsed:>8.2f} {peak / 2**20:>9.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+import hashlib
+import random
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Words used to generate distinct text for every synthetic page
+VOCABULARY = (
+    "about services careers contact support company history mission values team "
+    "product pricing customers partners office location hours email phone address "
+    "founded growth clients projects solutions consulting training delivery quality"
+).split()
+
+
+def render_page(index: int, num_pages: int, links_per_page: int) -> bytes:
+    """
+    Render a synthetic HTML page linking to a deterministic set of other pages.
+    """
+    rng = random.Random(index)
+    targets = {(index + 1) % num_pages}
+    while len(targets) < min(links_per_page, num_pages):
+        targets.add(rng.randrange(num_pages))
+
+    links = "".join(f'<a href="/page/{target}">Page {target}</a>' for target in targets)
+    paragraphs = "".join(
+        "<p>" + " ".join(rng.choice(VOCABULARY) for _ in range(40)) + "</p>"
+        for _ in range(5)
+    )
+    return (
+        f"<html><head><title>Page {index}</title></head>"
+        f"<body><nav>{links}</nav>{paragraphs}</body></html>"
+    ).encode("utf-8")
+
+
+@contextmanager
+def serve_synthetic_site(num_pages: int = 200, links_per_page: int = 5, latency=0.02):
+    """
+    Serve a synthetic website on localhost as a stand-in for a customer site.
+
+    Args:
+        num_pages (int): The number of pages on the site.
+        links_per_page (int): The number of outgoing links per page.
+        latency (float): Artificial per-request server latency, in seconds.
+
+    Yields:
+        str: The URL of the site's home page.
+    """
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            time.sleep(latency)
+            if self.path in ("/", "/page/0"):
+                index = 0
+            elif self.path.startswith("/page/"):
+                index = int(self.path.rsplit("/", 1)[-1])
+            else:
+                self.send_error(404)
+                return
+
+            if index >= num_pages:
+                self.send_error(404)
+                return
+
+            body = render_page(index, num_pages, links_per_page)
+            etag = f'"{hashlib.md5(body).hexdigest()}"'
+            if self.headers.get("If-None-Match") == etag:
+                self.send_response(304)
+                self.send_header("ETag", etag)
+                self.end_headers()
+                return
+
+            self.send_response(200)
+            self.send_header("Content-Type", "text/html; charset=utf-8")
+            self.send_header("ETag", etag)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    server.daemon_threads = True
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield f"http://127.0.0.1:{server.server_address[1]}/"
+    finally:
+        server.shutdown()
+        server.server_close()
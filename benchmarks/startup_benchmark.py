@@ -0,0 +1,74 @@
+"""
+Measure the startup cost of the iHelp modules and their API clients.
+
+Cold import times are measured in a fresh interpreter per module. Client
+creation is measured twice in the same process: the first (cold) call builds
+the client, later (warm) calls, as on a Streamlit rerun, reuse it.
+
+Usage:
+    python -m benchmarks.startup_benchmark
+"""
+
+import os
+import sys
+import time
+import subprocess
+
+MODULES = [
+    "utils.crawler",
+    "utils.prompt_processor",
+    "utils.scraper",
+    "utils.ibm_waston",
+    "utils.pipeline",
+]
+
+# Dummy credentials: clients are built but no request is sent
+os.environ.setdefault("TOGETHER_API_KEY", "benchmark")
+os.environ.setdefault("ASSISTANT_APIKEY", "benchmark")
+os.environ.setdefault("ASSISTANT_URL", "http://127.0.0.1")
+
+
+def cold_import(module: str) -> float:
+    """
+    Import a module in a fresh interpreter and return the import time in seconds.
+    """
+    code = (
+        "import time, warnings; warnings.filterwarnings('ignore'); "
+        f"started = time.perf_counter(); import {module}; "
+        "print(time.perf_counter() - started)"
+    )
+    output = subprocess.run(
+        [sys.executable, "-c", code], capture_output=True, text=True, check=True
+    ).stdout
+    return float(output.strip().splitlines()[-1])
+
+
+def timed(func) -> float:
+    started = time.perf_counter()
+    func()
+    return time.perf_counter() - started
+
+
+def main():
+    print(f"{'module':<24} {'cold import (ms)':>17}")
+    for module in MODULES:
+        print(f"{module:<24} {cold_import(module) * 1000:>17.1f}")
+
+    from utils.ibm_waston import get_assistant
+    from utils.prompt_processor import LLMClient, UserPrompt
+
+    model = UserPrompt(text="").model
+    clients = {
+        "Watson client": get_assistant,
+        "TogetherAI client": lambda: LLMClient.get_instance(model),
+    }
+
+    print(f"\n{'client':<24} {'cold (ms)':>10} {'warm (ms)':>10}")
+    for name, factory in clients.items():
+        cold = timed(factory)
+        warm = min(timed(factory) for _ in range(100))
+        print(f"{name:<24} {cold * 1000:>10.1f} {warm * 1000:>10.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,155 @@
+"""
+Build Watson Assistants for many websites without the Streamlit UI.
+
+Usage:
+    python cli.py urls.txt --concurrency 8 --report samples/output/batch_report.csv
+
+The URL file holds one website URL per line; blank lines and lines starting
+with "#" are ignored. Progress is checkpointed per website, so rerunning the
+same command resumes unfinished builds and skips finished ones; use --restart
+for periodic refreshes.
+"""
+
+import os
+import csv
+import json
+import argparse
+import warnings
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, as_completed
+from dotenv import load_dotenv
+
+# Load environment variables before the Watson and TogetherAI clients read them
+load_dotenv()
+
+from utils.logger import get_logger
+from utils.metrics import start_metrics_server
+from utils.pipeline import CHECKPOINT_DIR, STAGES, build_assistant
+from utils.workspace_pool import get_workspace_pool
+
+log = get_logger(__name__)
+
+warnings.filterwarnings("ignore")
+
+
+def read_urls(path: str) -> list:
+    """
+    Read website URLs from a file, one per line, without duplicates.
+
+    Args:
+        path (str): The path of the URL file.
+
+    Returns:
+        list: The URLs, in file order.
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        lines = (line.strip() for line in f)
+        urls = [line for line in lines if line and not line.startswith("#")]
+    return list(dict.fromkeys(urls))
+
+
+def write_report(results: list, path: str):
+    """
+    Write the per-site status and stage timings as CSV, or JSON if the path ends in .json.
+
+    Args:
+        results (list): The build states returned by build_assistant().
+        path (str): The path of the report file.
+    """
+    rows = [
+        {
+            "url": result["url"],
+            "status": result["status"],
+            "title": result.get("title"),
+            "workspace_id": result.get("workspace_id"),
+            **{f"{stage}_seconds": result["timings"].get(stage) for stage in STAGES},
+            "total_seconds": round(sum(result["timings"].values()), 3),
+            "upload_errors": len(result.get("upload_errors") or []),
+            "error": result.get("error"),
+        }
+        for result in results
+    ]
+
+    if os.path.dirname(path):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        if path.endswith(".json"):
+            json.dump(rows, f, indent=2, ensure_ascii=False)
+        else:
+            writer = csv.DictWriter(f, fieldnames=list(rows[0]) if rows else ["url"])
+            writer.writeheader()
+            writer.writerows(rows)
+
+    log.info(f"Report saved to {path}")
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("urls", help="File with one website URL per line.")
+    parser.add_argument(
+        "--concurrency", type=int, default=4, help="Websites built in parallel."
+    )
+    parser.add_argument(
+        "--processes",
+        action="store_true",
+        help="Build websites in separate processes instead of threads.",
+    )
+    parser.add_argument(
+        "--restart",
+        action="store_true",
+        help="Ignore checkpoints and rebuild every website. Websites that did not "
+        "change since their last build still reuse it.",
+    )
+    parser.add_argument(
+        "--checkpoint-dir",
+        default=CHECKPOINT_DIR,
+        help="Directory for per-site checkpoints.",
+    )
+    parser.add_argument(
+        "--report",
+        default=os.path.join("samples", "output", "batch_report.csv"),
+        help="Path of the per-site timing/status report (.csv or .json).",
+    )
+    args = parser.parse_args()
+
+    urls = read_urls(args.urls)
+    start_metrics_server()
+    if args.processes:
+        # Pools of separate processes could hand out the same pre-created workspace
+        os.environ["WORKSPACE_POOL_SIZE"] = "0"
+    else:
+        get_workspace_pool()
+    log.info(f"Building assistants for {len(urls)} websites.")
+
+    executor = ProcessPoolExecutor if args.processes else ThreadPoolExecutor
+    results = []
+    with executor(max_workers=args.concurrency) as pool:
+        futures = {
+            pool.submit(build_assistant, url, args.checkpoint_dir, args.restart): url
+            for url in urls
+        }
+        for future in as_completed(futures):
+            url = futures[future]
+            try:
+                result = future.result()
+            except Exception as e:
+                log.error(f"Build failed for {url}: {e}")
+                result = {"url": url, "status": "failed", "timings": {}, "error": str(e)}
+            results.append(result)
+            log.info(f"[{len(results)}/{len(urls)}] {url}: {result['status']}")
+
+    # Keep the report in input order
+    order = {url: index for index, url in enumerate(urls)}
+    results.sort(key=lambda result: order[result["url"]])
+    write_report(results, args.report)
+
+    failed = sum(result["status"] != "done" for result in results)
+    if failed:
+        log.error(f"{failed} of {len(urls)} websites failed, rerun to resume them.")
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
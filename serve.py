@@ -0,0 +1,46 @@
+"""
+Serve a generated assistant locally, without Watson round trips.
+
+Usage:
+    python serve.py samples/output/acme-1a2b3c4d/assistant-<hash>.json --port 8080
+
+    curl -X POST localhost:8080/message -d '{"text": "How can I contact you?"}'
+
+The workspace JSON is the file exported by the app or by cli.py; the site's
+index.json names its current version.
+"""
+
+import time
+import argparse
+from utils.answer_engine import AnswerEngine, serve
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("workspace", help="Path of the workspace JSON file.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.2,
+        help="Minimum intent confidence, below which the fallback answer is used.",
+    )
+    args = parser.parse_args()
+
+    server = serve(
+        AnswerEngine.from_file(args.workspace, threshold=args.threshold),
+        host=args.host,
+        port=args.port,
+    )
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+import gzip
+import json
+import http.client
+
+import pytest
+
+from utils.answer_engine import FALLBACK_INTENT, AnswerEngine, serve
+
+WORKSPACE = {
+    "name": "Acme",
+    "intents": [
+        {
+            "intent": "contact_details",
+            "examples": [
+                {"text": "How can I contact you?"},
+                {"text": "What is your phone number?"},
+                {"text": "Where is your office?"},
+            ],
+        },
+        {
+            "intent": "careers",
+            "examples": [
+                {"text": "Are you hiring?"},
+                {"text": "How do I apply for a job?"},
+            ],
+        },
+    ],
+    "dialog_nodes": [
+        {
+            "dialog_node": "node_contact",
+            "conditions": "#contact_details",
+            "output": {"text": "Call us at 555-0100."},
+        },
+        {"action_name": "careers", "conditions": "#careers", "output_text": "See /jobs."},
+    ],
+}
+
+
+@pytest.fixture(scope="module")
+def engine():
+    return AnswerEngine(WORKSPACE)
+
+
+def test_classify_ranks_the_matching_intent_first(engine):
+    intents = engine.classify("what is the phone number of your office")
+    assert intents[0]["intent"] == "contact_details"
+    assert 0 < intents[0]["confidence"] <= 1
+
+
+def test_answer_returns_the_triggered_dialog_node(engine):
+    assert engine.answer("are you hiring engineers?") == {
+        "intents": engine.classify("are you hiring engineers?"),
+        "intent": "careers",
+        "dialog_node": "careers",
+        "output": "See /jobs.",
+    }
+    assert engine.answer("How can I contact you")["output"] == "Call us at 555-0100."
+
+
+def test_unknown_message_falls_back(engine):
+    answer = engine.answer("zebra quantum")
+    assert answer["intents"] == []
+    assert answer["intent"] == FALLBACK_INTENT
+    assert answer["output"] is None
+
+
+@pytest.mark.parametrize("suffix", ["json", "json.gz"])
+def test_from_file_reads_plain_and_compressed_workspaces(tmp_path, suffix):
+    data = json.dumps(WORKSPACE).encode("utf-8")
+    path = tmp_path / f"assistant.{suffix}"
+    path.write_bytes(gzip.compress(data) if suffix.endswith(".gz") else data)
+    engine = AnswerEngine.from_file(str(path))
+    assert engine.name == "Acme"
+    assert engine.intents == ["contact_details", "careers"]
+
+
+def test_serve_answers_messages_over_http(engine):
+    server = serve(engine, port=0)
+    try:
+        connection = http.client.HTTPConnection("127.0.0.1", server.server_address[1])
+        connection.request("POST", "/message", body=json.dumps({"text": "Are you hiring?"}))
+        assert json.loads(connection.getresponse().read())["intent"] == "careers"
+        connection.request("POST", "/message", body=b"not json")
+        response = connection.getresponse()
+        response.read()
+        assert response.status == 400
+    finally:
+        server.shutdown()
+        server.server_close()
@@ -0,0 +1,79 @@
+import os
+
+import pytest
+
+from utils import artifacts
+from utils.artifacts import ArtifactStore, site_key
+
+ASSISTANT = {"name": "Acme", "intents": [{"intent": "hours"}]}
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = ArtifactStore(str(tmp_path))
+    yield store
+    store.close()
+
+
+def files(store, site):
+    return sorted(os.listdir(os.path.join(store.directory, site)))
+
+
+def test_site_key_tells_sites_with_the_same_title_apart():
+    assert site_key("Acme Corp. | Home") == "acme-corp-home"
+    assert site_key("!!!") == "site"
+    assert site_key("Acme", "https://acme.test/") != site_key("Acme", "https://acme.example/")
+
+
+def test_artifacts_are_served_before_and_after_they_are_written(store):
+    artifact = store.put("acme", "assistant", ASSISTANT)
+    assert store.get("acme", "assistant") is artifact
+
+    path = artifact.written.result(5)
+    assert os.path.exists(path)
+    assert ArtifactStore(store.directory).get("acme", "assistant").json() == ASSISTANT
+    assert artifact.file_name == "acme_assistant.json"
+    assert artifact.mime == "application/json"
+
+
+def test_superseded_files_are_removed(store):
+    store.put("acme", "summary", "Version one").written.result(5)
+    assistant = store.put("acme", "assistant", ASSISTANT)
+    summary = store.put("acme", "summary", "Version two")
+    store.flush()
+
+    assert files(store, "acme") == sorted(
+        ["index.json", os.path.basename(assistant.path), os.path.basename(summary.path)]
+    )
+    assert ArtifactStore(store.directory).get("acme", "summary").text() == "Version two"
+
+
+def test_compressed_artifacts_are_read_back(tmp_path):
+    store = ArtifactStore(str(tmp_path), compression="gzip")
+    path = store.put("acme", "summary", "Acme sells anvils.").written.result(5)
+    store.close()
+
+    assert path.endswith(".md.gz")
+    assert ArtifactStore(str(tmp_path)).get("acme", "summary").text() == "Acme sells anvils."
+
+
+def test_failed_writes_are_reported_on_the_artifact(store, monkeypatch):
+    def read_only(path, data):
+        raise PermissionError(f"{path} is read-only")
+
+    monkeypatch.setattr(artifacts, "_atomic_write", read_only)
+    artifact = store.put("acme", "summary", "Acme sells anvils.")
+
+    with pytest.raises(PermissionError):
+        artifact.written.result(5)
+    assert store.get("acme", "summary").text() == "Acme sells anvils."
+
+
+def test_only_written_artifacts_leave_memory(store, monkeypatch):
+    monkeypatch.setattr(artifacts, "ARTIFACT_MEMORY_ITEMS", 1)
+    first = store.put("one", "summary", "One")
+    first.written.result(5)
+    store.put("two", "summary", "Two").written.result(5)
+
+    assert ("one", "summary") not in store._latest
+    assert store.get("one", "summary").text() == "One"
@@ -0,0 +1,54 @@
+import subprocess
+import sys
+
+import pytest
+
+from utils import ibm_waston
+from utils.prompt_processor import LLMClient
+
+
+@pytest.fixture
+def credentials(monkeypatch):
+    # Dummy credentials: clients are built but no request is sent
+    monkeypatch.setenv("TOGETHER_API_KEY", "test")
+    monkeypatch.setenv("ASSISTANT_APIKEY", "test")
+    monkeypatch.setenv("ASSISTANT_URL", "http://127.0.0.1")
+    monkeypatch.setattr(ibm_waston, "_assistant", None)
+    monkeypatch.setattr(LLMClient, "_instance", None)
+
+
+def test_modules_import_no_client_sdk():
+    code = (
+        "import sys, utils.ibm_waston, utils.prompt_processor, utils.pipeline; "
+        "print(sorted({name.split('.')[0] for name in sys.modules} & "
+        "{'ibm_watson', 'llama_index'}))"
+    )
+    output = subprocess.run(
+        [sys.executable, "-c", code], capture_output=True, text=True, check=True
+    ).stdout
+    assert output.strip().splitlines()[-1] == "[]"
+
+
+def test_watson_client_is_created_once(credentials):
+    assistant = ibm_waston.get_assistant()
+    assert ibm_waston.get_assistant() is assistant
+    assert assistant.service_url == "http://127.0.0.1"
+
+
+def test_watson_client_needs_credentials(credentials, monkeypatch):
+    monkeypatch.delenv("ASSISTANT_APIKEY")
+    with pytest.raises(ValueError):
+        ibm_waston.get_assistant()
+    assert ibm_waston._assistant is None
+
+
+def test_llm_client_is_created_once_per_model(credentials):
+    llm = LLMClient.get_instance("model-a")
+    assert LLMClient.get_instance("model-a") is llm
+    assert LLMClient.get_instance("model-b").model == "model-b"
+
+
+def test_llm_client_needs_an_api_key(credentials, monkeypatch):
+    monkeypatch.delenv("TOGETHER_API_KEY")
+    with pytest.raises(ValueError):
+        LLMClient.get_instance("model-a")
@@ -0,0 +1,72 @@
+import pytest
+
+from utils import crawler
+from utils.crawler import CrawlConfig, Page, crawl
+
+ROOT = "https://acme.test"
+
+
+class Site:
+    """
+    Fake website served by fetch_page(), recording the pages fetched.
+    """
+
+    def __init__(self, monkeypatch, links):
+        self.links = links
+        self.fetched = []
+        monkeypatch.setattr(crawler, "fetch_page", self.fetch_page)
+
+    def fetch_page(self, url, depth=0, timeout=10, extractor=None):
+        path = url[len(ROOT) :] or "/"
+        self.fetched.append(path)
+        return Page(
+            url=url,
+            title=path,
+            blocks=[f"The {path} page of Acme."],
+            depth=depth,
+            links=[
+                link if link.startswith("http") else ROOT + link
+                for link in self.links.get(path, [])
+            ],
+        )
+
+
+def config(**limits):
+    return CrawlConfig(respect_robots=False, use_sitemaps=False, **limits)
+
+
+def test_pages_for_the_required_intents_are_fetched_first(monkeypatch):
+    site = Site(monkeypatch, {"/": ["/gallery", "/tag/news", "/contact", "/blog", "/about"]})
+    crawl(ROOT + "/", config(concurrency=1))
+
+    assert site.fetched[0] == "/"
+    assert set(site.fetched[1:3]) == {"/contact", "/about"}
+    assert site.fetched[-1] == "/tag/news"
+
+
+def test_shallower_pages_are_fetched_first(monkeypatch):
+    site = Site(monkeypatch, {"/": ["/a", "/b"], "/a": ["/a/deep"], "/b": ["/b/deep"]})
+    crawl(ROOT + "/", config(concurrency=1))
+    assert site.fetched == ["/", "/a", "/b", "/a/deep", "/b/deep"]
+
+
+@pytest.mark.parametrize("concurrency", [1, 4])
+def test_crawl_stops_at_the_page_budget(monkeypatch, concurrency):
+    site = Site(monkeypatch, {"/": [f"/page-{i}" for i in range(20)]})
+    pages = crawl(ROOT + "/", config(max_pages=5, concurrency=concurrency))
+
+    assert len(pages) == len(site.fetched) == 5
+    assert [page.order for page in pages] == sorted(page.order for page in pages)
+
+
+def test_crawl_stops_at_the_depth_budget(monkeypatch):
+    site = Site(monkeypatch, {"/": ["/one"], "/one": ["/one/two"], "/one/two": ["/three"]})
+    crawl(ROOT + "/", config(max_depth=2))
+    assert site.fetched == ["/", "/one", "/one/two"]
+
+
+def test_url_variants_and_other_domains_are_fetched_once(monkeypatch):
+    site = Site(monkeypatch, {"/": ["/about", "/about/", "/about#team", "/logo.png", "/"]})
+    site.links["/about"] = ["/", "https://elsewhere.test/about"]
+    crawl(ROOT + "/", config())
+    assert sorted(site.fetched) == ["/", "/about"]
@@ -0,0 +1,69 @@
+import random
+
+import pytest
+
+from utils.dedup import NearDuplicateIndex, canonicalize_url, simhash
+
+WORDS = ["anvil", "rocket", "desert", "coyote", "order", "ship", "steel"]
+ARTICLE = " ".join(
+    f"{word}{i % 7}" for i, word in enumerate(random.Random(1949).choices(WORDS, k=200))
+)
+
+
+@pytest.mark.parametrize(
+    "url, canonical",
+    [
+        ("HTTPS://Acme.TEST:443/About/", "https://acme.test/About"),
+        ("http://acme.test:80//shop///anvils/#specs", "http://acme.test/shop/anvils"),
+        ("https://acme.test", "https://acme.test/"),
+        (
+            "https://acme.test/shop?utm_source=mail&size=xl&gclid=1&color=red",
+            "https://acme.test/shop?color=red&size=xl",
+        ),
+        ("https://acme.test:8443/?q=", "https://acme.test:8443/?q="),
+    ],
+)
+def test_canonicalize_url(url, canonical):
+    assert canonicalize_url(url) == canonical
+
+
+def test_simhash_is_stable_and_close_for_similar_texts():
+    edited = ARTICLE.replace("anvil0", "hammer0", 1)
+    assert simhash(ARTICLE) == simhash(ARTICLE.upper())
+    assert bin(simhash(ARTICLE) ^ simhash(edited)).count("1") <= 6
+    assert bin(simhash(ARTICLE) ^ simhash("A different page entirely " * 10)).count("1") > 6
+
+
+def test_near_duplicates_keep_the_shortest_url():
+    index = NearDuplicateIndex()
+    assert index.find_duplicate("https://acme.test/news?print=1", ARTICLE) == (None, None)
+    assert index.find_duplicate("https://acme.test/news", ARTICLE + " printed") == (
+        None,
+        "https://acme.test/news?print=1",
+    )
+    assert index.find_duplicate("https://acme.test/news?sort=asc", ARTICLE) == (
+        "https://acme.test/news",
+        None,
+    )
+    assert index.stats["duplicates"] == 2
+
+
+def test_kept_pages_do_not_depend_on_the_fetch_order():
+    urls = ["https://acme.test/b", "https://acme.test/a", "https://acme.test/a?x=1"]
+    kept = set()
+    for order in (urls, urls[::-1], urls[1:] + urls[:1]):
+        index = NearDuplicateIndex()
+        survivors = set()
+        for url in order:
+            duplicate_of, replaces = index.find_duplicate(url, ARTICLE)
+            survivors.discard(replaces)
+            if duplicate_of is None:
+                survivors.add(url)
+        kept.add(frozenset(survivors))
+    assert kept == {frozenset({"https://acme.test/a"})}
+
+
+def test_short_pages_are_never_duplicates():
+    index = NearDuplicateIndex(min_words=20)
+    assert index.find_duplicate("https://acme.test/a", "Contact us") == (None, None)
+    assert index.find_duplicate("https://acme.test/b", "Contact us") == (None, None)
@@ -0,0 +1,77 @@
+import gzip
+from urllib.robotparser import RobotFileParser
+
+import pytest
+
+from utils.discovery import RobotsRules, parse_sitemap, score_url
+
+URLSET = b"""<?xml version="1.0" encoding="UTF-8"?>
+<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">
+  <url><loc> https://example.com/about </loc></url>
+  <url><loc>https://example.com/contact</loc><lastmod>2024-01-01</lastmod></url>
+</urlset>"""
+
+INDEX = b"""<?xml version="1.0" encoding="UTF-8"?>
+<sitemapindex xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">
+  <sitemap><loc>https://example.com/sitemap-pages.xml</loc></sitemap>
+</sitemapindex>"""
+
+
+def rules(text):
+    parser = RobotFileParser("https://example.com/robots.txt")
+    parser.parse(text.splitlines())
+    return RobotsRules(parser)
+
+
+def test_parse_sitemap_lists_page_urls():
+    assert parse_sitemap(URLSET) == (
+        ["https://example.com/about", "https://example.com/contact"],
+        [],
+    )
+
+
+def test_parse_sitemap_lists_nested_sitemaps_of_an_index():
+    assert parse_sitemap(INDEX) == ([], ["https://example.com/sitemap-pages.xml"])
+
+
+def test_parse_sitemap_decompresses_gzip():
+    assert parse_sitemap(gzip.compress(URLSET)) == parse_sitemap(URLSET)
+
+
+@pytest.mark.parametrize("declaration", [b"<!DOCTYPE urlset [", b"<! entity"])
+def test_parse_sitemap_rejects_doctype_and_entities(declaration):
+    content = b'<?xml version="1.0"?>\n' + declaration + b' <!ENTITY a "a">]>\n<urlset/>'
+    with pytest.raises(ValueError):
+        parse_sitemap(content)
+    with pytest.raises(ValueError):
+        parse_sitemap(gzip.compress(content))
+
+
+def test_robots_rules_apply_to_the_crawler():
+    robots = rules(
+        "User-agent: *\n"
+        "Disallow: /private\n"
+        "Crawl-delay: 2\n"
+        "Sitemap: https://example.com/sitemap.xml\n"
+    )
+    assert robots.allowed("https://example.com/about")
+    assert not robots.allowed("https://example.com/private/page")
+    assert robots.crawl_delay == 2.0
+    assert robots.sitemaps == ["https://example.com/sitemap.xml"]
+
+
+def test_robots_request_rate_sets_the_crawl_delay():
+    assert rules("User-agent: *\nRequest-rate: 1/5\n").crawl_delay == 5.0
+
+
+def test_missing_robots_allows_everything():
+    robots = RobotsRules()
+    assert robots.allowed("https://example.com/anything")
+    assert robots.crawl_delay == 0
+    assert robots.sitemaps == []
+
+
+def test_score_url_prefers_intent_pages_over_low_value_ones():
+    assert score_url("https://example.com/about-us") > score_url("https://example.com/blog/post")
+    assert score_url("https://example.com/careers/jobs") >= 1
+    assert score_url("https://example.com/tag/news") == -1
@@ -0,0 +1,62 @@
+import pytest
+
+from utils.extractor import EXTRACTORS, BoilerplateFilter, _available, get_extractor
+
+PAGE = b"""<html>
+<head><title> Acme Anvils </title></head>
+<body>
+  <header><p>Free shipping on every anvil</p></header>
+  <nav><a href="/about">About</a> <a href=" /contact ">Contact</a></nav>
+  <main>
+    <p>Acme has built   anvils
+       since 1949.</p>
+    <p>   </p>
+    <div><p>Visit our <a href="https://shop.acme.test/">shop</a>.</p></div>
+  </main>
+  <footer><p>&copy; Acme</p></footer>
+</body>
+</html>"""
+
+
+@pytest.fixture(params=list(EXTRACTORS))
+def extract(request):
+    if not _available(request.param):
+        pytest.skip(f"{request.param} is not installed")
+    return EXTRACTORS[request.param]
+
+
+def test_content_paragraphs_are_kept_and_boilerplate_dropped(extract):
+    page = extract(PAGE, "https://acme.test/products/")
+
+    assert page.title == "Acme Anvils"
+    assert page.blocks == ["Acme has built anvils since 1949.", "Visit our shop."]
+
+
+def test_links_are_made_absolute(extract):
+    page = extract(PAGE, "https://acme.test/products/")
+    assert page.links == [
+        "https://acme.test/about",
+        "https://acme.test/contact",
+        "https://shop.acme.test/",
+    ]
+
+
+def test_pages_without_a_title_are_untitled(extract):
+    assert extract(b"<html><body><p>Hello</p></body></html>", "https://acme.test/").title == (
+        "Untitled_Page"
+    )
+
+
+def test_extractor_can_be_chosen(monkeypatch):
+    monkeypatch.setenv("HTML_EXTRACTOR", "bs4")
+    assert get_extractor() is EXTRACTORS["bs4"]
+    assert get_extractor("lxml") is EXTRACTORS["lxml"]
+    with pytest.raises(ValueError):
+        get_extractor("regex")
+
+
+def test_blocks_repeated_across_pages_are_dropped():
+    boilerplate = BoilerplateFilter()
+    assert boilerplate.filter(["Welcome to Acme", "Anvils"]) == ["Welcome to Acme", "Anvils"]
+    assert boilerplate.filter(["Welcome to Acme", "Rockets"]) == ["Rockets"]
+    assert boilerplate.dropped_bytes == len("Welcome to Acme")
@@ -0,0 +1,100 @@
+import re
+import json
+import time
+import random
+
+import pytest
+
+from utils import ibm_waston, required_intents
+from utils.vector_index import HashingEmbedder, VectorIndex
+
+SUMMARY = "Acme builds anvils in Springfield since 1901."
+
+
+def templates(*intents, actions=()):
+    return (
+        [{"intent": intent, "examples": [{"text": f"Tell me about {intent}"}]} for intent in intents],
+        [{"action_name": intent, "conditions": f"#{intent}"} for intent in actions],
+    )
+
+
+def prompt_name(text):
+    match = re.search(r"'(\w+)' intent", text)
+    return match.group(1) if match else "extra"
+
+
+@pytest.fixture
+def llm(monkeypatch):
+    """
+    Answer every fan-out prompt with one intent and action named after it, in random order.
+    """
+    forgotten, failing = [], set()
+
+    def process_prompt(prompt):
+        name = prompt_name(prompt.text)
+        time.sleep(random.uniform(0, 0.01))
+        if name in failing:
+            return "Sorry, I can't help with that."
+        return json.dumps(
+            {
+                "new_intents": [{"intent": name, "examples": [{"text": "?"}]}],
+                "new_actions": [{"action_name": name, "conditions": f"#{name}"}],
+            }
+        )
+
+    monkeypatch.setattr(ibm_waston, "process_prompt", process_prompt)
+    monkeypatch.setattr(ibm_waston, "forget_response", forgotten.append)
+    return forgotten, failing
+
+
+def test_prompts_skip_required_intents_that_are_complete():
+    done = required_intents[:3]
+    prompts = ibm_waston._fan_out_prompts(
+        SUMMARY, None, templates(*done, required_intents[3], actions=done)
+    )
+    names = [name for name, _ in prompts]
+    assert names == required_intents[3:] + ["extra intents"]
+    # An existing intent without an action only gets an action written
+    assert "and no intents" in prompts[0][1]
+    assert "at least 5 example" in prompts[1][1]
+
+
+def test_prompts_carry_the_summary_and_retrieved_chunks():
+    index = VectorIndex(HashingEmbedder())
+    index.add_page("https://acme.test/careers", "Careers", "Join our team, we are hiring welders " * 5)
+    prompts = dict(ibm_waston._fan_out_prompts(SUMMARY, index, ([], [])))
+
+    assert "Website Summary: " + SUMMARY in prompts["careers"]
+    assert "page extracts about careers" in prompts["careers"]
+    assert "hiring welders" in prompts["careers"]
+    # Intents with nothing retrieved fall back to the summary alone
+    assert "page extracts" not in prompts["company_history"]
+    assert SUMMARY in prompts["company_history"]
+    assert "page extracts" not in prompts["extra intents"]
+
+
+def test_fan_out_merges_results_in_prompt_order(llm):
+    intents, actions, errors, all_failed = ibm_waston._fan_out(SUMMARY, None, ([], []))
+
+    expected = required_intents + ["extra"]
+    assert [intent["intent"] for intent in intents] == expected
+    assert [action["action_name"] for action in actions] == expected
+    assert errors == []
+    assert not all_failed
+
+
+def test_fan_out_isolates_failed_requests(llm):
+    forgotten, failing = llm
+    failing.add("careers")
+    intents, _, _, all_failed = ibm_waston._fan_out(SUMMARY, None, ([], []))
+
+    assert "careers" not in [intent["intent"] for intent in intents]
+    assert len(intents) == len(required_intents)
+    assert [prompt_name(prompt.text) for prompt in forgotten] == ["careers"]
+    assert not all_failed
+
+
+def test_fan_out_reports_when_every_request_failed(llm):
+    _, failing = llm
+    failing.update(required_intents + ["extra"])
+    assert ibm_waston._fan_out(SUMMARY, None, ([], [])) == ([], [], [], True)
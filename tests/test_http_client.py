@@ -0,0 +1,116 @@
+import os
+import time
+
+import pytest
+import requests
+
+from utils import http_client
+from utils.http_client import HttpCache, fetch
+
+
+def response(status=200, body=b"<html>Acme</html>", headers=None):
+    result = requests.Response()
+    result.status_code = status
+    result._content = body
+    result.headers.update(headers or {})
+    return result
+
+
+def age(cache, url, seconds):
+    path = f"{cache._path(url)}.body"
+    then = time.time() - seconds
+    os.utime(path, (then, then))
+
+
+def test_only_responses_with_validators_are_cached(tmp_path):
+    cache = HttpCache(str(tmp_path))
+    cache.store("https://acme.test/", response(headers={"ETag": '"v1"'}))
+    cache.store("https://acme.test/news", response())
+
+    assert cache.validators("https://acme.test/") == {"If-None-Match": '"v1"'}
+    assert cache.load("https://acme.test/") == b"<html>Acme</html>"
+    assert cache.validators("https://acme.test/news") == {}
+    assert cache.load("https://acme.test/news") is None
+
+
+def test_expired_responses_are_evicted(tmp_path):
+    cache = HttpCache(str(tmp_path), max_age=3600)
+    for url in ("https://acme.test/old", "https://acme.test/new"):
+        cache.store(url, response(headers={"Last-Modified": "Mon, 01 Jan 2024 00:00:00 GMT"}))
+    age(cache, "https://acme.test/old", 7200)
+
+    assert cache.prune() == len(b"<html>Acme</html>")
+    assert cache.load("https://acme.test/old") is None
+    assert cache.validators("https://acme.test/old") == {}
+    assert cache.load("https://acme.test/new") is not None
+    assert cache.stats["evictions"] == 1
+
+
+def test_least_recently_used_responses_are_evicted_over_the_size_cap(tmp_path):
+    body = b"x" * 100
+    cache = HttpCache(str(tmp_path), max_bytes=350)
+    for seconds, name in enumerate("cba"):
+        url = f"https://acme.test/{name}"
+        cache.store(url, response(body=body, headers={"ETag": name}))
+        age(cache, url, 30 - seconds)
+    # Revalidating a response keeps it
+    cache.load("https://acme.test/c")
+
+    cache.store("https://acme.test/d", response(body=body, headers={"ETag": "d"}))
+    assert [
+        cache.load(f"https://acme.test/{name}") is not None for name in "abcd"
+    ] == [True, False, True, True]
+
+
+def test_cache_size_is_restored_on_start(tmp_path):
+    HttpCache(str(tmp_path)).store("https://acme.test/", response(headers={"ETag": "v1"}))
+    assert HttpCache(str(tmp_path))._size == len(b"<html>Acme</html>")
+
+
+class Session:
+    """
+    Fake session answering with the given responses, recording the request headers.
+    """
+
+    def __init__(self, *responses):
+        self.responses = list(responses)
+        self.headers = []
+
+    def get(self, url, timeout=10, headers=None):
+        self.headers.append(headers or {})
+        return self.responses.pop(0)
+
+
+@pytest.fixture
+def cache(monkeypatch, tmp_path):
+    cache = HttpCache(str(tmp_path))
+    monkeypatch.setattr(http_client, "get_cache", lambda: cache)
+    return cache
+
+
+def test_not_modified_pages_are_served_from_the_cache(monkeypatch, cache):
+    session = Session(response(headers={"ETag": '"v1"'}), response(304, b""))
+    monkeypatch.setattr(http_client, "get_session", lambda: session)
+
+    first = fetch("https://acme.test/")
+    second = fetch("https://acme.test/")
+
+    assert not first.from_cache
+    assert (second.status_code, second.content, second.from_cache) == (
+        200,
+        b"<html>Acme</html>",
+        True,
+    )
+    assert session.headers == [{}, {"If-None-Match": '"v1"'}]
+
+
+def test_not_modified_page_without_a_cached_body_is_fetched_again(monkeypatch, cache):
+    session = Session(response(headers={"ETag": '"v1"'}), response(304, b""), response())
+    monkeypatch.setattr(http_client, "get_session", lambda: session)
+
+    fetch("https://acme.test/")
+    os.remove(f"{cache._path('https://acme.test/')}.body")
+    result = fetch("https://acme.test/")
+
+    assert (result.status_code, result.from_cache) == (200, False)
+    assert session.headers[1:] == [{"If-None-Match": '"v1"'}, {}]
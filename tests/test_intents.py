@@ -0,0 +1,74 @@
+import json
+
+import pytest
+import streamlit
+
+from utils import ibm_waston
+
+TEMPLATES = ([{"intent": "hours", "examples": []}], [])
+RESPONSE = json.dumps(
+    {
+        "new_intents": [{"intent": "parking", "examples": [{"text": "Where can I park?"}]}],
+        "new_actions": [{"action_name": "parking", "conditions": "#parking"}],
+    }
+)
+
+
+@pytest.fixture
+def reported(monkeypatch):
+    """
+    Record the Streamlit errors and warnings and the rejected prompts.
+    """
+    reported = {"error": [], "warning": [], "forgotten": []}
+    monkeypatch.setattr(streamlit, "error", reported["error"].append)
+    monkeypatch.setattr(streamlit, "warning", reported["warning"].append)
+    monkeypatch.setattr(ibm_waston, "forget_response", reported["forgotten"].append)
+    return reported
+
+
+def streaming(monkeypatch, text, error=None):
+    def stream_prompt(prompt):
+        for start in range(0, len(text), 16):
+            yield text[start : start + 16]
+        if error:
+            raise error
+
+    monkeypatch.setattr(ibm_waston, "stream_prompt", stream_prompt)
+
+
+def intents(**kwargs):
+    return ibm_waston.get_intents_and_actions(
+        "Acme sells anvils.", templates=TEMPLATES, stream=True, fan_out=False, **kwargs
+    )
+
+
+def test_stream_adds_the_new_intents_and_actions(monkeypatch, reported):
+    streaming(monkeypatch, RESPONSE)
+    new_intents, new_actions = intents()
+
+    assert [intent["intent"] for intent in new_intents] == ["hours", "parking"]
+    assert [action["action_name"] for action in new_actions] == ["parking"]
+    assert reported == {"error": [], "warning": [], "forgotten": []}
+
+
+def test_stream_without_items_is_reported(monkeypatch, reported):
+    streaming(monkeypatch, "Sorry, I cannot help with that.")
+    assert intents() == TEMPLATES
+    assert reported["error"] == ["Failed to generate or complete intents and actions."]
+    assert len(reported["forgotten"]) == 1
+
+
+def test_broken_stream_keeps_its_completed_items_and_warns(monkeypatch, reported):
+    streaming(monkeypatch, RESPONSE[: RESPONSE.index('"new_actions"')], ConnectionError())
+    new_intents, new_actions = intents()
+
+    assert [intent["intent"] for intent in new_intents] == ["hours", "parking"]
+    assert new_actions == []
+    assert reported["error"] == []
+    assert len(reported["warning"]) == 1
+
+
+def test_stream_that_breaks_before_any_item_is_reported(monkeypatch, reported):
+    streaming(monkeypatch, '{"new_intents": [{"int', ConnectionError())
+    assert intents() == TEMPLATES
+    assert len(reported["error"]) == 1
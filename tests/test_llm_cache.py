@@ -0,0 +1,87 @@
+import sqlite3
+from types import SimpleNamespace
+
+import pytest
+
+from utils import llm_cache
+from utils.llm_cache import LLMCache
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def time(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(llm_cache, "time", clock)
+    return clock
+
+
+def cache(tmp_path, **kwargs):
+    return LLMCache(path=str(tmp_path / "llm.sqlite3"), **kwargs)
+
+
+def test_prompts_differing_in_whitespace_share_an_entry(tmp_path, clock):
+    responses = cache(tmp_path)
+    responses.set("model", "Summarize\n   this", "summary")
+    assert responses.get("model", "Summarize this") == "summary"
+    assert responses.get("other-model", "Summarize this") is None
+
+
+def test_entries_expire_after_the_ttl(tmp_path, clock):
+    responses = cache(tmp_path, ttl=60)
+    responses.set("model", "prompt", "response")
+    clock.now += 61
+    assert responses.get("model", "prompt") is None
+    assert responses.misses == 1
+
+
+def test_least_recently_used_entries_are_evicted(tmp_path, clock):
+    responses = cache(tmp_path, max_entries=2, memory_entries=0)
+    for prompt in ("a", "b"):
+        clock.now += 1
+        responses.set("model", prompt, prompt.upper())
+    clock.now += 1
+    assert responses.get("model", "a") == "A"
+    clock.now += 1
+    responses.set("model", "c", "C")
+
+    assert responses.get("model", "b") is None
+    assert [responses.get("model", prompt) for prompt in ("a", "c")] == ["A", "C"]
+    assert responses.stats["evictions"] == 1
+
+
+def test_disk_entries_survive_a_restart(tmp_path, clock):
+    cache(tmp_path).set("model", "prompt", "response")
+    restarted = cache(tmp_path)
+    assert restarted.get("model", "prompt") == "response"
+    assert restarted.stats["disk_hits"] == 1
+
+
+def test_delete_evicts_both_tiers(tmp_path, clock):
+    responses = cache(tmp_path)
+    responses.set("model", "prompt", "not json")
+    responses.delete("model", "prompt")
+    assert responses.get("model", "prompt") is None
+
+
+def test_disabled_cache_stores_nothing(tmp_path, clock):
+    responses = cache(tmp_path, ttl=0)
+    responses.set("model", "prompt", "response")
+    assert responses.get("model", "prompt") is None
+
+
+def test_database_errors_are_misses(tmp_path, clock):
+    responses = cache(tmp_path, memory_entries=0)
+
+    def locked(*args):
+        raise sqlite3.OperationalError("database is locked")
+
+    responses._db = SimpleNamespace(execute=locked, commit=locked, rollback=locked)
+    responses.set("model", "prompt", "response")
+    assert responses.get("model", "prompt") is None
@@ -0,0 +1,96 @@
+import pytest
+
+from utils import manifest, summarizer
+from utils.manifest import SiteManifest
+from utils.spool import PageRecord, PageSpool
+
+URL = "https://acme.test/"
+
+
+def crawl(tmp_path, pages):
+    spool = PageSpool(str(tmp_path))
+    for path, text in pages.items():
+        spool.append(PageRecord(URL + path, path.title(), text, str(hash(text))))
+    return spool
+
+
+@pytest.fixture
+def manifests(monkeypatch, tmp_path):
+    monkeypatch.setattr(manifest, "MANIFEST_DIR", str(tmp_path / "manifests"))
+
+
+@pytest.fixture
+def summarized(monkeypatch):
+    """
+    Record the chunks sent to the map step, answering every prompt with its length.
+    """
+    chunks = []
+
+    def summarize_chunk(chunk):
+        chunks.append(chunk)
+        return f"{len(chunk)} characters"
+
+    monkeypatch.setattr(summarizer, "_summarize_chunk", summarize_chunk)
+    monkeypatch.setattr(summarizer, "process_prompt", lambda prompt: "Summary")
+    return chunks
+
+
+def test_compare_lists_added_changed_and_removed_pages(manifests, tmp_path):
+    site = SiteManifest.load(URL)
+    site.compare(crawl(tmp_path, {"home": "Anvils", "about": "Since 1949"}))
+    site.save("Acme", "ws-1")
+
+    rebuilt = SiteManifest.load(URL)
+    diff = rebuilt.compare(crawl(tmp_path, {"home": "Anvils and rockets", "jobs": "Hiring"}))
+    assert (diff.added, diff.changed, diff.removed) == (
+        [URL + "jobs"],
+        [URL + "home"],
+        [URL + "about"],
+    )
+    assert not rebuilt.unchanged
+    assert rebuilt.workspace_id == "ws-1"
+
+
+def test_unchanged_site_needs_a_saved_build(manifests, tmp_path):
+    pages = {"home": "Anvils"}
+    site = SiteManifest.load(URL)
+    site.compare(crawl(tmp_path, pages))
+    assert not site.unchanged
+    site.save("Acme", "ws-1")
+
+    rebuilt = SiteManifest.load(URL)
+    rebuilt.compare(crawl(tmp_path, pages))
+    assert rebuilt.unchanged
+
+
+def test_rebuild_only_summarizes_the_chunks_of_changed_pages(manifests, tmp_path, summarized):
+    pages = {f"page-{i}": f"Page {i} " + "word " * 60 for i in range(40)}
+    site = SiteManifest.load(URL)
+    summarizer.summarize_pages(crawl(tmp_path, pages), budget=400, map_results=site.map_results)
+    site.save("Acme", "ws-1")
+    first_build = len(summarized)
+    assert first_build > 4
+
+    pages["page-7"] = "Page 7 was rewritten " + "word " * 60
+    # Pages arrive in a different order on every crawl
+    pages = dict(reversed(pages.items()))
+    summarized.clear()
+    rebuilt = SiteManifest.load(URL)
+    summary = summarizer.summarize_pages(
+        crawl(tmp_path, pages), budget=400, map_results=rebuilt.map_results
+    )
+
+    assert summary == "Summary"
+    assert len(summarized) == 1
+    assert "Page 7 was rewritten" in summarized[0]
+    assert rebuilt.map_results.groups == site.map_results.groups
+    assert len(rebuilt.map_results.summaries) == first_build
+
+
+def test_small_sites_take_a_single_prompt(manifests, tmp_path, summarized):
+    site = SiteManifest.load(URL)
+    summary = summarizer.summarize_pages(
+        crawl(tmp_path, {"home": "Anvils"}), budget=400, map_results=site.map_results
+    )
+    assert summary == "Summary"
+    assert summarized == []
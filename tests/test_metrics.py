@@ -0,0 +1,96 @@
+import json
+import urllib.request
+
+import pytest
+
+from utils import metrics
+from utils.metrics import MetricsRegistry, span
+
+
+def test_counters_and_histograms_are_rendered_for_prometheus():
+    registry = MetricsRegistry()
+    registry.count("pages_total")
+    registry.count("pages_total", 2)
+    registry.count("http_requests_total", status=200)
+    registry.observe("fetch_seconds", 0.02, host='acme "test"')
+    registry.observe("fetch_seconds", 3, host='acme "test"')
+
+    lines = registry.render().splitlines()
+    assert lines[:5] == [
+        "# TYPE http_requests_total counter",
+        'http_requests_total{status="200"} 1',
+        "# TYPE pages_total counter",
+        "pages_total 3",
+        "# TYPE fetch_seconds histogram",
+    ]
+    assert 'fetch_seconds_bucket{host="acme \\"test\\"",le="0.01"} 0' in lines
+    assert 'fetch_seconds_bucket{host="acme \\"test\\"",le="0.025"} 1' in lines
+    assert 'fetch_seconds_bucket{host="acme \\"test\\"",le="+Inf"} 2' in lines
+    assert 'fetch_seconds_count{host="acme \\"test\\""} 2' in lines
+    assert registry.snapshot()["histograms"]["fetch_seconds"] == {
+        (("host", 'acme "test"'),): (2, 3.02)
+    }
+
+
+def test_collector_gauges_are_read_on_render():
+    registry = MetricsRegistry()
+    size = {"value": 1}
+    registry.register_collector(lambda: [("pool_size", {"pool": "a"}, size["value"])])
+    registry.register_collector(lambda: 1 / 0)
+
+    size["value"] = 4
+    assert registry.render() == '# TYPE pool_size gauge\npool_size{pool="a"} 4\n'
+
+
+@pytest.fixture
+def recorded(monkeypatch, tmp_path):
+    registry = MetricsRegistry()
+    monkeypatch.setattr(metrics, "registry", registry)
+    path = tmp_path / "traces.jsonl"
+    monkeypatch.setattr(metrics, "_trace_file", metrics._TraceFile(str(path)))
+
+    def spans():
+        records = [json.loads(line) for line in path.read_text(encoding="utf-8").splitlines()]
+        return [record["resourceSpans"][0]["scopeSpans"][0]["spans"][0] for record in records]
+
+    return registry, spans
+
+
+def test_spans_are_timed_and_exported_with_their_parent(recorded):
+    registry, spans = recorded
+    with span("build", url="https://acme.test/"):
+        with pytest.raises(ValueError):
+            with span("crawl") as attributes:
+                attributes["pages"] = 3
+                raise ValueError("no pages")
+
+    crawl, build = spans()
+    assert crawl["parentSpanId"] == build["spanId"]
+    assert crawl["traceId"] == build["traceId"]
+    assert "parentSpanId" not in build
+    assert crawl["status"] == {"code": 2, "message": "no pages"}
+    assert crawl["attributes"] == [{"key": "pages", "value": {"intValue": "3"}}]
+    assert set(registry.snapshot()["histograms"]["span_duration_seconds"]) == {
+        (("span", "build"), ("status", "ok")),
+        (("span", "crawl"), ("status", "error")),
+    }
+
+
+def test_metrics_are_served_over_http(monkeypatch):
+    monkeypatch.setattr(metrics, "_server", None)
+    server = metrics.start_metrics_server(port=0)
+    try:
+        metrics.count("served_total")
+        port = server.server_address[1]
+        with urllib.request.urlopen(f"http://127.0.0.1:{port}/metrics") as response:
+            assert "served_total 1" in response.read().decode("utf-8")
+        assert metrics.start_metrics_server(port=0) is server
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def test_metrics_server_is_disabled_without_a_port(monkeypatch):
+    monkeypatch.delenv("METRICS_PORT", raising=False)
+    monkeypatch.setattr(metrics, "_server", None)
+    assert metrics.start_metrics_server() is None
@@ -0,0 +1,95 @@
+from utils.parser import (
+    StreamingJSONParser,
+    parse_json_code,
+    parse_stream,
+    repair_json,
+    validate_intents_and_actions,
+)
+
+INTENT = {"intent": "hours", "description": "Opening hours", "examples": [{"text": "When are you open?"}]}
+
+
+def chunked(text, size=7):
+    return [text[i : i + size] for i in range(0, len(text), size)]
+
+
+def collect(text, keys=("new_intents", "new_actions"), size=7):
+    return list(parse_stream(chunked(text, size), list(keys)))
+
+
+def test_parse_json_code_repairs_common_defects():
+    text = "```json\n{'new_intents': [{intent: 'a', ok: True,},], // note\n}\n```"
+    assert parse_json_code(text) == {"new_intents": [{"intent": "a", "ok": True}]}
+
+
+def test_parse_json_code_keeps_complete_items_of_truncated_response():
+    text = '{"new_intents": [{"intent": "a"}, {"intent": "b"}, {"intent": "c", "exam'
+    parsed = parse_json_code(text)
+    assert [item["intent"] for item in parsed["new_intents"]][:2] == ["a", "b"]
+
+
+def test_repair_json_escapes_newlines_and_closes_brackets():
+    assert repair_json('{"a": "x\ny", "b": [1, 2') == '{"a": "x\\ny", "b": [1, 2]}'
+
+
+def test_stream_yields_items_as_they_complete():
+    parser = StreamingJSONParser(["new_intents"])
+    assert parser.feed('{"new_intents": [{"intent": "a"}, {"int') == [
+        ("new_intents", {"intent": "a"})
+    ]
+    assert parser.feed('ent": "b"}]}') == [("new_intents", {"intent": "b"})]
+
+
+def test_stream_ignores_nested_objects_and_other_keys():
+    text = '{"other": [{"x": 1}], "new_actions": [{"action_name": "a", "meta": {"k": [1]}}]}'
+    assert collect(text) == [("new_actions", {"action_name": "a", "meta": {"k": [1]}})]
+
+
+def test_stream_with_bare_keys():
+    text = '{new_intents: [{intent: "a"}, {intent: "b"}], new_actions: []}'
+    assert collect(text) == [
+        ("new_intents", {"intent": "a"}),
+        ("new_intents", {"intent": "b"}),
+    ]
+
+
+def test_stream_with_text_before_the_json():
+    text = 'Results [1]: {"new_intents": [{"intent": "a"}]}'
+    assert collect(text) == [("new_intents", {"intent": "a"})]
+
+
+def test_stream_with_colon_in_prose_and_arrays():
+    text = 'Note: here it is.\n{"new_intents": [{"intent": "a", "examples": ["a: b"]}]}'
+    assert collect(text) == [("new_intents", {"intent": "a", "examples": ["a: b"]})]
+
+
+def test_truncated_stream_keeps_complete_items():
+    text = '{"new_intents": [{"intent": "a"}, {"intent": "b", "examples": ["x'
+    assert collect(text) == [("new_intents", {"intent": "a"})]
+
+
+def test_truncated_stream_without_complete_items_falls_back_to_repair():
+    text = '{"new_intents": [{"intent": "a", "examples": ["x"'
+    assert collect(text) == [("new_intents", {"intent": "a", "examples": ["x"]})]
+
+
+def test_stream_of_non_json_yields_nothing():
+    assert collect("Sorry, I cannot help with that.") == []
+
+
+def test_validate_keeps_valid_items_and_reports_invalid_ones():
+    data = {"new_intents": [INTENT, {"description": "no name"}], "new_actions": "oops"}
+    intents, actions, errors = validate_intents_and_actions(data)
+    assert intents == [INTENT]
+    assert actions == []
+    assert [(key, position) for key, position, _ in errors] == [
+        ("new_intents", 1),
+        ("new_actions", None),
+    ]
+
+
+def test_append_keeps_text_without_parsing_it():
+    parser = StreamingJSONParser(["new_intents"])
+    parser.append('{"new_intents": [{"intent": "a"}')
+    assert parser.feed("]}") == []
+    assert parser.text == '{"new_intents": [{"intent": "a"}]}'
@@ -0,0 +1,126 @@
+import threading
+from types import SimpleNamespace
+
+import pytest
+
+from utils import manifest, pipeline, vector_index
+from utils.spool import PageRecord, PageSpool
+
+URL = "https://acme.test/"
+
+
+class Site:
+    """
+    Fake crawl, LLM and Watson calls of a build, recording the calls made.
+    """
+
+    def __init__(self, monkeypatch):
+        self.calls = []
+        self.fail = set()
+        self.workspace_started = threading.Event()
+        self.wait_for_workspace = False
+        for name in (
+            "scrape_website",
+            "summarize_website",
+            "reuse_or_create_workspace",
+            "load_predefined_intents_and_actions",
+            "get_intents_and_actions",
+            "generate_intents_and_actions",
+            "generate_watson_workspace_json",
+            "get_artifact_store",
+        ):
+            monkeypatch.setattr(pipeline, name, getattr(self, name))
+
+    def _call(self, name):
+        self.calls.append(name)
+        if name in self.fail:
+            raise RuntimeError(f"{name} failed")
+
+    def scrape_website(self, url, manifest=None, index=None, on_title=None):
+        self._call("crawl")
+        on_title("Acme")
+        if self.wait_for_workspace:
+            # The rest of the site is still being crawled
+            assert self.workspace_started.wait(5), "the workspace waited for the crawl"
+        pages = PageSpool()
+        pages.append(PageRecord(url, "Acme", "Acme builds anvils.", "h1"))
+        manifest.compare(pages)
+        return pages, "Acme"
+
+    def summarize_website(self, url, pages, manifest=None):
+        self._call("summarize")
+        return "Acme builds anvils."
+
+    def reuse_or_create_workspace(self, title, description, workspace_id=None):
+        self._call("workspace")
+        self.workspace_started.set()
+        return workspace_id or "ws-1", workspace_id is not None
+
+    def load_predefined_intents_and_actions(self):
+        return [], []
+
+    def get_intents_and_actions(self, summary, templates=None, index=None):
+        self._call("intents")
+        return [{"intent": "hours"}], [{"action_name": "hours"}]
+
+    def generate_intents_and_actions(self, intents, actions, workspace_id):
+        self._call("upload")
+        return []
+
+    def generate_watson_workspace_json(self, intents, actions, **kwargs):
+        return {"intents": intents, "dialog_nodes": actions}
+
+    def get_artifact_store(self):
+        done = SimpleNamespace(result=lambda: None)
+        return SimpleNamespace(put=lambda *args: SimpleNamespace(written=done))
+
+
+@pytest.fixture
+def site(monkeypatch, tmp_path):
+    monkeypatch.setattr(manifest, "MANIFEST_DIR", str(tmp_path / "manifests"))
+    monkeypatch.setattr(vector_index, "INDEX_DIR", str(tmp_path / "indexes"))
+    return Site(monkeypatch)
+
+
+def test_workspace_is_created_while_the_site_is_crawled(site, tmp_path):
+    site.wait_for_workspace = True
+    state = pipeline.build_assistant(URL, checkpoint_dir=str(tmp_path))
+
+    assert state["status"] == "done"
+    assert state["title"] == "Acme"
+    assert state["workspace_id"] == "ws-1"
+
+
+def test_failed_crawl_fails_the_workspace_without_creating_it(site, tmp_path):
+    site.fail.add("crawl")
+    state = pipeline.build_assistant(URL, checkpoint_dir=str(tmp_path))
+
+    assert state["status"] == "failed"
+    assert "workspace" not in site.calls
+
+
+def test_failed_build_resumes_from_its_unfinished_stages(site, tmp_path):
+    site.fail.add("intents")
+    state = pipeline.build_assistant(URL, checkpoint_dir=str(tmp_path))
+    assert state["status"] == "failed"
+    assert "intents: intents failed" in state["error"]
+
+    site.fail.clear()
+    site.calls.clear()
+    state = pipeline.build_assistant(URL, checkpoint_dir=str(tmp_path))
+
+    assert state["status"] == "done"
+    assert sorted(site.calls) == ["intents", "upload"]
+    assert state["workspace_id"] == "ws-1"
+    assert "error" not in state
+
+
+def test_finished_build_is_not_repeated_unless_restarted(site, tmp_path):
+    pipeline.build_assistant(URL, checkpoint_dir=str(tmp_path))
+    site.calls.clear()
+
+    assert pipeline.build_assistant(URL, checkpoint_dir=str(tmp_path))["status"] == "done"
+    assert site.calls == []
+
+    pipeline.build_assistant(URL, checkpoint_dir=str(tmp_path), restart=True)
+    assert "crawl" in site.calls
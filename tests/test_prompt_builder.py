@@ -0,0 +1,89 @@
+import json
+
+from utils.prompt_builder import (
+    TRIM_MARKER,
+    PromptBuilder,
+    serialize_actions,
+    serialize_intents,
+    trim_to_tokens,
+)
+from utils.tokenizer import count_tokens
+
+INTENTS = [
+    {"intent": "hours", "examples": [{"text": "When are you open?"}]},
+    {"intent": "parking", "examples": []},
+]
+ACTIONS = [
+    {"action_name": "greet", "conditions": "#hello", "output_text": "Hi!"},
+    {"action_name": "fallback", "conditions": "", "output_text": ""},
+]
+
+LONG = "\n".join(f"Line {i}: " + "lorem ipsum dolor sit amet " * 5 for i in range(40))
+
+
+def test_trim_to_tokens_keeps_short_text():
+    assert trim_to_tokens("short text", 100) == "short text"
+
+
+def test_trim_to_tokens_keeps_whole_lines_then_cuts_at_a_word():
+    trimmed = trim_to_tokens(LONG, 100)
+    assert trimmed.endswith(TRIM_MARKER)
+    assert count_tokens(trimmed) <= 100
+    body = trimmed[: -len(TRIM_MARKER)]
+    lines = body.split("\n")
+    assert lines[:-1] == LONG.split("\n")[: len(lines) - 1]
+    assert LONG.split("\n")[len(lines) - 1].startswith(lines[-1])
+
+
+def test_serializers_write_names_by_default():
+    assert serialize_intents(INTENTS, "names") == "- hours: 1 examples\n- parking: no examples"
+    assert serialize_actions(ACTIONS, "names") == (
+        "- greet: #hello\n- fallback: no conditions, no output_text"
+    )
+
+
+def test_compact_serializers_are_minified_json():
+    assert json.loads(serialize_intents(INTENTS, "compact")) == INTENTS
+    assert " " not in serialize_actions(ACTIONS, "compact").replace("no ", "")
+    assert len(serialize_intents(INTENTS, "compact")) < len(serialize_intents(INTENTS, "full"))
+
+
+def test_builder_keeps_a_prompt_within_budget_untouched():
+    builder = PromptBuilder(budget=1000)
+    builder.add("instructions", "  Summarize the website.  ")
+    builder.add("content", "A small website.", trim=True)
+    assert builder.build() == "Summarize the website.\n\nA small website."
+    assert builder.stats["trimmed"] == []
+    assert builder.stats["saved_tokens"] == 0
+
+
+def test_builder_trims_the_last_trimmable_section_first():
+    builder = PromptBuilder(budget=300)
+    builder.add("instructions", "Summarize the website.")
+    builder.add("summary", "Acme sells anvils.", trim=True)
+    builder.add("content", LONG, trim=True)
+    builder.add("format", "Return JSON.")
+    prompt = builder.build()
+
+    assert builder.stats["trimmed"] == ["content"]
+    assert builder.stats["tokens"] <= 300
+    assert prompt.startswith("Summarize the website.\n\nAcme sells anvils.\n\nLine 0:")
+    assert prompt.endswith(TRIM_MARKER + "\n\nReturn JSON.")
+
+
+def test_builder_trims_earlier_sections_when_the_last_is_not_enough():
+    builder = PromptBuilder(budget=300)
+    builder.add("summary", LONG, trim=True)
+    builder.add("content", LONG, trim=True)
+    builder.build()
+    assert builder.stats["trimmed"] == ["content", "summary"]
+    assert builder.stats["tokens"] <= 300
+
+
+def test_builder_reports_the_tokens_saved_against_the_baseline():
+    full = serialize_intents(INTENTS, "full")
+    builder = PromptBuilder(budget=1000)
+    builder.add("intents", serialize_intents(INTENTS, "names"), baseline=full)
+    builder.build()
+    assert builder.stats["baseline_tokens"] == count_tokens(full) + 2
+    assert builder.stats["saved_tokens"] > 0
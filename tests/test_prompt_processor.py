@@ -0,0 +1,91 @@
+from types import SimpleNamespace
+
+import pytest
+
+from utils import prompt_processor
+from utils.llm_cache import LLMCache
+from utils.prompt_processor import UserPrompt, forget_response, process_prompt, stream_prompt
+
+
+class LLM:
+    """
+    Fake TogetherLLM answering every prompt with the same text.
+    """
+
+    def __init__(self, text="The answer", fail_after=None):
+        self.text = text
+        self.fail_after = fail_after
+        self.calls = 0
+
+    def chat(self, messages):
+        self.calls += 1
+        return SimpleNamespace(message=SimpleNamespace(content=self.text), raw={})
+
+    def stream_chat(self, messages):
+        self.calls += 1
+        for position, word in enumerate(self.text.split(" ")):
+            if position == self.fail_after:
+                raise ConnectionResetError("stream broke off")
+            yield SimpleNamespace(delta=word if not position else f" {word}", raw=None)
+
+
+@pytest.fixture
+def llm(monkeypatch):
+    llm = LLM()
+    monkeypatch.setattr(prompt_processor.LLMClient, "get_instance", lambda model: llm)
+    monkeypatch.setattr(prompt_processor, "_chat_messages", lambda text: [text])
+    return llm
+
+
+@pytest.fixture
+def cache(monkeypatch, tmp_path):
+    cache = LLMCache(path=str(tmp_path / "llm.sqlite3"))
+    monkeypatch.setattr(prompt_processor, "get_llm_cache", lambda: cache)
+    return cache
+
+
+def test_responses_are_cached(llm, cache):
+    prompt = UserPrompt(text="What does Acme sell?")
+    assert process_prompt(prompt) == "The answer"
+    assert process_prompt(prompt) == "The answer"
+    assert "".join(stream_prompt(prompt)) == "The answer"
+    assert llm.calls == 1
+
+
+def test_forgotten_responses_are_asked_again(llm, cache):
+    prompt = UserPrompt(text="What does Acme sell?")
+    process_prompt(prompt)
+    forget_response(prompt)
+    process_prompt(prompt)
+    assert llm.calls == 2
+
+
+def test_an_unavailable_cache_never_fails_a_prompt(llm, monkeypatch):
+    def unavailable():
+        raise PermissionError("samples/cache is read-only")
+
+    monkeypatch.setattr(prompt_processor, "get_llm_cache", unavailable)
+    prompt = UserPrompt(text="What does Acme sell?")
+    assert process_prompt(prompt) == "The answer"
+    assert "".join(stream_prompt(prompt)) == "The answer"
+    forget_response(prompt)
+
+
+def test_streamed_responses_are_cached(llm, cache):
+    llm.text = "one two three"
+    prompt = UserPrompt(text="Count to three")
+    assert list(stream_prompt(prompt)) == ["one", " two", " three"]
+    assert list(stream_prompt(prompt)) == ["one two three"]
+    assert process_prompt(prompt) == "one two three"
+    assert llm.calls == 1
+
+
+def test_broken_streams_raise_and_are_not_cached(llm, cache):
+    llm.text, llm.fail_after = "one two three", 2
+    prompt = UserPrompt(text="Count to three")
+    pieces = []
+    with pytest.raises(ConnectionResetError):
+        for piece in stream_prompt(prompt):
+            pieces.append(piece)
+    assert pieces == ["one", " two"]
+    assert cache.get(prompt.model, prompt.text) is None
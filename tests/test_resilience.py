@@ -0,0 +1,161 @@
+import time
+import threading
+
+import pytest
+import requests
+from ibm_cloud_sdk_core import ApiException
+
+from utils.resilience import (
+    CircuitBreaker,
+    CircuitOpenError,
+    Provider,
+    TokenBucket,
+    is_retryable,
+    retry_after,
+)
+
+
+def response(status, headers=None):
+    # A real response, which is falsy for error statuses
+    response = requests.Response()
+    response.status_code = status
+    response.headers.update(headers or {})
+    return response
+
+
+def http_error(status, headers=None):
+    return requests.HTTPError(f"HTTP {status}", response=response(status, headers))
+
+
+class Stream:
+    def __init__(self, name):
+        self.name = name
+        self.closed = False
+
+    def close(self):
+        self.closed = True
+
+
+def provider(threshold=2, max_attempts=3):
+    provider = Provider("test", rate=1000, burst=100, max_attempts=max_attempts, base_delay=0)
+    provider.breaker = CircuitBreaker(threshold, reset_timeout=60)
+    return provider
+
+
+def failing(*errors, result="ok"):
+    errors = list(errors)
+    calls = []
+
+    def func():
+        calls.append(time.monotonic())
+        if errors:
+            raise errors.pop(0)
+        return result
+
+    return func, calls
+
+
+def test_token_bucket_allows_a_burst_then_the_rate():
+    bucket = TokenBucket(rate=50, burst=3)
+    assert [bucket.acquire() for _ in range(3)] == [0.0, 0.0, 0.0]
+    assert bucket.acquire() == pytest.approx(0.02, abs=0.01)
+
+
+def test_token_bucket_pause_holds_back_callers():
+    bucket = TokenBucket(rate=1000, burst=10)
+    bucket.pause(0.05)
+    assert bucket.acquire() >= 0.04
+
+
+def test_circuit_breaker_opens_and_allows_a_single_trial():
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=0.01)
+    assert breaker.record_failure() is False
+    assert breaker.record_failure() is True
+    assert not breaker.allow()
+    time.sleep(0.02)
+    assert breaker.allow()
+    assert breaker.state == "half_open"
+    assert not breaker.allow()
+    breaker.record_success()
+    assert breaker.state == "closed"
+
+
+def test_errors_are_classified_by_status_and_type():
+    assert is_retryable(http_error(503))
+    assert is_retryable(http_error(429))
+    assert not is_retryable(http_error(400))
+    assert is_retryable(TimeoutError())
+    assert not is_retryable(ValueError())
+    assert retry_after(http_error(429, {"Retry-After": "3"})) == 3.0
+
+
+def test_watson_errors_are_read_from_their_http_response():
+    error = ApiException(429, http_response=response(429, {"Retry-After": "7"}))
+    assert is_retryable(error)
+    assert retry_after(error) == 7.0
+    assert not is_retryable(ApiException(409, http_response=response(409)))
+
+
+def test_transient_errors_are_retried():
+    target = provider()
+    func, calls = failing(http_error(503), http_error(502))
+    assert target.call(func) == "ok"
+    assert len(calls) == 3
+    assert target.metrics["retries"] == 2
+    assert target.metrics["circuit"] == "closed"
+
+
+def test_client_errors_are_not_retried():
+    target = provider()
+    func, calls = failing(http_error(400))
+    with pytest.raises(requests.HTTPError):
+        target.call(func)
+    assert len(calls) == 1
+
+
+def test_only_exhausted_calls_open_the_circuit():
+    target = provider(threshold=2)
+    for _ in range(2):
+        func, _ = failing(*[http_error(503)] * 3)
+        with pytest.raises(requests.HTTPError):
+            target.call(func)
+    assert target.metrics["circuit"] == "open"
+    assert target.metrics["circuit_opens"] == 1
+
+    func, calls = failing()
+    with pytest.raises(CircuitOpenError):
+        target.call(func)
+    assert calls == []
+
+
+def test_rate_limits_never_open_the_circuit():
+    target = provider(threshold=1)
+    for _ in range(3):
+        func, _ = failing(*[http_error(429)] * 3)
+        with pytest.raises(requests.HTTPError):
+            target.call(func)
+    assert target.metrics["circuit"] == "closed"
+
+
+def test_hedged_call_returns_the_fastest_and_closes_the_loser():
+    target = provider()
+    streams, release = [], threading.Event()
+
+    def func():
+        stream = Stream(len(streams))
+        streams.append(stream)
+        if stream.name == 0:
+            # The first request stalls until the hedge has won
+            release.wait(5)
+        return stream
+
+    result = target.call(func, hedge_after=0.02)
+    assert result.name == 1
+    release.set()
+    for _ in range(100):
+        if streams[0].closed:
+            break
+        time.sleep(0.01)
+    assert streams[0].closed
+    assert not result.closed
+    assert target.metrics["hedge_wins"] == 1
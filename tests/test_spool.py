@@ -0,0 +1,67 @@
+import os
+
+from utils.spool import PageRecord, PageSpool
+from utils.summarizer import iter_chunks
+from utils.tokenizer import count_tokens
+
+
+def record(name, text="Some text"):
+    return PageRecord(f"https://example.com/{name}", name.title(), text, name)
+
+
+def test_spool_reads_records_back_in_order(tmp_path):
+    with PageSpool(str(tmp_path)) as pages:
+        for name in ("home", "about", "contact"):
+            pages.append(record(name))
+        assert len(pages) == 3
+        assert [page.title for page in pages] == ["Home", "About", "Contact"]
+        # The spool can be iterated again, and appended to in between
+        pages.append(record("careers"))
+        assert [page.title for page in pages][-1] == "Careers"
+        assert pages.bytes_written == os.path.getsize(pages.path)
+
+
+def test_spool_skips_discarded_records(tmp_path):
+    with PageSpool(str(tmp_path)) as pages:
+        pages.append(record("home"))
+        pages.append(record("about"))
+        pages.discard("https://example.com/home")
+        assert len(pages) == 1
+        assert [page.url for page in pages] == ["https://example.com/about"]
+
+
+def test_spool_keeps_unicode_text(tmp_path):
+    with PageSpool(str(tmp_path)) as pages:
+        pages.append(record("cafe", "Café — ouvert 7j/7\nline two"))
+        assert next(iter(pages)).text == "Café — ouvert 7j/7\nline two"
+
+
+def test_spool_file_is_removed_on_close(tmp_path):
+    pages = PageSpool(str(tmp_path))
+    pages.append(record("home"))
+    pages.close()
+    assert not os.path.exists(pages.path)
+    pages.close()
+
+
+def test_iter_chunks_packs_texts_lazily_within_the_budget():
+    consumed = []
+
+    def texts():
+        for i in range(20):
+            consumed.append(i)
+            yield f"page {i} " + "word " * 40
+
+    chunks = iter_chunks(texts(), budget=120)
+    first = next(chunks)
+    assert len(consumed) < 20
+    rest = list(chunks)
+    for chunk in [first, *rest]:
+        assert sum(count_tokens(text) for text in chunk.split("\n\n")) <= 120
+    assert sum(chunk.count("page ") for chunk in [first, *rest]) == 20
+
+
+def test_iter_chunks_splits_a_text_larger_than_the_budget():
+    chunks = list(iter_chunks(["word " * 500], budget=100))
+    assert len(chunks) > 1
+    assert " ".join(chunks).split() == ["word"] * 500
@@ -0,0 +1,88 @@
+import pytest
+
+from utils import summarizer
+from utils.summarizer import split_pages, summarize_content
+from utils.tokenizer import count_tokens
+
+
+class LLM:
+    """
+    Fake process_prompt / stream_prompt recording the kind of every prompt.
+    """
+
+    def __init__(self, monkeypatch, summary="word " * 10):
+        self.summary = summary
+        self.prompts = []
+        monkeypatch.setattr(summarizer, "process_prompt", self.process_prompt)
+        monkeypatch.setattr(summarizer, "stream_prompt", self.stream_prompt)
+
+    def process_prompt(self, prompt):
+        if "Summarize the following pages" in prompt.text:
+            self.prompts.append("map")
+            return None if "Title: broken" in prompt.text else self.summary
+        if "partial summaries" in prompt.text:
+            self.prompts.append("merge")
+            return self.summary
+        self.prompts.append("final")
+        return "Summary"
+
+    def stream_prompt(self, prompt):
+        self.prompts.append("stream")
+        yield "Summary"
+
+
+@pytest.fixture
+def llm(monkeypatch):
+    return LLM(monkeypatch)
+
+
+def content(pages, words=60):
+    return "\n\n".join(f"Title: {name}\n" + "word " * words for name in pages)
+
+
+def test_split_pages_returns_one_text_per_page():
+    assert split_pages("Title: Home\nWelcome\n\nTitle: About\nSince 1949\n\n") == [
+        "Title: Home\nWelcome",
+        "Title: About\nSince 1949",
+    ]
+
+
+def test_small_content_takes_a_single_prompt(llm):
+    assert summarize_content(content(["Home", "About"], words=10), budget=400) == "Summary"
+    assert llm.prompts == ["final"]
+
+
+def test_chunks_are_summarized_then_summarized_once_more(llm):
+    assert summarize_content(content(["Home", "About", "Contact"]), budget=100) == "Summary"
+    assert llm.prompts == ["map"] * 3 + ["final"]
+
+
+def test_partial_summaries_are_merged_until_they_fit(llm):
+    summarize_content(content([f"Page {i}" for i in range(12)]), budget=100)
+
+    assert llm.prompts.count("map") == 12
+    assert llm.prompts.count("merge") > 1
+    assert llm.prompts[-1] == "final"
+    assert llm.prompts.index("merge") > llm.prompts.index("map")
+
+
+def test_failed_chunks_are_left_out(llm):
+    assert summarize_content(content(["Home", "broken"]), budget=100) == "Summary"
+    assert llm.prompts == ["map", "map", "final"]
+
+
+def test_nothing_is_summarized_when_every_chunk_failed(llm):
+    assert summarize_content(content(["broken", "broken"]), budget=100) is None
+    assert "final" not in llm.prompts
+
+
+def test_final_summary_can_be_streamed(llm):
+    summary = summarize_content(content(["Home", "About"]), budget=100, stream=True)
+    assert "".join(summary) == "Summary"
+    assert llm.prompts == ["map", "map", "stream"]
+
+
+def test_chunks_fit_the_budget():
+    chunks = summarizer.chunk_texts(split_pages(content(["Home", "About", "Contact"], 30)), 100)
+    assert len(chunks) == 2
+    assert all(count_tokens(chunk) <= 100 for chunk in chunks)
@@ -0,0 +1,80 @@
+import json
+import os
+
+import pytest
+
+from utils.templates import TemplateRegistry
+
+HOURS = {"intent": "hours", "examples": [{"text": "When are you open?"}]}
+
+
+def write(path, templates):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(templates), encoding="utf-8")
+    # Bump the modification time, so a rewrite within the same tick is seen
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+
+
+@pytest.fixture
+def dirs(tmp_path):
+    intents, actions = tmp_path / "intents", tmp_path / "actions"
+    write(intents / "common.json", [HOURS, {"intent": "parking", "examples": []}])
+    write(actions / "common.json", [{"action_name": "hours", "conditions": "#hours"}])
+    return intents, actions
+
+
+def registry(dirs, reload_interval=0):
+    return TemplateRegistry(str(dirs[0]), str(dirs[1]), reload_interval=reload_interval)
+
+
+def test_templates_are_indexed_by_name(dirs):
+    templates = registry(dirs)
+    intents, actions = templates.templates(None)
+
+    assert [intent["intent"] for intent in intents] == ["hours", "parking"]
+    assert [action["action_name"] for action in actions] == ["hours"]
+    assert templates.intent("hours", None) == HOURS
+    assert templates.action("parking", None) is None
+
+
+def test_vertical_templates_override_the_common_ones(dirs):
+    clinic_hours = {"intent": "hours", "examples": [{"text": "When can I see a doctor?"}]}
+    write(dirs[0] / "healthcare" / "intents.json", [clinic_hours, {"intent": "appointments"}])
+    templates = registry(dirs)
+
+    intents, _ = templates.templates("healthcare")
+    assert [intent["intent"] for intent in intents] == ["hours", "parking", "appointments"]
+    assert templates.intent("hours", "healthcare") == clinic_hours
+    assert templates.intent("hours", None) == HOURS
+    assert templates.intent("parking", "healthcare")["intent"] == "parking"
+    assert templates.verticals == ["healthcare"]
+
+
+def test_invalid_templates_are_skipped(dirs):
+    write(dirs[0] / "broken.json", [{"examples": []}, {"intent": "faq", "examples": ["x"]}])
+    write(dirs[1] / "broken.json", {"action_name": "not a list"})
+    (dirs[0] / "unreadable.json").write_text("{", encoding="utf-8")
+
+    intents, actions = registry(dirs).templates(None)
+    assert [intent["intent"] for intent in intents] == ["hours", "parking"]
+    assert len(actions) == 1
+
+
+def test_changed_files_are_reloaded(dirs):
+    templates = registry(dirs)
+    templates.templates(None)
+
+    write(dirs[0] / "common.json", [HOURS])
+    write(dirs[0] / "extra.json", [{"intent": "returns", "examples": []}])
+    intents, _ = templates.templates(None)
+
+    assert [intent["intent"] for intent in intents] == ["hours", "returns"]
+    assert templates.intent("parking", None) is None
+
+
+def test_files_are_not_checked_again_within_the_reload_interval(dirs):
+    templates = registry(dirs, reload_interval=3600)
+    templates.templates(None)
+    write(dirs[0] / "common.json", [HOURS])
+    assert len(templates.templates(None)[0]) == 2
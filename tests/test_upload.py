@@ -0,0 +1,81 @@
+import pytest
+
+from utils import ibm_waston
+from utils.ibm_waston import generate_intents_and_actions
+
+INTENTS = [
+    {"intent": "hours", "examples": [{"text": "When are you open?"}]},
+    {"intent": "parking", "examples": [{"text": "Where can I park?"}]},
+    "not an intent",
+]
+ACTIONS = [{"action_name": "hours", "conditions": "#hours", "output_text": "9 to 5"}]
+
+
+class Watson:
+    """
+    Fake Watson calls, failing the methods and items it is told to.
+    """
+
+    def __init__(self, fail=()):
+        self.fail = set(fail)
+        self.calls = []
+        self.payloads = []
+
+    def __call__(self, method, **kwargs):
+        name = kwargs.get("intent") or kwargs.get("dialog_node")
+        self.calls.append((method, name))
+        self.payloads.append(kwargs)
+        if method in self.fail or name in self.fail:
+            raise RuntimeError(f"{method} failed")
+        return {}
+
+
+@pytest.fixture
+def watson(monkeypatch):
+    def install(*fail):
+        watson = Watson(fail)
+        monkeypatch.setattr(ibm_waston, "_watson", watson)
+        return watson
+
+    return install
+
+
+def test_everything_is_uploaded_in_one_workspace_update(watson):
+    fake = watson()
+    assert generate_intents_and_actions(INTENTS, ACTIONS, "ws-1") == []
+    assert fake.calls == [("update_workspace", None)]
+
+    update = fake.payloads[0]
+    assert [intent["intent"] for intent in update["intents"]] == ["hours", "parking"]
+    assert update["dialog_nodes"][0] == {
+        "dialog_node": "hours",
+        "conditions": "#hours",
+        "output": {"text": "9 to 5"},
+        "title": "hours",
+        "description": "Action for hours",
+    }
+    assert update["append"] is True
+
+
+def test_failed_workspace_update_falls_back_to_single_items(watson):
+    fake = watson("update_workspace")
+    assert generate_intents_and_actions(INTENTS, ACTIONS, "ws-1") == []
+    assert sorted(fake.calls[1:]) == [
+        ("create_dialog_node", "hours"),
+        ("create_intent", "hours"),
+        ("create_intent", "parking"),
+    ]
+
+
+def test_items_that_still_fail_are_reported(watson):
+    watson("update_workspace", "parking")
+    assert generate_intents_and_actions(INTENTS, ACTIONS, "ws-1") == [
+        ("intent 'parking'", "create_intent failed")
+    ]
+
+
+def test_items_can_be_uploaded_without_the_workspace_update(watson):
+    fake = watson()
+    generate_intents_and_actions(INTENTS, ACTIONS, "ws-1", bulk=False)
+    assert "update_workspace" not in [method for method, _ in fake.calls]
+    assert len(fake.calls) == 3
@@ -0,0 +1,67 @@
+import pytest
+
+from utils import vector_index
+from utils.vector_index import (
+    HashingEmbedder,
+    VectorIndex,
+    chunk_page,
+    retrieve_intent_context,
+)
+
+URL = "https://acme.test/"
+
+
+@pytest.fixture
+def index(monkeypatch, tmp_path):
+    monkeypatch.setattr(vector_index, "INDEX_DIR", str(tmp_path))
+    index = VectorIndex(HashingEmbedder())
+    index.add_page(URL + "jobs", "Careers", "We are hiring welders and engineers, join our team.")
+    index.add_page(URL + "contact", "Contact", "Call us or write to our office in Phoenix.")
+    index.add_page(URL + "history", "History", "Acme was founded in 1949 in the desert.")
+    return index
+
+
+def test_chunk_page_prefixes_every_chunk_with_the_title():
+    chunks = chunk_page("Home", "one two three four five", words=2)
+    assert chunks == ["Home: one two", "Home: three four", "Home: five"]
+
+
+def test_search_finds_the_most_similar_chunks_first(index):
+    results = index.search("Are you hiring engineers?", k=2)
+
+    assert len(results) == 2
+    assert results[0][1]["url"] == URL + "jobs"
+    assert results[0][0] > results[1][0]
+    assert VectorIndex(HashingEmbedder()).search("anything") == []
+
+
+def test_removed_pages_are_no_longer_found(index):
+    index.vectors
+    index.remove_page(URL + "jobs")
+    index.add_page(URL + "news", "News", "A new anvil is out.")
+    index.remove_page(URL + "news")
+
+    assert len(index) == 2
+    assert {chunk["url"] for _, chunk in index.search("hiring", k=5)} == {
+        URL + "contact",
+        URL + "history",
+    }
+
+
+def test_saved_index_is_loaded_with_the_same_embedder(index):
+    index.save(URL)
+    loaded = VectorIndex.load(URL, HashingEmbedder())
+
+    assert loaded.chunks == index.chunks
+    assert loaded.search("founded")[0][1]["url"] == URL + "history"
+    assert VectorIndex.load(URL, HashingEmbedder(dim=64)) is None
+    assert VectorIndex.load("https://other.test/", HashingEmbedder()) is None
+
+
+def test_every_chunk_is_retrieved_for_the_intent_it_matches_best(index):
+    context = retrieve_intent_context(index, k=3)
+
+    assert context["careers"][0].startswith("Careers:")
+    assert context["company_history"][0].startswith("History:")
+    chunks = [text for texts in context.values() for text in texts]
+    assert len(chunks) == len(set(chunks))
@@ -0,0 +1,144 @@
+import json
+import threading
+
+from utils import ibm_waston
+from utils.workspace_catalog import WorkspaceCatalog, format_workspace
+
+
+def workspace(workspace_id, name=None):
+    return {"workspace_id": workspace_id, "name": name or workspace_id.upper()}
+
+
+class Account:
+    """
+    Fake list_workspaces API, paginated two workspaces per page.
+    """
+
+    def __init__(self, *workspaces):
+        self.workspaces = list(workspaces)
+        self.calls = 0
+        self.listing = None  # Event set while a page is fetched, if given
+        self.resume = None
+
+    def __call__(self, cursor):
+        self.calls += 1
+        if self.listing is not None:
+            self.listing.set()
+            self.resume.wait(5)
+        start = int(cursor or 0)
+        page = {"workspaces": self.workspaces[start : start + 2]}
+        if start + 2 < len(self.workspaces):
+            page["pagination"] = {"next_cursor": str(start + 2)}
+        return page
+
+
+def test_format_workspace_fills_defaults():
+    assert format_workspace(workspace("a")) == {
+        "id": "a",
+        "name": "A",
+        "description": "No description provided",
+        "created": "",
+        "updated": "",
+    }
+
+
+def test_lookups_list_every_page_once():
+    account = Account(workspace("a"), workspace("b", "Shared"), workspace("c", "Shared"))
+    catalog = WorkspaceCatalog(account, ttl=60)
+
+    assert [ws["id"] for ws in catalog.all()] == ["a", "b", "c"]
+    assert catalog.get("a")["name"] == "A"
+    assert catalog.get("missing") is None
+    assert [ws["id"] for ws in catalog.find("Shared")] == ["b", "c"]
+    assert account.calls == 2
+
+
+def test_invalidate_reloads_on_the_next_lookup():
+    account = Account(workspace("a"))
+    catalog = WorkspaceCatalog(account, ttl=60)
+    catalog.all()
+    account.workspaces.append(workspace("b"))
+    assert catalog.get("b") is None
+
+    catalog.invalidate()
+    assert catalog.get("b")["name"] == "B"
+
+
+def test_put_and_remove_update_the_index():
+    catalog = WorkspaceCatalog(Account(workspace("a")), ttl=60)
+    catalog.all()
+    catalog.put({"id": "a", "name": "Renamed"})
+    catalog.put(format_workspace(workspace("n", "New")))
+
+    assert catalog.find("A") == []
+    assert catalog.find("Renamed")[0]["description"] == "No description provided"
+    catalog.remove("n")
+    assert [ws["id"] for ws in catalog.all()] == ["a"]
+
+
+def test_changes_during_a_refresh_are_kept():
+    account = Account(workspace("a"), workspace("b"))
+    catalog = WorkspaceCatalog(account, ttl=60)
+    catalog.all()
+
+    account.listing, account.resume = threading.Event(), threading.Event()
+    refresh = threading.Thread(target=catalog.refresh)
+    refresh.start()
+    account.listing.wait(5)
+    # Created, renamed and deleted after the listing was read
+    catalog.put(format_workspace(workspace("n", "New")))
+    catalog.put({"id": "a", "name": "Renamed"})
+    catalog.remove("b")
+    account.resume.set()
+    refresh.join(5)
+
+    assert sorted((ws["id"], ws["name"]) for ws in catalog.all()) == [
+        ("a", "Renamed"),
+        ("n", "New"),
+    ]
+
+
+def test_catalog_is_warm_started_from_its_file(tmp_path):
+    path = str(tmp_path / "catalog.json")
+    account = Account(workspace("a"))
+    WorkspaceCatalog(account, ttl=60, path=path).all()
+
+    restarted = Account()
+    assert WorkspaceCatalog(restarted, ttl=60, path=path).get("a")["name"] == "A"
+    assert restarted.calls == 0
+    # A saved index older than the TTL is listed again
+    assert WorkspaceCatalog(restarted, ttl=0, path=path).get("a") is None
+
+
+def test_changes_before_any_listing_are_not_saved(tmp_path):
+    path = tmp_path / "catalog.json"
+    catalog = WorkspaceCatalog(Account(), ttl=60, path=str(path))
+    catalog.put(format_workspace(workspace("n", "New")))
+    catalog.remove("n")
+    assert not path.exists()
+
+
+def test_changes_keep_the_time_of_the_saved_listing(tmp_path):
+    path = str(tmp_path / "catalog.json")
+    catalog = WorkspaceCatalog(Account(workspace("a")), ttl=60, path=path)
+    catalog.all()
+    with open(path, encoding="utf-8") as f:
+        listed_at = json.load(f)["saved_at"]
+
+    catalog.put(format_workspace(workspace("n", "New")))
+    with open(path, encoding="utf-8") as f:
+        saved = json.load(f)
+    assert saved["saved_at"] == listed_at
+    assert [ws["id"] for ws in saved["workspaces"]] == ["a", "n"]
+
+
+def test_renamed_workspace_keeps_its_timestamps(monkeypatch):
+    catalog = WorkspaceCatalog(Account(), ttl=60)
+    catalog.all()
+    catalog.put({**format_workspace(workspace("a")), "created": "2024-01-01T00:00:00Z"})
+    monkeypatch.setattr(ibm_waston, "get_workspace_catalog", lambda: catalog)
+    monkeypatch.setattr(ibm_waston, "_watson", lambda method, **kwargs: {})
+
+    ibm_waston.rename_workspace("a", "Acme", "I'm an IBM Watson Assistant for Acme")
+    assert catalog.get("a")["name"] == "Acme"
+    assert catalog.get("a")["created"] == "2024-01-01T00:00:00Z"
@@ -0,0 +1,129 @@
+from datetime import datetime, timezone
+
+import pytest
+
+from utils import workspace_pool
+from utils.workspace_pool import (
+    MANAGED_DESCRIPTION,
+    POOL_PREFIX,
+    QUOTA_ERROR,
+    WorkspacePool,
+)
+
+NOW = datetime.now(timezone.utc).isoformat()
+
+
+class Account:
+    """
+    Fake Watson account holding at most `quota` workspaces.
+    """
+
+    def __init__(self, monkeypatch, quota=3):
+        self.quota = quota
+        self.workspaces = {}
+        self.created = 0
+        for name in (
+            "create_workspace",
+            "delete_workspace",
+            "list_workspaces",
+            "rename_workspace",
+        ):
+            monkeypatch.setattr(workspace_pool, name, getattr(self, name))
+
+    def add(self, workspace_id, name, description, updated):
+        self.workspaces[workspace_id] = {
+            "id": workspace_id,
+            "name": name,
+            "description": description,
+            "created": updated,
+            "updated": updated,
+        }
+
+    def create_workspace(self, name, description):
+        if len(self.workspaces) >= self.quota:
+            raise RuntimeError(f"{QUOTA_ERROR} for this plan")
+        self.created += 1
+        workspace_id = f"new-{self.created}"
+        self.add(workspace_id, name, description, NOW)
+        return workspace_id
+
+    def delete_workspace(self, workspace_id):
+        return self.workspaces.pop(workspace_id, None) is not None
+
+    def list_workspaces(self):
+        return [dict(workspace) for workspace in self.workspaces.values()]
+
+    def rename_workspace(self, workspace_id, name, description):
+        self.workspaces[workspace_id].update(name=name, description=description, updated=NOW)
+
+
+def settle(pool):
+    # Wait for the background refill
+    pool._background.submit(lambda: None).result(5)
+
+
+@pytest.fixture
+def account(monkeypatch):
+    return Account(monkeypatch)
+
+
+def built(account, workspace_id, updated="2020-01-01T00:00:00Z"):
+    account.add(workspace_id, workspace_id, f"{MANAGED_DESCRIPTION}{workspace_id}", updated)
+
+
+def test_builds_get_a_pre_created_workspace_and_the_pool_is_refilled(account):
+    pool = WorkspacePool(size=1, quota=account.quota)
+    pool.refill()
+    settle(pool)
+    spare = next(iter(account.workspaces))
+
+    assert pool.acquire("Acme", f"{MANAGED_DESCRIPTION}Acme") == spare
+    settle(pool)
+    assert account.workspaces[spare]["name"] == "Acme"
+    assert len(account.workspaces) == 2
+    assert list(pool._warm) != [spare]
+
+
+def test_pre_created_workspaces_of_a_previous_process_are_reused(account):
+    account.add("old-spare", f"{POOL_PREFIX}1234", "Pre-created", NOW)
+    pool = WorkspacePool(size=1, quota=account.quota)
+
+    assert pool.acquire("Acme", f"{MANAGED_DESCRIPTION}Acme") == "old-spare"
+    settle(pool)
+    assert account.workspaces["old-spare"]["name"] == "Acme"
+
+
+def test_builds_at_the_quota_recycle_the_least_recently_updated_workspace(account):
+    built(account, "older", "2020-01-01T00:00:00Z")
+    built(account, "old", "2021-01-01T00:00:00Z")
+    account.add("foreign", "Payroll bot", "Built by hand", "2019-01-01T00:00:00Z")
+    pool = WorkspacePool(size=0, quota=account.quota)
+
+    workspace_id = pool.acquire("Acme", f"{MANAGED_DESCRIPTION}Acme")
+    assert set(account.workspaces) == {"old", "foreign", workspace_id}
+
+
+def test_recent_and_foreign_workspaces_are_never_recycled(account):
+    built(account, "recent", NOW)
+    account.add("foreign", "Payroll bot", "Built by hand", "2019-01-01T00:00:00Z")
+    pool = WorkspacePool(size=0, quota=account.quota)
+    built_id = pool.acquire("Acme", f"{MANAGED_DESCRIPTION}Acme")
+
+    with pytest.raises(RuntimeError, match=QUOTA_ERROR):
+        pool.acquire("Globex", f"{MANAGED_DESCRIPTION}Globex")
+    assert set(account.workspaces) == {"recent", "foreign", built_id}
+
+
+def test_refill_stops_at_the_quota_unless_recycling_is_enabled(account, monkeypatch):
+    for workspace_id in ("a", "b", "c"):
+        built(account, workspace_id)
+    pool = WorkspacePool(size=1, quota=account.quota)
+    pool.refill()
+    settle(pool)
+    assert set(account.workspaces) == {"a", "b", "c"}
+
+    monkeypatch.setattr(workspace_pool, "WORKSPACE_POOL_RECYCLE", True)
+    pool.refill()
+    settle(pool)
+    assert len(pool._warm) == 1
+    assert set(account.workspaces) == {"b", "c", pool._warm[0]}
@@ -0,0 +1,218 @@
+import re
+import json
+import threading
+import numpy as np
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from utils.artifacts import decompress
+from utils.logger import get_logger
+
+log = get_logger(__name__)
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9']+")
+CONDITION_INTENT = re.compile(r"#([\w-]+)")
+
+# Intent returned when no intent is confident enough, as in Watson Assistant
+FALLBACK_INTENT = "anything_else"
+
+
+def _features(text: str) -> list:
+    words = TOKEN_PATTERN.findall(text.lower())
+    return words + [f"{a} {b}" for a, b in zip(words, words[1:])]
+
+
+class AnswerEngine:
+    """
+    In-process stand-in for a Watson Assistant workspace: classifies a message
+    into one of the workspace's intents and returns the dialog node it triggers.
+
+    Intent examples are vectorized once with TF-IDF (word unigrams and bigrams)
+    into a NumPy matrix; a message is classified by its cosine similarity to the
+    closest example of each intent, which takes well under a millisecond for
+    workspaces of a few hundred examples.
+
+    Example:
+        engine = AnswerEngine.from_file("samples/output/acme-1a2b3c4d/assistant-<hash>.json")
+        engine.answer("How can I contact you?")
+    """
+
+    def __init__(self, workspace: dict, threshold: float = 0.2):
+        """
+        Args:
+            workspace (dict): The workspace JSON from generate_watson_workspace_json().
+            threshold (float): The minimum confidence for an intent to be answered.
+        """
+        self.name = workspace.get("name")
+        self.threshold = threshold
+
+        texts, owners = [], []
+        for intent in workspace.get("intents", []):
+            for example in intent.get("examples", []):
+                if example.get("text"):
+                    texts.append(example["text"])
+                    owners.append(intent["intent"])
+
+        self.intents = list(dict.fromkeys(owners))
+        intent_ids = {intent: i for i, intent in enumerate(self.intents)}
+        self._owners = np.array([intent_ids[owner] for owner in owners], dtype=np.int64)
+
+        self._vocabulary = {}
+        rows = [self._counts(text, grow=True) for text in texts]
+        document_frequency = np.zeros(len(self._vocabulary), dtype=np.float32)
+        for row in rows:
+            document_frequency[list(row)] += 1
+        self._idf = np.log((1 + len(rows)) / (1 + document_frequency)) + 1
+
+        self._examples = np.zeros((len(rows), len(self._vocabulary)), dtype=np.float32)
+        for i, row in enumerate(rows):
+            self._examples[i] = self._vector(row)
+
+        # First dialog node whose condition mentions each intent
+        self._nodes = {}
+        for node in workspace.get("dialog_nodes", []):
+            for intent in CONDITION_INTENT.findall(node.get("conditions") or ""):
+                self._nodes.setdefault(intent, node)
+
+        log.info(
+            f"Answer engine for '{self.name}': {len(self.intents)} intents, "
+            f"{len(texts)} examples, {len(self._vocabulary)} features"
+        )
+
+    @classmethod
+    def from_file(cls, path: str, threshold: float = 0.2):
+        """
+        Build the engine from a saved workspace JSON file, compressed if it ends in
+        .gz or .zst, as written by the artifact store with ARTIFACT_COMPRESSION.
+        """
+        with open(path, "rb") as f:
+            return cls(json.loads(decompress(f.read(), path)), threshold=threshold)
+
+    def _counts(self, text: str, grow: bool = False) -> dict:
+        counts = {}
+        for feature in _features(text):
+            column = self._vocabulary.get(feature)
+            if column is None:
+                if not grow:
+                    continue
+                column = self._vocabulary[feature] = len(self._vocabulary)
+            counts[column] = counts.get(column, 0) + 1
+        return counts
+
+    def _vector(self, counts: dict) -> np.ndarray:
+        vector = np.zeros(len(self._vocabulary), dtype=np.float32)
+        if counts:
+            columns = np.fromiter(counts, dtype=np.int64)
+            tf = 1 + np.log(np.fromiter(counts.values(), dtype=np.float32))
+            vector[columns] = tf * self._idf[columns]
+            vector /= np.linalg.norm(vector)
+        return vector
+
+    def classify(self, text: str, top: int = 3) -> list:
+        """
+        Rank the workspace's intents for a message.
+
+        Args:
+            text (str): The user message.
+            top (int): The number of intents to return.
+
+        Returns:
+            list: Up to `top` {"intent", "confidence"} dictionaries, best first.
+        """
+        counts = self._counts(text)
+        if not counts or not len(self._examples):
+            return []
+
+        similarities = self._examples @ self._vector(counts)
+        scores = np.zeros(len(self.intents), dtype=np.float32)
+        np.maximum.at(scores, self._owners, similarities)
+
+        best = np.argsort(-scores)[:top]
+        return [
+            {"intent": self.intents[i], "confidence": round(float(scores[i]), 4)}
+            for i in best
+            if scores[i] > 0
+        ]
+
+    def answer(self, text: str) -> dict:
+        """
+        Classify a message and look up the dialog node it triggers.
+
+        Args:
+            text (str): The user message.
+
+        Returns:
+            dict: The ranked intents, the chosen intent (FALLBACK_INTENT if none is
+                confident enough), its dialog node name and its output text.
+        """
+        intents = self.classify(text)
+        intent = FALLBACK_INTENT
+        if intents and intents[0]["confidence"] >= self.threshold:
+            intent = intents[0]["intent"]
+
+        node = self._nodes.get(intent) or {}
+        output = node.get("output_text")
+        if output is None:
+            output = (node.get("output") or {}).get("text")
+
+        return {
+            "intents": intents,
+            "intent": intent,
+            "dialog_node": node.get("action_name") or node.get("dialog_node"),
+            "output": output,
+        }
+
+
+def serve(engine: AnswerEngine, host: str = "127.0.0.1", port: int = 8080):
+    """
+    Serve an answer engine over HTTP from a background thread.
+
+    POST /message with {"text": "..."} returns the engine's answer as JSON;
+    GET /health reports the workspace name and intent count.
+
+    Args:
+        engine (AnswerEngine): The engine to serve.
+        host (str): The interface to listen on.
+        port (int): The port to listen on, 0 for any free port.
+
+    Returns:
+        ThreadingHTTPServer: The running server; its serving thread is a daemon.
+    """
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+        # Headers and body are written separately; don't let Nagle delay the body
+        disable_nagle_algorithm = True
+
+        def _reply(self, status: int, payload: dict):
+            body = json.dumps(payload).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self):
+            if self.path != "/health":
+                self._reply(404, {"error": "Not found"})
+                return
+            self._reply(200, {"name": engine.name, "intents": len(engine.intents)})
+
+        def do_POST(self):
+            if self.path != "/message":
+                self._reply(404, {"error": "Not found"})
+                return
+            try:
+                length = int(self.headers.get("Content-Length", 0))
+                text = json.loads(self.rfile.read(length) or b"{}")["text"]
+            except (ValueError, KeyError, TypeError):
+                self._reply(400, {"error": 'Expected a JSON body {"text": "..."}'})
+                return
+            self._reply(200, engine.answer(str(text)))
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer((host, port), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    log.info(f"Serving '{engine.name}' on http://{host}:{server.server_address[1]}/")
+    return server
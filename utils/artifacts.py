@@ -0,0 +1,317 @@
+import os
+import re
+import json
+import gzip
+import atexit
+import hashlib
+import tempfile
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from utils.logger import get_logger
+
+log = get_logger(__name__)
+
+# Directory of the generated summaries and workspace JSON files
+ARTIFACT_DIR = os.getenv("ARTIFACT_DIR", "samples/output")
+
+# Compression of the stored artifacts: "none", "gzip" or "zstd"
+ARTIFACT_COMPRESSION = os.getenv("ARTIFACT_COMPRESSION", "none")
+
+# Number of artifacts kept in memory after they are written, most recent first
+ARTIFACT_MEMORY_ITEMS = int(os.getenv("ARTIFACT_MEMORY_ITEMS", "64"))
+
+# Artifact kinds: file extension and MIME type
+KINDS = {
+    "summary": ("md", "text/markdown"),
+    "assistant": ("json", "application/json"),
+}
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+
+def decompress(data: bytes, path: str) -> bytes:
+    """
+    Decompress the content of an artifact file according to its extension (.gz or .zst).
+
+    Raises:
+        OSError: If the file is zstd-compressed and zstandard is not installed.
+    """
+    if path.endswith(".gz"):
+        return gzip.decompress(data)
+    if path.endswith(".zst"):
+        if zstandard is None:
+            raise OSError(f"zstandard is required to read {path}")
+        return zstandard.ZstdDecompressor().decompress(data)
+    return data
+
+
+def site_key(title: str, url: str = None) -> str:
+    """
+    Build the directory name of a website's artifacts: its slugified title and,
+    if the URL is known, a hash of it, so that sites sharing a title never
+    overwrite each other.
+    """
+    slug = re.sub(r"[^a-z0-9]+", "-", title.lower()).strip("-") or "site"
+    if url:
+        slug += "-" + hashlib.sha256(url.encode("utf-8")).hexdigest()[:8]
+    return slug
+
+
+@dataclass
+class Artifact:
+    """
+    A stored summary or workspace JSON: its serialized bytes stay in memory so
+    that they can be served without reading the file back, while `written`
+    completes once the file is on disk.
+    """
+
+    site: str
+    kind: str
+    data: bytes
+    digest: str
+    path: str
+    file_name: str
+    written: Future = field(default_factory=Future, repr=False)
+
+    @property
+    def mime(self) -> str:
+        return KINDS[self.kind][1]
+
+    def text(self) -> str:
+        return self.data.decode("utf-8")
+
+    def json(self):
+        return json.loads(self.data)
+
+
+class ArtifactStore:
+    """
+    Write-behind store of the generated artifacts of each website.
+
+    put() serializes an artifact, keeps it in memory and queues it for a
+    background writer thread, so builds never wait for the disk. Files are
+    named after their content hash in a per-site directory and written
+    atomically (temporary file, then rename); an index.json per site, also
+    replaced atomically, points at the current file of each kind, and
+    superseded files are removed. Unchanged content is not rewritten.
+
+    Example:
+        store = get_artifact_store()
+        artifact = store.put(site_key(title, url), "summary", summary)
+        st.download_button("Download", artifact.data, file_name=artifact.file_name)
+    """
+
+    def __init__(
+        self, directory: str = ARTIFACT_DIR, compression: str = ARTIFACT_COMPRESSION
+    ):
+        """
+        Args:
+            directory (str): The root directory of the artifacts.
+            compression (str): "none", "gzip" or "zstd". zstd falls back to gzip if
+                the zstandard package is not installed.
+        """
+        if compression == "zstd" and zstandard is None:
+            log.warning("zstandard is not installed, compressing artifacts with gzip.")
+            compression = "gzip"
+        self.directory = directory
+        self.compression = compression
+        self._latest = OrderedDict()  # (site, kind) -> Artifact, least recent first
+        self._lock = threading.Lock()
+        # A single writer keeps the writes of a site in submission order
+        self._writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="artifacts")
+        atexit.register(self.close)
+
+    def _suffix(self) -> str:
+        return {"gzip": ".gz", "zstd": ".zst"}.get(self.compression, "")
+
+    def _compress(self, data: bytes) -> bytes:
+        if self.compression == "gzip":
+            return gzip.compress(data, mtime=0)
+        if self.compression == "zstd":
+            return zstandard.ZstdCompressor().compress(data)
+        return data
+
+    def put(self, site: str, kind: str, content) -> Artifact:
+        """
+        Store an artifact: it is available from get() at once and written in the background.
+
+        Args:
+            site (str): The website's key, from site_key().
+            kind (str): "summary" (Markdown text) or "assistant" (workspace JSON).
+            content (str or dict): The Markdown text or the JSON data.
+
+        Returns:
+            Artifact: The artifact; wait on `artifact.written` for the file.
+        """
+        extension = KINDS[kind][0]
+        if isinstance(content, str):
+            data = content.encode("utf-8")
+        else:
+            data = json.dumps(content, indent=2, ensure_ascii=False).encode("utf-8")
+
+        digest = hashlib.sha256(data).hexdigest()[:16]
+        filename = f"{kind}-{digest}.{extension}{self._suffix()}"
+        artifact = Artifact(
+            site=site,
+            kind=kind,
+            data=data,
+            digest=digest,
+            path=os.path.join(self.directory, site, filename),
+            file_name=f"{site}_{kind}.{extension}",
+        )
+
+        with self._lock:
+            self._remember(artifact)
+        try:
+            future = self._writer.submit(self._write, artifact)
+        except RuntimeError:
+            # The store was closed, e.g. at interpreter exit; write synchronously
+            artifact.written.set_result(self._write(artifact))
+        else:
+            future.add_done_callback(lambda done: _chain(done, artifact.written))
+        return artifact
+
+    def _remember(self, artifact: Artifact):
+        key = (artifact.site, artifact.kind)
+        self._latest[key] = artifact
+        self._latest.move_to_end(key)
+        # Written artifacts can be read back from disk; pending ones must stay
+        excess = len(self._latest) - ARTIFACT_MEMORY_ITEMS
+        for key in [key for key, item in self._latest.items() if item.written.done()]:
+            if excess <= 0:
+                break
+            del self._latest[key]
+            excess -= 1
+
+    def _write(self, artifact: Artifact) -> str:
+        directory = os.path.dirname(artifact.path)
+        os.makedirs(directory, exist_ok=True)
+        try:
+            if not os.path.exists(artifact.path):
+                _atomic_write(artifact.path, self._compress(artifact.data))
+
+            index_path = os.path.join(directory, "index.json")
+            index = _read_index(index_path)
+            previous = index.get(artifact.kind)
+            index[artifact.kind] = os.path.basename(artifact.path)
+            _atomic_write(index_path, json.dumps(index, indent=2).encode("utf-8"))
+
+            if previous and previous != index[artifact.kind]:
+                try:
+                    os.remove(os.path.join(directory, previous))
+                except OSError:
+                    pass
+            log.info(f"Artifact saved to {artifact.path}")
+            return artifact.path
+        except OSError as e:
+            log.error(f"Failed to save artifact {artifact.path}: {e}")
+            raise
+
+    def get(self, site: str, kind: str) -> Artifact:
+        """
+        Return the current artifact of a kind for a website, from memory if it was
+        stored by this process, otherwise from disk.
+
+        Returns:
+            Artifact: The artifact, or None if there is none.
+        """
+        with self._lock:
+            artifact = self._latest.get((site, kind))
+            if artifact is not None:
+                self._latest.move_to_end((site, kind))
+                return artifact
+
+        directory = os.path.join(self.directory, site)
+        filename = _read_index(os.path.join(directory, "index.json")).get(kind)
+        if not filename:
+            return None
+
+        path = os.path.join(directory, filename)
+        try:
+            with open(path, "rb") as f:
+                data = decompress(f.read(), path)
+        except OSError as e:
+            log.error(f"Failed to read artifact {path}: {e}")
+            return None
+
+        artifact = Artifact(
+            site=site,
+            kind=kind,
+            data=data,
+            digest=hashlib.sha256(data).hexdigest()[:16],
+            path=path,
+            file_name=f"{site}_{kind}.{KINDS[kind][0]}",
+        )
+        artifact.written.set_result(path)
+        with self._lock:
+            if (site, kind) not in self._latest:
+                self._remember(artifact)
+            return self._latest.get((site, kind), artifact)
+
+    def flush(self):
+        """
+        Wait until every queued artifact is on disk.
+        """
+        with self._lock:
+            pending = [artifact.written for artifact in self._latest.values()]
+        for future in pending:
+            future.exception()
+
+    def close(self):
+        """
+        Write the queued artifacts and stop the writer thread.
+        """
+        self._writer.shutdown(wait=True)
+
+
+def _chain(done: Future, target: Future):
+    if done.exception() is not None:
+        target.set_exception(done.exception())
+    else:
+        target.set_result(done.result())
+
+
+def _atomic_write(path: str, data: bytes):
+    """
+    Write a file so that readers see either its old or its new content, never a part.
+    """
+    fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(temp_path, path)
+    except BaseException:
+        try:
+            os.remove(temp_path)
+        except OSError:
+            pass
+        raise
+
+
+def _read_index(path: str) -> dict:
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_artifact_store() -> ArtifactStore:
+    """
+    Return the process-wide artifact store.
+    """
+    global _store
+
+    with _store_lock:
+        if _store is None:
+            _store = ArtifactStore()
+        return _store
@@ -0,0 +1,278 @@
+import os
+import time
+import hashlib
+import requests
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from dataclasses import dataclass, field
+from heapq import heappop, heappush
+from urllib.parse import urlparse
+from utils.dedup import NearDuplicateIndex, canonicalize_url, simhash
+from utils.discovery import RobotsRules, discover_sitemap_urls, score_url
+from utils.extractor import get_extractor
+from utils.http_client import fetch, get_session
+from utils.metrics import count
+from utils.logger import get_logger
+
+log = get_logger(__name__)
+
+# File extensions that are never worth fetching as pages
+IGNORED_EXTENSIONS = (".jpg", ".png", ".gif", ".jpeg", ".bmp")
+
+
+@dataclass
+class CrawlConfig:
+    """
+    Limits applied to a single crawl. Defaults can be overridden from the environment.
+
+    A crawl stays on the start URL's host, so it fetches at most
+    min(concurrency, per_host_concurrency) pages at a time; both default to 8.
+    """
+
+    max_pages: int = int(os.getenv("CRAWL_MAX_PAGES", "500"))
+    max_depth: int = int(os.getenv("CRAWL_MAX_DEPTH", "10"))
+    concurrency: int = int(os.getenv("CRAWL_CONCURRENCY", "8"))
+    per_host_concurrency: int = int(os.getenv("CRAWL_PER_HOST_CONCURRENCY", "8"))
+    respect_robots: bool = os.getenv("CRAWL_RESPECT_ROBOTS", "1") == "1"
+    use_sitemaps: bool = os.getenv("CRAWL_USE_SITEMAPS", "1") == "1"
+    timeout: int = 10
+
+
+@dataclass
+class Page:
+    url: str
+    title: str
+    blocks: list
+    depth: int
+    links: list = field(default_factory=list)
+    order: int = 0
+    fingerprint: int = None
+    replaces: str = None
+
+    @property
+    def text(self) -> str:
+        return " ".join(self.blocks)
+
+    @property
+    def hash(self) -> str:
+        """
+        Content hash of the page, used to detect changes between crawls.
+        """
+        return hashlib.sha256(f"{self.title}\n{self.text}".encode("utf-8")).hexdigest()
+
+
+def fetch_page(url: str, depth: int = 0, timeout: int = 10, extractor=None):
+    """
+    Fetch a single page and extract its title, content paragraphs and outgoing links.
+
+    Args:
+        url (str): The URL of the page to fetch.
+        depth (int): The distance of the page from the start URL.
+        timeout (int): The request timeout in seconds.
+        extractor (callable): The HTML extractor, see utils.extractor.get_extractor().
+
+    Returns:
+        Page: The parsed page, or None if it could not be fetched.
+    """
+    log.info(f"Scraping URL: {url}")
+
+    try:
+        response = fetch(url, timeout=timeout)
+        if response.status_code != 200:
+            log.error(
+                f"Failed to fetch URL: {url}. Status code: {response.status_code}"
+            )
+            return None
+
+        # Extract the title, main content and links in one pass
+        page = (extractor or get_extractor())(response.content, url)
+
+        return Page(
+            url=url,
+            title=page.title,
+            blocks=page.blocks,
+            depth=depth,
+            links=page.links,
+            # Fingerprinted here so that the scheduler thread only looks it up
+            fingerprint=simhash(" ".join(page.blocks)),
+        )
+
+    except requests.RequestException as e:
+        log.error(f"Request error while fetching URL: {url}. Error: {e}")
+    except Exception as e:
+        log.error(f"Unexpected error while scraping URL: {url}. Error: {e}")
+
+    return None
+
+
+def _is_crawlable(link: str, domain: str) -> bool:
+    """
+    Check whether a link belongs to the crawled domain and points to a page.
+    """
+    parsed = urlparse(link)
+    return (
+        parsed.scheme in ("http", "https")
+        and parsed.netloc == domain
+        and not parsed.path.lower().endswith(IGNORED_EXTENSIONS)
+    )
+
+
+def iter_pages(
+    start_url: str, config: CrawlConfig = None, duplicates: NearDuplicateIndex = None
+):
+    """
+    Crawl a website from the given URL using a pool of worker threads, yielding
+    each page as soon as it has been fetched.
+
+    The scheduler runs in the consuming thread and owns the frontier and the visited
+    set, so no locking is needed; workers only fetch and parse pages. Links are
+    followed within the start URL's domain until the page or depth budget is spent.
+    A page's links are released once they are queued, so the crawl holds only the
+    pages in flight, never the whole site.
+
+    Besides links, the frontier is seeded from the website's sitemaps. It is a
+    priority queue: pages whose path matches the required intents (about, contact,
+    careers, ...) are fetched first, then shallower pages, so the page budget is
+    spent on the content the assistant needs. robots.txt rules and crawl delays
+    are honoured for every page but the start URL.
+
+    URLs are canonicalized before they are queued, so fragment, tracking-parameter
+    and trailing-slash variants are fetched once. Of near-duplicate pages, only the
+    one with the shortest, then lowest, URL is kept, but the links of all are
+    followed. If that page arrives after the one it duplicates was yielded, its
+    `replaces` holds the URL of the yielded page, which the consumer must drop.
+
+    Args:
+        start_url (str): The URL to start crawling from.
+        config (CrawlConfig): Crawl limits, defaults to CrawlConfig().
+        duplicates (NearDuplicateIndex): The near-duplicate index, whose stats report
+            the content saved. A new index is used if not given.
+
+    Yields:
+        Page: The fetched pages, in the order they finished. The start page always
+            comes first; `order` holds each page's discovery rank.
+    """
+    config = config or CrawlConfig()
+    duplicates = duplicates if duplicates is not None else NearDuplicateIndex()
+    start_url = canonicalize_url(start_url)
+    domain = urlparse(start_url).netloc
+
+    # Keep one pooled keep-alive connection per worker
+    get_session(config.concurrency)
+    extractor = get_extractor()
+
+    robots = RobotsRules()
+    if config.respect_robots:
+        robots = RobotsRules.fetch(start_url, config.timeout)
+    delay = robots.crawl_delay
+    per_host_concurrency = 1 if delay else config.per_host_concurrency
+    if delay:
+        log.info(f"Honouring a crawl delay of {delay}s for {domain}")
+
+    visited = {start_url}
+    frontier = defaultdict(list)  # host -> heap of (-score, depth, order, url)
+    frontier[domain].append((0, 0, 0, start_url))
+    host_load = defaultdict(int)
+    next_start = defaultdict(float)  # host -> earliest time of its next request
+    in_flight = {}
+    started = fetched = 0
+
+    def enqueue(link: str, depth: int):
+        link = canonicalize_url(link)
+        if link in visited or not _is_crawlable(link, domain):
+            return
+        if not robots.allowed(link):
+            return
+        visited.add(link)
+        heappush(frontier[domain], (-score_url(link), depth, len(visited) - 1, link))
+
+    with ThreadPoolExecutor(max_workers=config.concurrency) as pool:
+        # Read the sitemaps while the start page is being fetched
+        seeds = None
+        if config.use_sitemaps:
+            seeds = pool.submit(discover_sitemap_urls, start_url, robots, config.timeout)
+
+        while frontier or in_flight:
+            # Start as many fetches as the budget, the limits and crawl delays allow
+            now, pause = time.monotonic(), None
+            for host in list(frontier):
+                heap = frontier[host]
+                while (
+                    heap
+                    and started < config.max_pages
+                    and len(in_flight) < config.concurrency
+                    and host_load[host] < per_host_concurrency
+                ):
+                    if next_start[host] > now:
+                        wake = next_start[host] - now
+                        pause = wake if pause is None else min(pause, wake)
+                        break
+                    _, depth, order, url = heappop(heap)
+                    future = pool.submit(
+                        fetch_page, url, depth, config.timeout, extractor
+                    )
+                    in_flight[future] = (order, host)
+                    host_load[host] += 1
+                    next_start[host] = now + delay
+                    started += 1
+                if not heap or started >= config.max_pages:
+                    del frontier[host]
+
+            if not in_flight:
+                if pause:
+                    time.sleep(pause)
+                continue
+
+            done, _ = wait(in_flight, timeout=pause, return_when=FIRST_COMPLETED)
+            for future in done:
+                order, host = in_flight.pop(future)
+                host_load[host] -= 1
+
+                page = future.result()
+                if page is None:
+                    continue
+                page.order = order
+
+                if started < config.max_pages:
+                    if page.depth < config.max_depth:
+                        for link in dict.fromkeys(page.links):
+                            enqueue(link, page.depth + 1)
+                    if order == 0 and seeds is not None:
+                        for link in seeds.result():
+                            enqueue(link, 1)
+                page.links = []
+
+                duplicate_of, page.replaces = duplicates.find_duplicate(
+                    page.url, page.text, page.fingerprint
+                )
+                if duplicate_of:
+                    log.info(f"Skipping {page.url}, near-duplicate of {duplicate_of}")
+                    count("crawl_duplicates_total")
+                    continue
+                if page.replaces:
+                    log.info(f"Replacing {page.replaces} with its near-duplicate {page.url}")
+                    count("crawl_duplicates_total")
+                else:
+                    fetched += 1
+                    count("crawl_pages_total")
+                yield page
+
+    log.info(f"Crawled {fetched} pages from {start_url}")
+
+
+def crawl(
+    start_url: str, config: CrawlConfig = None, duplicates: NearDuplicateIndex = None
+) -> list:
+    """
+    Crawl a website and collect all of its pages, see iter_pages().
+
+    Args:
+        start_url (str): The URL to start crawling from.
+        config (CrawlConfig): Crawl limits, defaults to CrawlConfig().
+        duplicates (NearDuplicateIndex): The near-duplicate index.
+
+    Returns:
+        list: The fetched pages, in the order they were discovered.
+    """
+    pages = list(iter_pages(start_url, config, duplicates))
+    return sorted(pages, key=lambda page: page.order)
@@ -0,0 +1,176 @@
+import re
+import hashlib
+import numpy as np
+from collections import defaultdict
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+from utils.tokenizer import count_tokens
+from utils.logger import get_logger
+
+log = get_logger(__name__)
+
+# Query parameters that only track campaigns or referrers and never change the page
+TRACKING_PARAMS = {
+    "gclid",
+    "fbclid",
+    "msclkid",
+    "yclid",
+    "igshid",
+    "mc_cid",
+    "mc_eid",
+    "_ga",
+    "_gl",
+    "ref",
+    "ref_src",
+}
+
+DEFAULT_PORTS = {"http": ":80", "https": ":443"}
+
+
+def canonicalize_url(url: str) -> str:
+    """
+    Normalize a URL so that variants of the same page map to a single key.
+
+    Lower-cases the scheme and host, drops default ports, fragments and tracking
+    parameters (utm_*, gclid, ...), sorts the remaining query parameters, and
+    removes duplicate and trailing slashes from the path.
+
+    Args:
+        url (str): The URL to normalize.
+
+    Returns:
+        str: The canonical URL.
+    """
+    parts = urlsplit(url.strip())
+    scheme = parts.scheme.lower()
+
+    netloc = parts.netloc.lower()
+    if netloc.endswith(DEFAULT_PORTS.get(scheme, "\0")):
+        netloc = netloc.rsplit(":", 1)[0]
+
+    path = re.sub(r"/{2,}", "/", parts.path) or "/"
+    if len(path) > 1:
+        path = path.rstrip("/")
+
+    query = urlencode(
+        sorted(
+            (key, value)
+            for key, value in parse_qsl(parts.query, keep_blank_values=True)
+            if not key.lower().startswith("utm_") and key.lower() not in TRACKING_PARAMS
+        )
+    )
+    return urlunsplit((scheme, netloc, path, query, ""))
+
+
+def simhash(text: str, shingle_size: int = 3) -> int:
+    """
+    Compute the 64-bit SimHash of a text from its word shingles.
+
+    Texts that share most of their shingles get fingerprints that differ in only
+    a few bits. The bit votes of the shingle hashes are counted with NumPy, which
+    is an order of magnitude faster than a Python loop over the 64 bits.
+
+    Args:
+        text (str): The text to fingerprint.
+        shingle_size (int): The number of consecutive words per shingle.
+
+    Returns:
+        int: The 64-bit fingerprint.
+    """
+    words = text.lower().split()
+    shingles = {
+        " ".join(words[i : i + shingle_size])
+        for i in range(max(1, len(words) - shingle_size + 1))
+    }
+
+    digests = b"".join(
+        hashlib.blake2b(shingle.encode("utf-8"), digest_size=8).digest()
+        for shingle in shingles
+    )
+    # One row of 64 bits per shingle, most significant bit first
+    bits = np.unpackbits(np.frombuffer(digests, dtype=np.uint8).reshape(-1, 8), axis=1)
+    # A bit is set if most shingles set it
+    majority = bits.sum(axis=0) * 2 > len(shingles)
+    return int.from_bytes(np.packbits(majority).tobytes(), "big")
+
+
+def _url_rank(url: str) -> tuple:
+    """
+    Order in which near-duplicate pages are preferred: the shortest URL, then the lowest.
+    """
+    return len(url), url
+
+
+class NearDuplicateIndex:
+    """
+    Index of page fingerprints that detects pages nearly identical to one already kept,
+    such as print views, sorted listings or pages that differ only in a date line.
+
+    Fingerprints are split into `max_distance + 1` bands; by the pigeonhole principle,
+    two fingerprints within `max_distance` bits share at least one band exactly, so
+    only pages sharing a band are compared.
+
+    Of two near-duplicates, the page with the shortest, then lowest, URL is kept,
+    whichever was fetched first, so the kept pages do not depend on timing.
+    """
+
+    def __init__(self, max_distance: int = 6, min_words: int = 20):
+        """
+        Args:
+            max_distance (int): The largest Hamming distance still counted as a duplicate.
+            min_words (int): Pages with fewer words are never treated as duplicates.
+        """
+        self.max_distance = max_distance
+        self.min_words = min_words
+        self.band_bits = 64 // (max_distance + 1)
+        self._bands = defaultdict(list)  # (band index, band value) -> [[fingerprint, url]]
+        self.stats = {"pages": 0, "duplicates": 0, "bytes_saved": 0, "tokens_saved": 0}
+
+    def _band_keys(self, fingerprint: int) -> list:
+        mask = (1 << self.band_bits) - 1
+        return [
+            (band, fingerprint >> (band * self.band_bits) & mask)
+            for band in range(self.max_distance + 1)
+        ]
+
+    def find_duplicate(self, url: str, text: str, fingerprint: int = None) -> tuple:
+        """
+        Check a page against the index, adding it if it is not a near-duplicate.
+
+        Args:
+            url (str): The URL of the page.
+            text (str): The content of the page.
+            fingerprint (int): The page's simhash(), if already computed, e.g. by
+                the worker thread that fetched the page.
+
+        Returns:
+            tuple: A tuple containing:
+                - The URL of the kept page this page duplicates, or None if the
+                  page is kept.
+                - The URL of a kept page this page replaces, because its URL is
+                  preferred, or None.
+        """
+        self.stats["pages"] += 1
+        if len(text.split()) < self.min_words:
+            return None, None
+
+        if fingerprint is None:
+            fingerprint = simhash(text)
+        keys = self._band_keys(fingerprint)
+
+        for key in keys:
+            for entry in self._bands.get(key, ()):
+                other, other_url = entry
+                if bin(fingerprint ^ other).count("1") <= self.max_distance:
+                    self.stats["duplicates"] += 1
+                    self.stats["bytes_saved"] += len(text.encode("utf-8"))
+                    self.stats["tokens_saved"] += count_tokens(text)
+                    if _url_rank(url) < _url_rank(other_url):
+                        # The entry is shared by all of its bands
+                        entry[1] = url
+                        return None, other_url
+                    return other_url, None
+
+        entry = [fingerprint, url]
+        for key in keys:
+            self._bands[key].append(entry)
+        return None, None
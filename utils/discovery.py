@@ -0,0 +1,227 @@
+import re
+import zlib
+import xml.etree.ElementTree as ElementTree
+from urllib.parse import urljoin, urlparse
+from urllib.robotparser import RobotFileParser
+from utils import required_intents
+from utils.http_client import USER_AGENT, fetch
+from utils.logger import get_logger
+
+log = get_logger(__name__)
+
+# The sitemap protocol caps a sitemap at 50,000 URLs and 50 MB uncompressed
+MAX_SITEMAP_URLS = 50000
+MAX_SITEMAP_BYTES = 50 * 1024 * 1024
+
+# A sitemap never needs a DTD; one could declare exponentially expanding entities
+DOCTYPE = re.compile(rb"<!\s*(DOCTYPE|ENTITY)", re.IGNORECASE)
+
+# Nested sitemaps fetched at most, so that huge sitemap indexes stay cheap
+MAX_SITEMAPS = 50
+
+# Path words that point at pages for each required intent, besides the intent name itself
+INTENT_KEYWORDS = {
+    "name": {"about", "company", "brand", "home", "welcome"},
+    "description": {"about", "overview", "introduction", "what", "who"},
+    "company_history": {"history", "story", "timeline", "heritage", "founded"},
+    "company_overview": {"about", "overview", "who", "team", "leadership"},
+    "mission_and_values": {"mission", "values", "vision", "purpose", "culture"},
+    "services_offered": {"services", "service", "solutions", "products", "offerings"},
+    "contact_details": {"contact", "location", "locations", "offices", "faq", "support"},
+    "careers": {"careers", "career", "jobs", "job", "hiring", "vacancies", "join"},
+}
+
+# Intent name words that say nothing about a page
+GENERIC_WORDS = {"and", "details", "offered"}
+
+# Path words of pages that rarely hold anything an assistant needs
+LOW_VALUE_WORDS = {
+    "tag",
+    "tags",
+    "category",
+    "author",
+    "archive",
+    "login",
+    "cart",
+    "checkout",
+    "privacy",
+    "terms",
+    "cookies",
+}
+
+
+def _intent_keywords() -> dict:
+    return {
+        intent: (set(intent.split("_")) - GENERIC_WORDS)
+        | INTENT_KEYWORDS.get(intent, set())
+        for intent in required_intents
+    }
+
+
+_KEYWORDS = _intent_keywords()
+
+
+def score_url(url: str) -> int:
+    """
+    Score how likely a URL is to hold content for the required intents, from its path.
+
+    Each required intent whose keywords appear in the path adds a point; archive,
+    legal and account pages lose one.
+
+    Args:
+        url (str): The URL to score.
+
+    Returns:
+        int: The relevance score, higher is better.
+    """
+    words = set(re.split(r"[^a-z0-9]+", urlparse(url).path.lower())) - {""}
+    score = sum(1 for keywords in _KEYWORDS.values() if words & keywords)
+    return score - 1 if words & LOW_VALUE_WORDS else score
+
+
+class RobotsRules:
+    """
+    The robots.txt rules of a website for this crawler's user agent.
+
+    A missing or unreadable robots.txt allows everything.
+    """
+
+    def __init__(self, parser: RobotFileParser = None):
+        self._parser = parser
+
+    @classmethod
+    def fetch(cls, start_url: str, timeout: int = 10):
+        """
+        Fetch and parse the robots.txt of the website a URL belongs to.
+
+        Args:
+            start_url (str): Any URL of the website.
+            timeout (int): The request timeout in seconds.
+
+        Returns:
+            RobotsRules: The website's rules.
+        """
+        robots_url = urljoin(start_url, "/robots.txt")
+        try:
+            response = fetch(robots_url, timeout=timeout)
+        except Exception as e:
+            log.warning(f"Could not fetch {robots_url}, crawling without rules: {e}")
+            return cls()
+
+        if response.status_code != 200:
+            return cls()
+
+        parser = RobotFileParser(robots_url)
+        parser.parse(response.content.decode("utf-8", errors="replace").splitlines())
+        return cls(parser)
+
+    def allowed(self, url: str) -> bool:
+        """
+        Whether the crawler may fetch a URL.
+        """
+        return self._parser is None or self._parser.can_fetch(USER_AGENT, url)
+
+    @property
+    def crawl_delay(self) -> float:
+        """
+        The minimum number of seconds between requests, 0 if not set.
+        """
+        if self._parser is None:
+            return 0
+        delay = self._parser.crawl_delay(USER_AGENT)
+        if delay is None:
+            rate = self._parser.request_rate(USER_AGENT)
+            delay = rate.seconds / rate.requests if rate and rate.requests else 0
+        return float(delay)
+
+    @property
+    def sitemaps(self) -> list:
+        """
+        The sitemap URLs listed in robots.txt.
+        """
+        return (self._parser.site_maps() or []) if self._parser else []
+
+
+def parse_sitemap(content: bytes) -> tuple:
+    """
+    Parse a sitemap or sitemap index, gzip-compressed or not.
+
+    Args:
+        content (bytes): The sitemap file as fetched.
+
+    Returns:
+        tuple: A tuple containing:
+            - The page URLs listed in a sitemap.
+            - The nested sitemap URLs listed in a sitemap index.
+
+    Raises:
+        ValueError: If the document declares a DOCTYPE or entities, which untrusted
+            XML is not allowed to.
+    """
+    if content[:2] == b"\x1f\x8b":
+        # Decompress at most the protocol's size limit, whatever the archive claims
+        content = zlib.decompressobj(16 + zlib.MAX_WBITS).decompress(
+            content, MAX_SITEMAP_BYTES
+        )
+
+    if DOCTYPE.search(content):
+        raise ValueError("sitemaps must not declare a DOCTYPE")
+
+    root = ElementTree.fromstring(content)
+    locs = [
+        element.text.strip()
+        for element in root.iter()
+        if element.tag.rsplit("}", 1)[-1] == "loc" and element.text
+    ]
+
+    if root.tag.rsplit("}", 1)[-1] == "sitemapindex":
+        return [], locs
+    return locs[:MAX_SITEMAP_URLS], []
+
+
+def discover_sitemap_urls(
+    start_url: str, robots: RobotsRules = None, timeout: int = 10
+) -> list:
+    """
+    Collect the page URLs of a website's sitemaps.
+
+    Sitemaps are taken from robots.txt, falling back to /sitemap.xml, and sitemap
+    indexes are followed up to MAX_SITEMAPS files.
+
+    Args:
+        start_url (str): The start URL of the website.
+        robots (RobotsRules): The website's robots.txt rules, if already fetched.
+        timeout (int): The request timeout in seconds.
+
+    Returns:
+        list: The page URLs on the start URL's domain, without duplicates.
+    """
+    domain = urlparse(start_url).netloc
+    queue = list(robots.sitemaps) if robots else []
+    if not queue:
+        queue = [urljoin(start_url, "/sitemap.xml")]
+    seen, urls = set(), {}
+
+    while queue and len(seen) < MAX_SITEMAPS and len(urls) < MAX_SITEMAP_URLS:
+        sitemap_url = queue.pop(0)
+        if sitemap_url in seen:
+            continue
+        seen.add(sitemap_url)
+
+        try:
+            response = fetch(sitemap_url, timeout=timeout)
+            if response.status_code != 200:
+                continue
+            pages, sitemaps = parse_sitemap(response.content)
+        except Exception as e:
+            log.warning(f"Skipping unreadable sitemap {sitemap_url}: {e}")
+            continue
+
+        queue.extend(sitemaps)
+        for page in pages:
+            if urlparse(page).netloc == domain:
+                urls[page] = None
+
+    if urls:
+        log.info(f"Found {len(urls)} URLs in {len(seen)} sitemaps of {start_url}")
+    return list(urls)[:MAX_SITEMAP_URLS]
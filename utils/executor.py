@@ -0,0 +1,161 @@
+import time
+import threading
+import contextvars
+from concurrent.futures import Future, InvalidStateError, ThreadPoolExecutor
+from utils.metrics import span
+from utils.logger import get_logger
+
+log = get_logger(__name__)
+
+
+class StageExecutor:
+    """
+    Runs pipeline stages on a thread pool as soon as the stages they depend on have finished.
+
+    Stages are registered by name with submit(); a stage's function is called with
+    the results of its dependencies, in order. A dependency may be registered after
+    the stage that needs it, or its result may be handed in by the caller with
+    provide(). If a dependency fails, every stage depending on it fails with the
+    same exception.
+
+    Example:
+        with StageExecutor() as stages:
+            stages.submit("crawl", scrape_website, url)
+            stages.submit("workspace", lambda crawl: create(crawl[1]), deps=["crawl"])
+            workspace_id = stages.result("workspace")
+    """
+
+    def __init__(self, max_workers: int = 4, initializer=None):
+        """
+        Args:
+            max_workers (int): The number of stages that may run at the same time.
+            initializer (callable): Called once in every worker thread before it runs stages.
+        """
+        self._pool = ThreadPoolExecutor(
+            max_workers=max_workers, initializer=initializer
+        )
+        self._futures = {}
+        self._lock = threading.Lock()
+        self.timings = {}
+        self.errors = {}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.shutdown()
+
+    def _future(self, name: str) -> Future:
+        with self._lock:
+            if name not in self._futures:
+                self._futures[name] = Future()
+            return self._futures[name]
+
+    def _run(self, name: str, func, args: list, future: Future):
+        started = time.perf_counter()
+        try:
+            with span(f"stage.{name}"):
+                result = func(*args)
+        except Exception as e:
+            self.timings[name] = round(time.perf_counter() - started, 3)
+            self.errors[name] = e
+            log.error(f"Stage '{name}' failed: {e}")
+            future.set_exception(e)
+        else:
+            self.timings[name] = round(time.perf_counter() - started, 3)
+            future.set_result(result)
+
+    def submit(self, name: str, func, *args, deps: list = ()) -> Future:
+        """
+        Register a stage and start it as soon as its dependencies have finished.
+
+        Args:
+            name (str): The unique name of the stage.
+            func (callable): The stage function.
+            *args: Fixed arguments passed to func before the dependency results.
+            deps (list): The names of the stages whose results func receives.
+
+        Returns:
+            Future: The future of the stage's result.
+        """
+        future = self._future(name)
+        dep_futures = [self._future(dep) for dep in deps]
+        # Run the stage in the caller's context, so that its span nests under the caller's
+        context = contextvars.copy_context()
+        pending = [len(dep_futures)]
+
+        def launch():
+            for dep_future in dep_futures:
+                if dep_future.exception() is not None:
+                    future.set_exception(dep_future.exception())
+                    return
+
+            dep_results = [dep_future.result() for dep_future in dep_futures]
+            try:
+                self._pool.submit(
+                    context.run, self._run, name, func, [*args, *dep_results], future
+                )
+            except RuntimeError:
+                # The executor was shut down before the dependencies finished
+                future.cancel()
+
+        def on_dependency_done(_):
+            with self._lock:
+                pending[0] -= 1
+                ready = pending[0] == 0
+            if ready:
+                launch()
+
+        if not dep_futures:
+            launch()
+        for dep_future in dep_futures:
+            dep_future.add_done_callback(on_dependency_done)
+
+        return future
+
+    def provide(self, name: str, value, seconds: float = None):
+        """
+        Complete a stage with a result computed by the caller.
+
+        Args:
+            name (str): The name of the stage.
+            value: The stage's result.
+            seconds (float): How long the caller spent computing it, if measured.
+        """
+        if seconds is not None:
+            self.timings[name] = round(seconds, 3)
+        self._future(name).set_result(value)
+
+    def fail(self, name: str, error: Exception):
+        """
+        Fail a stage whose result the caller was to provide, unless it already has one.
+
+        Args:
+            name (str): The name of the stage.
+            error (Exception): The exception its dependents fail with.
+        """
+        try:
+            self._future(name).set_exception(error)
+        except InvalidStateError:
+            # The stage was provided first
+            pass
+
+    def result(self, name: str, timeout: float = None):
+        """
+        Wait for a stage to finish and return its result.
+
+        Raises:
+            Exception: The exception raised by the stage or one of its dependencies.
+        """
+        return self._future(name).result(timeout=timeout)
+
+    def shutdown(self):
+        """
+        Wait for running stages to finish and release the worker threads.
+        """
+        self._pool.shutdown(wait=True, cancel_futures=True)
+        if self.timings:
+            log.info(
+                "Stage timings: "
+                + ", ".join(f"{name}={seconds}s" for name, seconds in self.timings.items())
+            )
@@ -0,0 +1,182 @@
+import os
+import hashlib
+import threading
+from dataclasses import dataclass, field
+from urllib.parse import urljoin
+from utils.logger import get_logger
+
+log = get_logger(__name__)
+
+# Page regions whose text is navigation or boilerplate rather than content
+BOILERPLATE_TAGS = {
+    "nav",
+    "header",
+    "footer",
+    "aside",
+    "form",
+    "script",
+    "style",
+    "noscript",
+}
+
+
+@dataclass
+class Extraction:
+    title: str
+    blocks: list = field(default_factory=list)
+    links: list = field(default_factory=list)
+
+
+def _clean(text: str) -> str:
+    return " ".join(text.split())
+
+
+def extract_bs4(html: bytes, url: str) -> Extraction:
+    """
+    Extract the title, content paragraphs and links of a page with BeautifulSoup.
+
+    This is the pure-Python reference extractor, used when no faster parser is installed.
+    """
+    from bs4 import BeautifulSoup
+
+    soup = BeautifulSoup(html, "html.parser")
+
+    # Extract page title
+    title = (
+        soup.title.string.strip() if soup.title and soup.title.string else "Untitled_Page"
+    )
+
+    blocks = []
+    for para in soup.find_all("p"):
+        if para.find_parent(BOILERPLATE_TAGS) is None:
+            text = _clean(para.get_text())
+            if text:
+                blocks.append(text)
+
+    links = [urljoin(url, a["href"].strip()) for a in soup.find_all("a", href=True)]
+    return Extraction(title, blocks, links)
+
+
+def extract_lxml(html: bytes, url: str) -> Extraction:
+    """
+    Extract the title, content paragraphs and links of a page with lxml in a single pass.
+    """
+    import lxml.html
+
+    if not html.strip():
+        return Extraction("Untitled_Page")
+
+    root = lxml.html.fromstring(html)
+
+    title, blocks, links = None, [], []
+    for element in root.iter("title", "p", "a"):
+        if element.tag == "a":
+            href = element.get("href")
+            if href is not None:
+                links.append(urljoin(url, href.strip()))
+        elif element.tag == "p":
+            if not any(a.tag in BOILERPLATE_TAGS for a in element.iterancestors()):
+                text = _clean(element.text_content())
+                if text:
+                    blocks.append(text)
+        elif title is None and element.text:
+            title = element.text.strip()
+
+    return Extraction(title or "Untitled_Page", blocks, links)
+
+
+def extract_selectolax(html: bytes, url: str) -> Extraction:
+    """
+    Extract the title, content paragraphs and links of a page with selectolax.
+    """
+    from selectolax.parser import HTMLParser
+
+    tree = HTMLParser(html)
+
+    title_node = tree.css_first("title")
+    title = title_node.text(strip=True) if title_node else ""
+
+    blocks = []
+    for para in tree.css("p"):
+        parent, boilerplate = para.parent, False
+        while parent is not None and not boilerplate:
+            boilerplate = parent.tag in BOILERPLATE_TAGS
+            parent = parent.parent
+        if not boilerplate:
+            text = _clean(para.text())
+            if text:
+                blocks.append(text)
+
+    links = [urljoin(url, a.attributes["href"].strip()) for a in tree.css("a[href]")]
+    return Extraction(title or "Untitled_Page", blocks, links)
+
+
+EXTRACTORS = {
+    "selectolax": extract_selectolax,
+    "lxml": extract_lxml,
+    "bs4": extract_bs4,
+}
+
+
+def _available(name: str) -> bool:
+    module = {"selectolax": "selectolax.parser", "lxml": "lxml.html", "bs4": "bs4"}[name]
+    try:
+        __import__(module)
+        return True
+    except ImportError:
+        return False
+
+
+def get_extractor(name: str = None):
+    """
+    Return an HTML extraction function.
+
+    Args:
+        name (str): "selectolax", "lxml" or "bs4". Defaults to the HTML_EXTRACTOR
+            environment variable, or the fastest installed parser.
+
+    Returns:
+        callable: A function (html, url) -> Extraction.
+    """
+    name = name or os.getenv("HTML_EXTRACTOR")
+    if name:
+        if name not in EXTRACTORS:
+            raise ValueError(f"Unknown HTML extractor '{name}'.")
+        return EXTRACTORS[name]
+
+    for candidate in EXTRACTORS:
+        if _available(candidate):
+            return EXTRACTORS[candidate]
+
+
+class BoilerplateFilter:
+    """
+    Drops content blocks already seen on an earlier page of the same crawl,
+    such as cookie notices, taglines and calls to action repeated on every page.
+    """
+
+    def __init__(self):
+        self._seen = set()
+        self._lock = threading.Lock()
+        self.dropped_bytes = 0
+
+    def filter(self, blocks: list) -> list:
+        """
+        Return the blocks that were not seen before, remembering them.
+
+        Args:
+            blocks (list): The content blocks of a page, in page order.
+
+        Returns:
+            list: The blocks that are new to this crawl.
+        """
+        kept = []
+        with self._lock:
+            for block in blocks:
+                digest = hashlib.blake2b(block.encode("utf-8"), digest_size=16).digest()
+                if digest in self._seen:
+                    self.dropped_bytes += len(block)
+                    continue
+                self._seen.add(digest)
+                kept.append(block)
+        return kept
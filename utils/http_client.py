@@ -0,0 +1,274 @@
+import os
+import json
+import time
+import hashlib
+import threading
+import requests
+from dataclasses import dataclass
+from requests.adapters import HTTPAdapter
+from utils.metrics import count, span
+from utils.logger import get_logger
+
+log = get_logger(__name__)
+
+# Directory of the on-disk HTTP cache used for conditional re-crawls
+HTTP_CACHE_DIR = os.getenv("HTTP_CACHE_DIR", "samples/cache/http")
+
+# Seconds a cached response is kept after it was last stored or revalidated
+HTTP_CACHE_MAX_AGE = int(os.getenv("HTTP_CACHE_MAX_AGE", str(30 * 24 * 3600)))
+
+# Maximum size of the cached response bodies, in megabytes
+HTTP_CACHE_MAX_MB = int(os.getenv("HTTP_CACHE_MAX_MB", "512"))
+
+# User agent sent with every request and matched against robots.txt rules
+USER_AGENT = os.getenv("CRAWL_USER_AGENT", "ihelp-crawler")
+
+try:
+    import brotli  # noqa: F401  (urllib3 decodes "br" bodies when brotli is installed)
+
+    ACCEPT_ENCODING = "gzip, deflate, br"
+except ImportError:
+    ACCEPT_ENCODING = "gzip, deflate"
+
+
+@dataclass
+class FetchResult:
+    url: str
+    status_code: int
+    content: bytes
+    from_cache: bool = False
+
+
+class HttpCache:
+    """
+    On-disk store of response bodies and their validators (ETag / Last-Modified), keyed by URL.
+
+    Responses not stored or revalidated for `max_age` seconds are evicted, and
+    when the bodies grow beyond `max_bytes`, the least recently used ones are
+    evicted, so the cache does not grow without bound across crawls.
+    """
+
+    def __init__(
+        self,
+        cache_dir: str = HTTP_CACHE_DIR,
+        max_age: int = HTTP_CACHE_MAX_AGE,
+        max_bytes: int = HTTP_CACHE_MAX_MB * 1024 * 1024,
+    ):
+        self.cache_dir = cache_dir
+        self.max_age = max_age
+        self.max_bytes = max_bytes
+        self.stats = {"evictions": 0}
+        self._lock = threading.Lock()
+        os.makedirs(cache_dir, exist_ok=True)
+        self._size = self.prune()
+
+    def _path(self, url: str) -> str:
+        return os.path.join(self.cache_dir, hashlib.sha256(url.encode()).hexdigest())
+
+    def validators(self, url: str) -> dict:
+        """
+        Return the conditional request headers for a previously cached URL.
+        """
+        try:
+            with open(f"{self._path(url)}.json", "r", encoding="utf-8") as f:
+                meta = json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+        headers = {}
+        if meta.get("etag"):
+            headers["If-None-Match"] = meta["etag"]
+        if meta.get("last_modified"):
+            headers["If-Modified-Since"] = meta["last_modified"]
+        return headers
+
+    def load(self, url: str):
+        """
+        Return the cached body for a URL, or None if it is not cached.
+        """
+        path = f"{self._path(url)}.body"
+        try:
+            with open(path, "rb") as f:
+                body = f.read()
+            # The body was just revalidated, so it is kept as recently used
+            os.utime(path)
+        except OSError:
+            return None
+        return body
+
+    def prune(self, max_bytes: int = None) -> int:
+        """
+        Evict the expired responses, then the least recently used ones over the size cap.
+
+        Args:
+            max_bytes (int): The size to shrink the bodies to, defaults to the cap.
+
+        Returns:
+            int: The size of the remaining bodies, in bytes.
+        """
+        bodies = []
+        try:
+            with os.scandir(self.cache_dir) as entries:
+                for entry in entries:
+                    if entry.name.endswith(".body"):
+                        try:
+                            stat = entry.stat()
+                        except OSError:
+                            continue
+                        bodies.append((stat.st_mtime, stat.st_size, entry.path))
+        except OSError as e:
+            log.error(f"Failed to list the HTTP cache {self.cache_dir}: {e}")
+            return 0
+
+        bodies.sort(reverse=True)
+        max_bytes = self.max_bytes if max_bytes is None else max_bytes
+        oldest = time.time() - self.max_age
+        size = evicted = 0
+        for mtime, body_size, path in bodies:
+            if mtime >= oldest and size + body_size <= max_bytes:
+                size += body_size
+                continue
+            # Remove the metadata first so it never points at a missing body
+            for name in (f"{path[:-5]}.json", path):
+                try:
+                    os.remove(name)
+                except OSError:
+                    pass
+            evicted += 1
+
+        if evicted:
+            log.info(f"Evicted {evicted} responses from the HTTP cache.")
+            count("http_cache_evictions_total", evicted)
+        self.stats["evictions"] += evicted
+        return size
+
+    def clear(self):
+        """
+        Remove every cached response.
+        """
+        for name in os.listdir(self.cache_dir):
+            os.remove(os.path.join(self.cache_dir, name))
+        with self._lock:
+            self._size = 0
+
+    def store(self, url: str, response: requests.Response):
+        """
+        Cache a response body if the server sent validators for it, evicting
+        responses if the cache grows beyond its size cap.
+        """
+        etag = response.headers.get("ETag")
+        last_modified = response.headers.get("Last-Modified")
+        if not etag and not last_modified:
+            return
+
+        path = self._path(url)
+        try:
+            # Write the body first so metadata never points at a missing body
+            with open(f"{path}.body", "wb") as f:
+                f.write(response.content)
+            with open(f"{path}.json", "w", encoding="utf-8") as f:
+                json.dump({"url": url, "etag": etag, "last_modified": last_modified}, f)
+        except OSError as e:
+            log.error(f"Failed to cache response for {url}: {e}")
+            return
+
+        with self._lock:
+            # Replaced bodies are counted twice until the next prune corrects it
+            self._size += len(response.content)
+            if self._size > self.max_bytes:
+                # Shrink below the cap, so that not every store lists the directory
+                self._size = self.prune(self.max_bytes * 9 // 10)
+
+
+_session = None
+_pool_size = 0
+_cache = None
+_lock = threading.Lock()
+
+
+def get_session(pool_size: int = 10) -> requests.Session:
+    """
+    Return the process-wide HTTP session, growing its connection pool to at least pool_size.
+
+    Args:
+        pool_size (int): The number of keep-alive connections to keep per host.
+
+    Returns:
+        requests.Session: The shared session.
+    """
+    global _session, _pool_size
+
+    with _lock:
+        if _session is None:
+            _session = requests.Session()
+            _session.verify = False
+            _session.headers.update(
+                {"Accept-Encoding": ACCEPT_ENCODING, "User-Agent": USER_AGENT}
+            )
+
+        if pool_size > _pool_size:
+            adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+            _session.mount("http://", adapter)
+            _session.mount("https://", adapter)
+            _pool_size = pool_size
+
+        return _session
+
+
+def get_cache() -> HttpCache:
+    """
+    Return the process-wide HTTP cache.
+    """
+    global _cache
+
+    with _lock:
+        if _cache is None:
+            _cache = HttpCache()
+        return _cache
+
+
+def fetch(url: str, timeout: int = 10, use_cache: bool = True) -> FetchResult:
+    """
+    GET a URL over the shared session, revalidating previously cached responses.
+
+    A 304 Not Modified answer is served from the on-disk cache and reported with
+    status 200 and from_cache=True.
+
+    Args:
+        url (str): The URL to fetch.
+        timeout (int): The request timeout in seconds.
+        use_cache (bool): Whether to send conditional headers and cache the response.
+
+    Returns:
+        FetchResult: The status code and body of the response.
+
+    Raises:
+        requests.RequestException: If the request fails.
+    """
+    session = get_session()
+    cache = get_cache() if use_cache else None
+    headers = cache.validators(url) if cache else {}
+
+    with span("http.fetch", url=url) as attributes:
+        response = session.get(url, timeout=timeout, headers=headers)
+        count("http_requests_total", status=response.status_code)
+        count("http_response_bytes_total", len(response.content))
+
+        result = None
+        if response.status_code == 304 and cache:
+            body = cache.load(url)
+            if body is not None:
+                result = FetchResult(url, 200, body, from_cache=True)
+            else:
+                # The cached body is gone, fetch the page unconditionally
+                response = session.get(url, timeout=timeout)
+                count("http_requests_total", status=response.status_code)
+                count("http_response_bytes_total", len(response.content))
+
+        if result is None:
+            if response.status_code == 200 and cache:
+                cache.store(url, response)
+            result = FetchResult(url, response.status_code, response.content)
+
+        attributes.update(status=result.status_code, from_cache=result.from_cache)
+        return result
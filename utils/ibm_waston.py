@@ -1,55 +1,160 @@
 import os
 import json
-import streamlit as st
-from ibm_watson import AssistantV1
-from ibm_cloud_sdk_core.authenticators import IAMAuthenticator
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from utils import required_intents
-from utils.prompt_processor import UserPrompt, process_prompt
-from utils.parser import parse_json_code
-from utils.writer import write_to_file
+from utils.prompt_processor import (
+    UserPrompt,
+    forget_response,
+    process_prompt,
+    stream_prompt,
+)
+from utils.prompt_builder import (
+    PROMPT_TOKEN_BUDGET,
+    PromptBuilder,
+    serialize_actions,
+    serialize_intents,
+    trim_to_tokens,
+)
+from utils.parser import parse_json_code, parse_stream, validate_intents_and_actions
+from utils.resilience import get_provider
+from utils.metrics import span
+from utils.templates import TEMPLATE_VERTICAL, get_template_registry
+from utils.vector_index import VectorIndex, retrieve_intent_context
+from utils.artifacts import Artifact, get_artifact_store, site_key
+from utils.workspace_catalog import PAGE_LIMIT, WorkspaceCatalog, format_workspace
 from utils.logger import get_logger
 
 
 # Initialize the logger
 log = get_logger(__name__)
 
-# IBM Watson Assistant Credentials
-API_KEY = os.getenv("ASSISTANT_APIKEY")  # Fetch from .env file
-SERVICE_URL = os.getenv("ASSISTANT_URL")  # Fetch from .env file
+# The Watson Assistant client, created on first use and shared by the process
+_assistant = None
+_assistant_lock = threading.Lock()
+
+
+def get_assistant():
+    """
+    Return the process-wide Watson Assistant client, creating it on first use.
+
+    The SDK import and authenticator setup are deferred until a Watson call is
+    actually made, and the client is kept across Streamlit reruns, so its IAM
+    token is reused until it expires.
+
+    Returns:
+        AssistantV1: The Watson Assistant client.
+
+    Raises:
+        ValueError: If the API key or service URL is not set.
+    """
+    global _assistant
+
+    with _assistant_lock:
+        if _assistant is None:
+            # IBM Watson Assistant Credentials
+            api_key = os.getenv("ASSISTANT_APIKEY")  # Fetch from .env file
+            service_url = os.getenv("ASSISTANT_URL")  # Fetch from .env file
+
+            # Check if environment variables are loaded correctly
+            if not api_key or not service_url:
+                message = "IBM API Key or Service URL not set in the environment variables."
+                log.error(message)
+                raise ValueError(message)
+
+            from ibm_watson import AssistantV1
+            from ibm_cloud_sdk_core.authenticators import IAMAuthenticator
+
+            # Setup the authenticator and Watson Assistant client
+            _assistant = AssistantV1(
+                version="2021-06-14",  # Use the correct Watson API version
+                authenticator=IAMAuthenticator(api_key),
+            )
+            _assistant.set_service_url(service_url)
 
-# Check if environment variables are loaded correctly
-if not API_KEY or not SERVICE_URL:
-    st.error("IBM API Key or Service URL not set in the environment variables.")
-    exit(1)
+        return _assistant
 
-# Setup the authenticator and Watson Assistant client
-authenticator = IAMAuthenticator(API_KEY)
-assistant = AssistantV1(
-    version="2021-06-14",  # Use the correct Watson API version
-    authenticator=authenticator,
+
+# Parallelism of the per-item upload fallback
+WATSON_UPLOAD_CONCURRENCY = int(os.getenv("WATSON_UPLOAD_CONCURRENCY", "8"))
+
+# Seconds a listing of the workspaces is reused before Watson is asked again
+WORKSPACE_LIST_TTL = float(os.getenv("WORKSPACE_LIST_TTL", "30"))
+
+# File the workspace catalog is saved to and warm-started from; empty disables it
+WORKSPACE_CATALOG_PATH = os.getenv("WORKSPACE_CATALOG_PATH", "")
+
+# Whether intents are generated with one small LLM request per required intent
+INTENTS_FAN_OUT = os.getenv("INTENTS_FAN_OUT", "0") == "1"
+
+# Number of fan-out requests sent to the LLM in parallel
+INTENTS_FAN_OUT_CONCURRENCY = int(
+    os.getenv("INTENTS_FAN_OUT_CONCURRENCY", str(len(required_intents) + 1))
 )
-assistant.set_service_url(SERVICE_URL)
 
 
-def list_workspaces():
+def _watson(method: str, **kwargs):
+    """
+    Call a Watson Assistant API method through the "watson" provider, which rate
+    limits the calls, retries transient failures and fails fast while Watson is down.
+
+    Returns:
+        dict: The result of the call.
+    """
+    with span(f"watson.{method}"):
+        return get_provider("watson").call(
+            lambda: getattr(get_assistant(), method)(**kwargs).get_result()
+        )
+
+
+_catalog = None
+_catalog_lock = threading.Lock()
+
+
+def get_workspace_catalog() -> WorkspaceCatalog:
+    """
+    Return the process-wide catalog of the account's workspaces.
+    """
+    global _catalog
+
+    with _catalog_lock:
+        if _catalog is None:
+            _catalog = WorkspaceCatalog(
+                lambda cursor: _watson(
+                    "list_workspaces", page_limit=PAGE_LIMIT, cursor=cursor
+                ),
+                ttl=WORKSPACE_LIST_TTL,
+                path=WORKSPACE_CATALOG_PATH or None,
+            )
+        return _catalog
+
+
+def invalidate_workspaces():
+    """
+    Make the next workspace lookup list the workspaces from Watson again.
+    """
+    get_workspace_catalog().invalidate()
+
+
+def list_workspaces(use_cache: bool = True):
     """
     Lists all available Watson Assistant workspaces.
 
+    The listing comes from the workspace catalog, which is reloaded every
+    WORKSPACE_LIST_TTL seconds and kept up to date when this process creates,
+    renames or deletes a workspace.
+
+    Args:
+        use_cache (bool): Whether the catalog may be used without reloading it.
+
     Returns:
-        list: A list of dictionaries representing the available workspaces, each containing 'workspace_id', 'name', and 'description'.
+        list: A list of dictionaries representing the available workspaces, each containing 'id', 'name', 'description', 'created' and 'updated'.
     """
+    catalog = get_workspace_catalog()
     try:
-        response = assistant.list_workspaces().get_result()
-        workspaces = response.get("workspaces", [])
-        formatted_workspaces = [
-            {
-                "id": workspace.get("workspace_id"),
-                "name": workspace.get("name"),
-                "description": workspace.get("description", "No description provided"),
-            }
-            for workspace in workspaces
-        ]
-        return formatted_workspaces
+        if not use_cache:
+            catalog.refresh()
+        return catalog.all()
     except Exception as e:
         log.error(f"Error listing workspaces: {e}")
         return []
@@ -66,7 +171,8 @@ def delete_workspace(workspace_id: str):
         bool: True if the workspace was successfully deleted, False otherwise.
     """
     try:
-        assistant.delete_workspace(workspace_id=workspace_id).get_result()
+        _watson("delete_workspace", workspace_id=workspace_id)
+        get_workspace_catalog().remove(workspace_id)
         log.info(f"Workspace {workspace_id} deleted successfully.")
         return True
     except Exception as e:
@@ -81,178 +187,535 @@ def create_workspace(site_title: str, site_description: str):
         site_title (str): The title of the website.
         site_description (str): A description of the website.
     """
-    response = assistant.create_workspace(
+    response = _watson(
+        "create_workspace",
         name=site_title,
         description=site_description,
         language="en",
-    ).get_result()
+    )
+
+    get_workspace_catalog().put(format_workspace(response))
 
     workspace_id = response["workspace_id"]
     return workspace_id
 
 
+def rename_workspace(workspace_id: str, site_title: str, site_description: str):
+    """
+    Give an existing workspace, such as a pre-created empty one, a website's name and description.
+
+    Args:
+        workspace_id (str): The ID of the workspace.
+        site_title (str): The title of the website.
+        site_description (str): A description of the website.
+    """
+    previous = fetch_workspace_details(workspace_id) or {}
+    response = _watson(
+        "update_workspace",
+        workspace_id=workspace_id,
+        name=site_title,
+        description=site_description,
+    )
+    get_workspace_catalog().put(
+        {
+            **previous,
+            "id": workspace_id,
+            "name": site_title,
+            "description": site_description,
+            "created": response.get("created") or previous.get("created", ""),
+            "updated": response.get("updated") or previous.get("updated", ""),
+        }
+    )
+
+
+def reuse_or_create_workspace(
+    site_title: str, site_description: str, workspace_id: str = None
+) -> tuple:
+    """
+    Reuses an existing Watson Assistant workspace if it still exists, or takes a new
+    one from the workspace pool.
+
+    Args:
+        site_title (str): The title of the website.
+        site_description (str): A description of the website.
+        workspace_id (str): The ID of the workspace to reuse, if any.
+
+    Returns:
+        tuple: The workspace ID and whether the existing workspace was reused.
+    """
+    from utils.workspace_pool import get_workspace_pool
+
+    if workspace_id and fetch_workspace_details(workspace_id):
+        return workspace_id, True
+    return get_workspace_pool().acquire(site_title, site_description), False
+
+
 def fetch_workspace_details(workspace_id):
     """
-    Fetch the details of the selected workspace by its ID.
+    Fetch the details of the selected workspace by its ID, from the workspace catalog.
 
     Args:
         workspace_id (str): The ID of the workspace.
+
+    Returns:
+        dict: The workspace, or None if it does not exist or the workspaces cannot be listed.
+    """
+    try:
+        return get_workspace_catalog().get(workspace_id)
+    except Exception as e:
+        log.error(f"Error fetching workspace {workspace_id}: {e}")
+        return None
+
+
+def load_predefined_intents_and_actions(vertical: str = TEMPLATE_VERTICAL) -> tuple:
+    """
+    Loads the predefined intent and action templates from the samples directories.
+
+    The templates are served from the process-wide template registry, which reads
+    the files once and reloads them only when they change.
+
+    Args:
+        vertical (str): The industry vertical whose templates are added to the
+            common ones, defaults to the TEMPLATE_VERTICAL environment variable.
+
+    Returns:
+        tuple: A tuple containing the predefined intents and actions.
+    """
+    return get_template_registry().templates(vertical)
+
+
+def _summary_context(summary: str) -> str:
+    """
+    The website summary, trimmed to a quarter of the prompt budget when it is sent
+    alongside retrieved page chunks.
+    """
+    return f"Website Summary: {trim_to_tokens(summary, PROMPT_TOKEN_BUDGET // 4)}"
+
+
+def _website_context(summary: str, index: VectorIndex, templates: tuple) -> str:
     """
-    # Replace with actual API call to fetch workspace details
-    workspaces = list_workspaces()
-    for ws in workspaces:
-        if ws["id"] == workspace_id:
-            return ws
-    return None
+    Describe the website for the intents prompt: its summary, followed by the page
+    chunks retrieved for each required intent if the website is indexed. Intents
+    without chunks are answered from the summary.
+    """
+    if index is None or not len(index):
+        return f"Website Summary: {summary}"
+
+    sections = []
+    for intent, texts in retrieve_intent_context(index, templates).items():
+        lines = "\n".join(f"- {text}" for text in texts) or "- (see the website summary)"
+        sections.append(f"## {intent}\n{lines}")
+
+    return (
+        _summary_context(summary)
+        + "\n\nWebsite Content (the most relevant page extracts for each intent):\n\n"
+        + "\n\n".join(sections)
+    )
+
+
+# Shape of the response, which also tells the LLM the fields of new templates
+RESPONSE_FORMAT = json.dumps(
+    {
+        "new_intents": [
+            {"intent": "...", "description": "...", "examples": [{"text": "..."}]}
+        ],
+        "new_actions": [
+            {"action_name": "...", "conditions": "#intent", "output_text": "..."}
+        ],
+    }
+)
+
+
+def _intents_prompt(summary: str, index: VectorIndex, templates: tuple) -> str:
+    """
+    Build the intents prompt: templates are listed compactly, the required intents
+    are named once, and the website content is trimmed to fit the token budget.
+    """
+    predefined_intents, predefined_actions = templates
+    builder = PromptBuilder(name="intents prompt")
+    builder.add(
+        "instructions",
+        "Complete the intents and actions of an IBM Watson Assistant for the website "
+        "below.\n"
+        f"Required intents: {', '.join(required_intents)}.\n"
+        "- Add the required intents that are missing or have no examples.\n"
+        "- Add new intents based on the website content.\n"
+        "- Add an action for every required or new intent without one.\n"
+        "Do not repeat existing intents or actions.",
+    )
+    builder.add("website", _website_context(summary, index, templates), trim=True)
+    builder.add(
+        "intents",
+        f"Existing intents:\n{serialize_intents(predefined_intents)}",
+        baseline=f"Current Intents: {serialize_intents(predefined_intents, 'full')}",
+    )
+    builder.add(
+        "actions",
+        f"Existing actions:\n{serialize_actions(predefined_actions)}",
+        baseline=f"Current Actions: {serialize_actions(predefined_actions, 'full')}",
+    )
+    builder.add(
+        "format",
+        "Return ONLY the new intents and actions as a JSON object, with no text "
+        f"before it:\n{RESPONSE_FORMAT}",
+    )
+    return builder.build()
+
+
+def _has_action(intent: str, actions: list) -> bool:
+    return any(f"#{intent}" in (action.get("conditions") or "") for action in actions)
+
+
+def _fan_out_prompts(summary: str, index: VectorIndex, templates: tuple) -> list:
+    """
+    Build the fan-out prompts: one per required intent that is missing or has no
+    action, with the page chunks retrieved for it, and one for extra intents, with
+    the website summary.
+
+    Returns:
+        list: (name, prompt text) tuples.
+    """
+    predefined_intents, predefined_actions = templates
+    existing = {intent["intent"] for intent in predefined_intents}
+    if index is not None and len(index):
+        context = retrieve_intent_context(index, templates)
+    else:
+        context = {}
+
+    prompts = []
+    for intent in required_intents:
+        missing = intent not in existing
+        if not missing and _has_action(intent, predefined_actions):
+            continue
+
+        if context.get(intent):
+            lines = "\n".join(f"- {text}" for text in context[intent])
+            website = (
+                f"{_summary_context(summary)}\n\n"
+                f"Website Content (page extracts about {intent}):\n{lines}"
+            )
+        else:
+            # Nothing was retrieved for the intent, so answer it from the summary
+            website = f"Website Summary: {summary}"
+
+        task = (
+            f"Write the '{intent}' intent, with at least 5 example user questions, "
+            f"and an action answering it from the website content, with conditions "
+            f"'#{intent}'."
+            if missing
+            else f"Write an action answering the existing '{intent}' intent from "
+            f"the website content, with conditions '#{intent}', and no intents."
+        )
+        builder = PromptBuilder(name="intent fan-out prompt")
+        builder.add("instructions", f"You build an IBM Watson Assistant. {task}")
+        builder.add("website", website, trim=True)
+        builder.add(
+            "format",
+            "Return ONLY a JSON object, with no text before it:\n" + RESPONSE_FORMAT,
+        )
+        prompts.append((intent, builder.build()))
+
+    builder = PromptBuilder(name="intent fan-out prompt")
+    builder.add(
+        "instructions",
+        "You build an IBM Watson Assistant. Add intents, and an action for each, for "
+        "other questions visitors of the website below are likely to ask. Do not "
+        "repeat these intents: "
+        + ", ".join(sorted(existing | set(required_intents)))
+        + ".",
+    )
+    # The chunks retrieved for the required intents would hide the rest of the site
+    builder.add("website", f"Website Summary: {summary}", trim=True)
+    builder.add(
+        "format",
+        "Return ONLY a JSON object, with no text before it:\n" + RESPONSE_FORMAT,
+    )
+    prompts.append(("extra intents", builder.build()))
+    return prompts
 
 
-def get_intents_and_actions(summary: str) -> tuple:
+def _fan_out(summary: str, index: VectorIndex, templates: tuple) -> tuple:
+    """
+    Generate the new intents and actions with concurrent small requests, so that
+    the slowest single request bounds the wall-clock time and a failed or
+    malformed response only loses its own items.
+
+    Returns:
+        tuple: The new intents, the new actions, the validation errors, and
+            whether every request failed.
+    """
+
+    def request(item):
+        name, text = item
+        prompt = UserPrompt(text=text)
+        response = process_prompt(prompt)
+        data = parse_json_code(response) if response else None
+        if not isinstance(data, dict):
+            log.error(f"No usable response for {name}, skipping it.")
+            forget_response(prompt)
+            return None
+        return validate_intents_and_actions(data)
+
+    prompts = _fan_out_prompts(summary, index, templates)
+    new_intents, new_actions, errors, failed = [], [], [], 0
+    with ThreadPoolExecutor(max_workers=INTENTS_FAN_OUT_CONCURRENCY) as pool:
+        # Results are merged in prompt order, so the output does not depend on timing
+        for result in pool.map(request, prompts):
+            if result is None:
+                failed += 1
+                continue
+            new_intents.extend(result[0])
+            new_actions.extend(result[1])
+            errors.extend(result[2])
+
+    log.info(f"Fan-out: {len(prompts) - failed} of {len(prompts)} requests succeeded.")
+    return new_intents, new_actions, errors, failed == len(prompts)
+
+
+def get_intents_and_actions(
+    summary: str,
+    templates: tuple = None,
+    index: VectorIndex = None,
+    stream: bool = False,
+    fan_out: bool = None,
+) -> tuple:
     """
     Fetches predefined intents and actions, then sends website summary, current intents, and actions to the LLM
     to complete unanswered intents and generate additional intents and actions based on the website details.
 
     Args:
         summary (str): The summarized content of the website.
+        templates (tuple): Preloaded (intents, actions) templates, loaded from disk if not given.
+        index (VectorIndex): The website's page index. If given, the prompt carries a
+            trimmed summary and the top-k page chunks of each required intent instead
+            of the whole summary, so its size no longer grows with the website.
+        stream (bool): Whether to stream the response and parse each intent and action
+            as soon as it is complete, keeping the complete items of a response
+            that breaks off.
+        fan_out (bool): Whether to send one concurrent request per required intent
+            that is missing or has no action, plus one for extra intents, instead of
+            a single request. Defaults to the INTENTS_FAN_OUT environment variable.
+            Fan-out requests are not streamed.
 
     Returns:
         tuple: A tuple containing the updated intents and actions.
     """
-    # Directories for predefined intents and actions
-    intents_dir = "samples/intents"
-    actions_dir = "samples/actions"
-
-    predefined_intents = []
-    predefined_actions = []
-
-    # Process predefined intents
-    for filename in os.listdir(intents_dir):
-        if filename.endswith(".json"):
-            file_path = os.path.join(intents_dir, filename)
-            with open(file_path, "r") as f:
-                content = json.load(f)
-                if isinstance(content, list):  # Ensure it's a list
-                    predefined_intents.extend(content)  # Add all intents to the list
-
-    # Process predefined actions
-    for filename in os.listdir(actions_dir):
-        if filename.endswith(".json"):
-            file_path = os.path.join(actions_dir, filename)
-            with open(file_path, "r") as f:
-                content = json.load(f)
-                if isinstance(content, list):  # Ensure it's a list
-                    predefined_actions.extend(content)  # Add all actions to the list
-
-    # Construct the prompt to ask the LLM to complete the intents and actions
-    prompt = UserPrompt(
-        text=f"""
-        I have a website summary and a list of intents and actions for an IBM Watson Assistant. 
-        Please help complete the unanswered intents (like {', '.join(required_intents)}), 
-        add new intents based on the website content, and create actions for these specific intents if they do not have actions yet. 
-        Do not repeat existing intents or actions.
-
-        Website Summary: {summary}
-
-        Current Intents: {json.dumps(predefined_intents, indent=2)}
-
-        Current Actions: {json.dumps(predefined_actions, indent=2)}
-
-        Ensure actions are generated for the following intents if they do not already have actions: {', '.join(required_intents)}
-
-        Please return your response in the following format:
-
-        {{
-            "new_intents": [...],
-            "new_actions": [...],
-        }}
-
-        Provide ONLY new intents and actions based on the website content, and add actions for the required intents {', '.join(required_intents)} if they are missing. 
-        Do not include a prefix like 'Here is the response:' before the JSON, as it interferes with JSON extraction and parsing.
-        """
-    )
+    if templates is None:
+        templates = load_predefined_intents_and_actions()
+    predefined_intents, predefined_actions = templates
+
+    if fan_out is None:
+        fan_out = INTENTS_FAN_OUT
+
+    if fan_out:
+        new_intents, new_actions, errors, all_failed = _fan_out(summary, index, templates)
+        if all_failed:
+            import streamlit as st
+
+            st.error("Failed to generate or complete intents and actions.")
+            return predefined_intents, predefined_actions
+    elif stream:
+        prompt = UserPrompt(text=_intents_prompt(summary, index, templates))
+        # Keep every item that completed, even if the stream breaks off
+        collected, broken = _collect_stream(stream_prompt(prompt))
+        new_intents, new_actions, errors = validate_intents_and_actions(collected)
+        if not new_intents and not new_actions:
+            forget_response(prompt)
+
+            import streamlit as st
+
+            st.error("Failed to generate or complete intents and actions.")
+            return predefined_intents, predefined_actions
+        if broken:
+            import streamlit as st
+
+            st.warning(
+                "The LLM response broke off; only the intents and actions completed "
+                "before it are used."
+            )
+    else:
+        # Process the prompt to get the response from the LLM
+        prompt = UserPrompt(text=_intents_prompt(summary, index, templates))
+        completed_response = process_prompt(prompt)
 
-    # Process the prompt to get the response from the LLM
-    completed_response = process_prompt(prompt)
+        # Parse the completed response from LLM to get new intents and actions
+        updated_data = parse_json_code(completed_response) if completed_response else None
 
-    # If the LLM fails to provide a valid response, return the original intents and actions
-    if not completed_response:
-        st.error("Failed to generate or complete intents and actions.")
-        return predefined_intents, predefined_actions
+        # If the LLM fails to provide a valid response, return the original intents and actions
+        if not isinstance(updated_data, dict):
+            # Ask the LLM again on the next attempt instead of replaying this response
+            forget_response(prompt)
 
-    # Extract the updated intents and actions from the LLM response (assume it's a JSON-like string)
-    try:
-        # Parse the completed response from LLM to get new intents and actions
-        updated_data = parse_json_code(completed_response)
-
-        # Retrieve new intents and actions or fallback to current intents/actions
-        new_intents = updated_data.get("new_intents", [])
-        new_actions = updated_data.get("new_actions", [])
-
-        # Merge new intents with the current ones, avoiding duplicates
-        updated_intents = {
-            intent["intent"]: intent for intent in predefined_intents
-        }  # Create a dictionary for fast lookup
-        for intent in new_intents:
-            if intent["intent"] not in updated_intents:
-                updated_intents[intent["intent"]] = (
-                    intent  # Add new intent if it doesn't exist
-                )
-
-        # Convert updated_intents back to a list
-        updated_intents = list(updated_intents.values())
-
-        # Merge new actions with the current ones, avoiding duplicates
-        updated_actions = {
-            action["action_name"]: action for action in predefined_actions
-        }  # Create a dictionary for fast lookup
-        for action in new_actions:
-            if action["action_name"] not in updated_actions:
-                updated_actions[action["action_name"]] = (
-                    action  # Add new action if it doesn't exist
-                )
-
-        # Convert updated_actions back to a list
-        updated_actions = list(updated_actions.values())
-
-    except (json.JSONDecodeError, KeyError) as e:
-        log.error(f"Error processing LLM response: {e}")
-        return (
-            predefined_intents,
-            predefined_actions,
-        )  # Return the current intents and actions in case of an error
+            import streamlit as st
+
+            st.error("Failed to generate or complete intents and actions.")
+            return predefined_intents, predefined_actions
+
+        new_intents, new_actions, errors = validate_intents_and_actions(updated_data)
+
+    # Invalid items are dropped one by one instead of discarding the whole response
+    for key, position, reason in errors:
+        log.warning(f"Skipped {key}[{position}] of the LLM response: {reason}")
+
+    # Merge new intents with the current ones, avoiding duplicates
+    updated_intents = {
+        intent["intent"]: intent for intent in predefined_intents
+    }  # Create a dictionary for fast lookup
+    for intent in new_intents:
+        if intent["intent"] not in updated_intents:
+            updated_intents[intent["intent"]] = (
+                intent  # Add new intent if it doesn't exist
+            )
+
+    # Convert updated_intents back to a list
+    updated_intents = list(updated_intents.values())
+
+    # Merge new actions with the current ones, avoiding duplicates
+    updated_actions = {
+        action["action_name"]: action for action in predefined_actions
+    }  # Create a dictionary for fast lookup
+    for action in new_actions:
+        if action["action_name"] not in updated_actions:
+            updated_actions[action["action_name"]] = (
+                action  # Add new action if it doesn't exist
+            )
+
+    # Convert updated_actions back to a list
+    updated_actions = list(updated_actions.values())
 
     # Return the merged updated intents and actions
     return updated_intents, updated_actions
 
 
-def generate_intents_and_actions(intents: list, actions: list, workspace_id: str):
+def _collect_stream(chunks) -> tuple:
+    """
+    Collect the new intents and actions of a streamed LLM response as each item completes.
+
+    Returns:
+        tuple: The collected {"new_intents": [...], "new_actions": [...]}, and
+            whether the stream broke off before it was complete.
+    """
+    collected = {"new_intents": [], "new_actions": []}
+    try:
+        for key, item in parse_stream(chunks, list(collected)):
+            collected[key].append(item)
+    except Exception as e:
+        # Every item completed before the stream broke off is still valid
+        log.error(f"The intents stream broke off, keeping the completed items: {e}")
+        return collected, True
+    return collected, False
+
+
+def _intent_payload(intent: dict) -> dict:
+    """
+    Convert an intent dictionary into a Watson Assistant intent definition.
+    """
+    return {
+        "intent": intent.get("intent"),  # Safely access "intent"
+        "description": intent.get("description", ""),
+        "examples": intent.get("examples", []),
+    }
+
+
+def _dialog_node_payload(action: dict) -> dict:
+    """
+    Convert an action dictionary into a Watson Assistant dialog node definition.
+    """
+    return {
+        "dialog_node": action.get("action_name"),  # Safely access "action_name"
+        "conditions": action.get("conditions", ""),
+        "output": {"text": action.get("output_text", "")},
+        "title": action.get("action_name"),
+        "description": f"Action for {action.get('action_name', '')}",
+    }
+
+
+def _try_upload(call, name: str):
+    """
+    Run a single Watson call; transient failures are retried by the "watson" provider.
+
+    Returns:
+        tuple: The item name and the last error, or None if the call succeeded.
+    """
+    try:
+        call()
+        return None
+    except Exception as e:
+        log.error(f"Failed to upload {name}: {e}")
+        return name, str(e)
+
+
+def _upload_items(workspace_id: str, intents: list, dialog_nodes: list) -> list:
+    """
+    Upload intents and dialog nodes one by one over a bounded thread pool.
+
+    Returns:
+        list: (name, error) tuples for the items that could not be uploaded.
+    """
+    calls = [
+        (
+            lambda intent=intent: _watson(
+                "create_intent", workspace_id=workspace_id, **intent
+            ),
+            f"intent '{intent['intent']}'",
+        )
+        for intent in intents
+    ] + [
+        (
+            lambda node=node: _watson(
+                "create_dialog_node", workspace_id=workspace_id, **node
+            ),
+            f"dialog node '{node['dialog_node']}'",
+        )
+        for node in dialog_nodes
+    ]
+
+    with ThreadPoolExecutor(max_workers=WATSON_UPLOAD_CONCURRENCY) as pool:
+        results = pool.map(lambda item: _try_upload(*item), calls)
+        return [error for error in results if error]
+
+
+def generate_intents_and_actions(
+    intents: list, actions: list, workspace_id: str, bulk: bool = True
+) -> list:
     """
     Generates intents, actions, and entities for Watson Assistant.
+
+    All intents and dialog nodes are pushed in a single append-mode workspace
+    update. If that fails, they are uploaded item by item in parallel, with
+    retries, and the items that still fail are reported.
+
     Args:
         intents (list): List of user intents/inputs dictionaries.
         actions (list): List of action dictionaries to create dialog nodes.
         workspace_id (str): The Watson Assistant workspace ID.
+        bulk (bool): Whether to try the single workspace update first.
+
+    Returns:
+        list: (name, error) tuples for the items that could not be uploaded.
     """
-    # Create intents
-    for intent in intents:
-        if isinstance(intent, dict):  # Ensure each item is a dictionary
-            assistant.create_intent(
+    # Ensure each item is a dictionary
+    intent_payloads = [_intent_payload(i) for i in intents if isinstance(i, dict)]
+    node_payloads = [_dialog_node_payload(a) for a in actions if isinstance(a, dict)]
+
+    if bulk:
+        try:
+            _watson(
+                "update_workspace",
                 workspace_id=workspace_id,
-                intent=intent.get("intent"),  # Safely access "intent"
-                description=intent.get("description", ""),
-                examples=intent.get("examples", []),
+                intents=intent_payloads,
+                dialog_nodes=node_payloads,
+                append=True,
             )
-
-    # Create dialog nodes (actions)
-    for action in actions:
-        if isinstance(action, dict):  # Ensure each item is a dictionary
-            assistant.create_dialog_node(
-                workspace_id=workspace_id,
-                dialog_node=action.get("action_name"),  # Safely access "action_name"
-                conditions=action.get("conditions", ""),
-                output={"text": action.get("output_text", "")},
-                title=action.get("action_name"),
-                description=f"Action for {action.get('action_name', '')}",
+            log.info(
+                f"Uploaded {len(intent_payloads)} intents and {len(node_payloads)} "
+                f"dialog nodes to workspace {workspace_id}."
             )
+            return []
+        except Exception as e:
+            log.error(f"Bulk workspace update failed, uploading items one by one: {e}")
+
+    return _upload_items(workspace_id, intent_payloads, node_payloads)
 
 
 def generate_watson_workspace_json(
@@ -292,13 +755,20 @@ def generate_watson_workspace_json(
     return assistant_json
 
 
-def save_workspace_json(data, filename):
+def save_workspace_json(data, filename, url: str = None) -> Artifact:
     """
-    Save JSON data to a file.
+    Save the workspace JSON in the artifact store, in the background.
 
     Args:
         data (dict): JSON data to save.
-        filename (str): Name of the file.
+        filename (str): The website title (used for the file path).
+        url (str): The website URL, which keeps sites with the same title apart.
+
+    Returns:
+        Artifact: The stored workspace JSON, whose bytes the download buttons serve.
     """
-    file_path = write_to_file(data, filename, file_type="json")
-    st.info(f"File saved successfully: `{file_path}`")
+    artifact = get_artifact_store().put(site_key(filename, url), "assistant", data)
+    import streamlit as st
+
+    st.info(f"Saving workspace JSON to `{artifact.path}`")
+    return artifact
@@ -0,0 +1,231 @@
+import os
+import time
+import sqlite3
+import hashlib
+import threading
+from collections import OrderedDict
+from utils.logger import get_logger
+
+log = get_logger(__name__)
+
+# On-disk cache of LLM responses, shared across processes and reruns
+LLM_CACHE_PATH = os.getenv("LLM_CACHE_PATH", "samples/cache/llm.sqlite3")
+
+# Seconds a cached response stays valid, 0 disables the cache
+LLM_CACHE_TTL = int(os.getenv("LLM_CACHE_TTL", str(7 * 24 * 3600)))
+
+# Maximum number of responses kept on disk and in memory
+LLM_CACHE_MAX_ENTRIES = int(os.getenv("LLM_CACHE_MAX_ENTRIES", "10000"))
+LLM_CACHE_MEMORY_ENTRIES = int(os.getenv("LLM_CACHE_MEMORY_ENTRIES", "256"))
+
+
+def normalize_prompt(text: str) -> str:
+    """
+    Collapse whitespace so prompts that only differ in indentation share a cache entry.
+    """
+    return " ".join(text.split())
+
+
+class LLMCache:
+    """
+    Content-addressed cache of LLM responses keyed on (model, normalized prompt).
+
+    Lookups go through an in-memory LRU tier first and a SQLite tier second.
+    Entries expire after `ttl` seconds; when the disk tier grows beyond
+    `max_entries`, the least recently used entries are evicted. Errors of the
+    disk tier, such as a database locked by another process, are logged and
+    treated as misses: the cache never fails an LLM call.
+    """
+
+    def __init__(
+        self,
+        path: str = LLM_CACHE_PATH,
+        ttl: int = LLM_CACHE_TTL,
+        max_entries: int = LLM_CACHE_MAX_ENTRIES,
+        memory_entries: int = LLM_CACHE_MEMORY_ENTRIES,
+    ):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.memory_entries = memory_entries
+        self.stats = {"memory_hits": 0, "disk_hits": 0, "misses": 0, "evictions": 0}
+
+        self._memory = OrderedDict()  # key -> (response, created)
+        self._lock = threading.Lock()
+
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute(
+            """
+            CREATE TABLE IF NOT EXISTS responses (
+                key TEXT PRIMARY KEY,
+                response TEXT NOT NULL,
+                created REAL NOT NULL,
+                accessed REAL NOT NULL
+            )
+            """
+        )
+        self._db.commit()
+
+    @staticmethod
+    def key(model: str, text: str) -> str:
+        return hashlib.sha256(f"{model}\0{normalize_prompt(text)}".encode()).hexdigest()
+
+    @property
+    def enabled(self) -> bool:
+        return self.ttl > 0
+
+    def _remember(self, key: str, response: str, created: float):
+        self._memory[key] = (response, created)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_entries:
+            self._memory.popitem(last=False)
+
+    def get(self, model: str, text: str):
+        """
+        Return the cached response for a prompt, or None on a miss.
+
+        Args:
+            model (str): The model the prompt is sent to.
+            text (str): The prompt text.
+
+        Returns:
+            str: The cached response, or None.
+        """
+        if not self.enabled:
+            return None
+
+        key = self.key(model, text)
+        now = time.time()
+
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry and now - entry[1] < self.ttl:
+                self._memory.move_to_end(key)
+                self.stats["memory_hits"] += 1
+                return entry[0]
+
+            try:
+                row = self._db.execute(
+                    "SELECT response, created FROM responses WHERE key = ?", (key,)
+                ).fetchone()
+            except sqlite3.Error as e:
+                log.warning(f"LLM cache lookup failed: {e}")
+                row = None
+            if row and now - row[1] < self.ttl:
+                try:
+                    self._db.execute(
+                        "UPDATE responses SET accessed = ? WHERE key = ?", (now, key)
+                    )
+                    self._db.commit()
+                except sqlite3.Error as e:
+                    # Only the LRU order is lost
+                    log.debug(f"LLM cache access time not updated: {e}")
+                    self._rollback()
+                self._remember(key, row[0], row[1])
+                self.stats["disk_hits"] += 1
+                return row[0]
+
+            self._memory.pop(key, None)
+            self.stats["misses"] += 1
+            return None
+
+    def set(self, model: str, text: str, response: str):
+        """
+        Store the response to a prompt, evicting the least recently used entries if needed.
+
+        Args:
+            model (str): The model the prompt was sent to.
+            text (str): The prompt text.
+            response (str): The LLM response.
+        """
+        if not self.enabled:
+            return
+
+        key = self.key(model, text)
+        now = time.time()
+
+        with self._lock:
+            self._remember(key, response, now)
+            try:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?)",
+                    (key, response, now, now),
+                )
+
+                # Drop expired entries, then the least recently used ones over the cap
+                expired = self._db.execute(
+                    "DELETE FROM responses WHERE created < ?", (now - self.ttl,)
+                ).rowcount
+                overflow = self._db.execute(
+                    """
+                    DELETE FROM responses WHERE key IN (
+                        SELECT key FROM responses ORDER BY accessed DESC LIMIT -1 OFFSET ?
+                    )
+                    """,
+                    (self.max_entries,),
+                ).rowcount
+                self._db.commit()
+            except sqlite3.Error as e:
+                log.warning(f"LLM cache write failed, the response is only kept in memory: {e}")
+                self._rollback()
+                return
+            self.stats["evictions"] += expired + overflow
+
+    def delete(self, model: str, text: str):
+        """
+        Evict the response to a prompt, e.g. one the caller could not use, so that
+        the prompt is sent to the LLM again instead of replaying it.
+
+        Args:
+            model (str): The model the prompt was sent to.
+            text (str): The prompt text.
+        """
+        key = self.key(model, text)
+        with self._lock:
+            self._memory.pop(key, None)
+            try:
+                self._db.execute("DELETE FROM responses WHERE key = ?", (key,))
+                self._db.commit()
+            except sqlite3.Error as e:
+                log.warning(f"LLM cache eviction failed: {e}")
+                self._rollback()
+
+    def _rollback(self):
+        try:
+            self._db.rollback()
+        except sqlite3.Error:
+            pass
+
+    def clear(self):
+        """
+        Remove every cached response.
+        """
+        with self._lock:
+            self._memory.clear()
+            self._db.execute("DELETE FROM responses")
+            self._db.commit()
+
+    @property
+    def hits(self) -> int:
+        return self.stats["memory_hits"] + self.stats["disk_hits"]
+
+    @property
+    def misses(self) -> int:
+        return self.stats["misses"]
+
+
+_cache = None
+_lock = threading.Lock()
+
+
+def get_llm_cache() -> LLMCache:
+    """
+    Return the process-wide LLM response cache.
+    """
+    global _cache
+
+    with _lock:
+        if _cache is None:
+            _cache = LLMCache()
+        return _cache
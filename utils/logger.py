@@ -1,13 +1,40 @@
+import os
+import random
 import logging
 
+# Level of the application loggers, e.g. "DEBUG" to include raw LLM responses
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
+
+# Fraction of INFO and DEBUG records kept; warnings and errors are always kept
+LOG_SAMPLE_RATE = float(os.getenv("LOG_SAMPLE_RATE", "1"))
+
+
+class SamplingFilter(logging.Filter):
+    """
+    Keeps a random fraction of the records below WARNING, to bound log volume
+    under load without losing warnings and errors.
+    """
+
+    def __init__(self, rate: float):
+        super().__init__()
+        self.rate = rate
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        return record.levelno >= logging.WARNING or random.random() < self.rate
+
 
 def get_logger(name: str):
     logger = logging.getLogger(name)
+    if logger.handlers:
+        return logger
+
     handler = logging.StreamHandler()
     formatter = logging.Formatter(
         "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
     )
     handler.setFormatter(formatter)
+    if LOG_SAMPLE_RATE < 1:
+        handler.addFilter(SamplingFilter(LOG_SAMPLE_RATE))
     logger.addHandler(handler)
-    logger.setLevel(logging.INFO)
+    logger.setLevel(LOG_LEVEL)
     return logger
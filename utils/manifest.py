@@ -0,0 +1,162 @@
+import os
+import json
+import hashlib
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from urllib.parse import urlparse
+from utils.artifacts import get_artifact_store, site_key
+from utils.summarizer import MapResults
+from utils.logger import get_logger
+
+log = get_logger(__name__)
+
+# Directory holding one crawl manifest per website
+MANIFEST_DIR = os.getenv("MANIFEST_DIR", "samples/manifests")
+
+
+@dataclass
+class CrawlDiff:
+    added: list = field(default_factory=list)
+    changed: list = field(default_factory=list)
+    removed: list = field(default_factory=list)
+
+    @property
+    def unchanged(self) -> bool:
+        return not (self.added or self.changed or self.removed)
+
+
+class SiteManifest:
+    """
+    Persistent record of a website's last successful build: the content hash of
+    every crawled page, the summaries of its page chunks, the site title and the
+    Watson workspace it was uploaded to.
+
+    A crawl is compared against the manifest with compare(), and map_results is
+    handed to summarize_pages() to reuse the chunk summaries of unchanged pages; the
+    new page hashes and chunk summaries are only written by save(), once the whole
+    build has succeeded.
+    """
+
+    def __init__(self, url: str, data: dict = None):
+        self.url = url
+        self.data = data or {"url": url, "pages": {}}
+        self.diff = None
+        self._pending_pages = None
+        self.map_results = MapResults(
+            groups=self.data.get("summary_groups", 0),
+            summaries=dict(self.data.get("chunk_summaries", {})),
+        )
+
+    @staticmethod
+    def path_for(url: str) -> str:
+        """
+        Build the manifest file path for a website URL.
+        """
+        key = hashlib.sha256(url.encode("utf-8")).hexdigest()[:16]
+        return os.path.join(MANIFEST_DIR, f"{urlparse(url).netloc}-{key}.json")
+
+    @classmethod
+    def load(cls, url: str):
+        """
+        Load the manifest of a website, or an empty one if it was never built.
+
+        Args:
+            url (str): The start URL of the website.
+
+        Returns:
+            SiteManifest: The website's manifest.
+        """
+        try:
+            with open(cls.path_for(url), "r", encoding="utf-8") as f:
+                return cls(url, json.load(f))
+        except FileNotFoundError:
+            return cls(url)
+        except (OSError, ValueError) as e:
+            log.error(f"Ignoring unreadable manifest for {url}: {e}")
+            return cls(url)
+
+    @property
+    def title(self):
+        return self.data.get("title")
+
+    @property
+    def workspace_id(self):
+        return self.data.get("workspace_id")
+
+    @property
+    def unchanged(self) -> bool:
+        """
+        Whether the latest crawl matches the last successful build.
+        """
+        return bool(self.diff and self.diff.unchanged and self.data.get("built_at"))
+
+    def compare(self, pages) -> CrawlDiff:
+        """
+        Compare crawled pages with the manifest and remember them for the next save().
+
+        Args:
+            pages (iterable): The crawled pages (url, title, text, hash), e.g. a PageSpool.
+
+        Returns:
+            CrawlDiff: The added, changed and removed page URLs.
+        """
+        previous = self.data.get("pages", {})
+        current = {page.url: page.hash for page in pages}
+
+        self.diff = CrawlDiff(
+            added=[url for url in current if url not in previous],
+            changed=[
+                url for url in current if url in previous and previous[url] != current[url]
+            ],
+            removed=[url for url in previous if url not in current],
+        )
+        self._pending_pages = current
+
+        log.info(
+            f"Crawl of {self.url}: {len(self.diff.added)} added, "
+            f"{len(self.diff.changed)} changed, {len(self.diff.removed)} removed"
+        )
+        return self.diff
+
+    def load_summary(self):
+        """
+        Return the summary saved by the last build, or None if it is missing.
+        """
+        if not self.title:
+            return None
+        artifact = get_artifact_store().get(site_key(self.title, self.url), "summary")
+        return artifact.text() if artifact else None
+
+    def load_intents_and_actions(self):
+        """
+        Return the intents and actions saved by the last build, or None if they are missing.
+        """
+        if not self.title:
+            return None
+        artifact = get_artifact_store().get(site_key(self.title, self.url), "assistant")
+        try:
+            assistant_json = artifact.json()
+            return assistant_json["intents"], assistant_json["dialog_nodes"]
+        except (AttributeError, ValueError, KeyError):
+            return None
+
+    def save(self, title: str, workspace_id: str):
+        """
+        Record a successful build together with the page hashes of its crawl.
+
+        Args:
+            title (str): The website title used for the output files.
+            workspace_id (str): The Watson Assistant workspace the build was uploaded to.
+        """
+        if self._pending_pages is not None:
+            self.data["pages"] = self._pending_pages
+        self.data["summary_groups"] = self.map_results.groups
+        self.data["chunk_summaries"] = self.map_results.summaries
+        self.data["title"] = title
+        self.data["workspace_id"] = workspace_id
+        self.data["built_at"] = datetime.now(timezone.utc).isoformat()
+
+        os.makedirs(MANIFEST_DIR, exist_ok=True)
+        with open(self.path_for(self.url), "w", encoding="utf-8") as f:
+            json.dump(self.data, f, indent=2)
+        log.info(f"Manifest saved for {self.url}")
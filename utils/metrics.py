@@ -0,0 +1,326 @@
+import os
+import json
+import time
+import random
+import bisect
+import threading
+import contextvars
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from utils.logger import get_logger
+
+log = get_logger(__name__)
+
+# Upper bounds in seconds of the latency histogram buckets
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120)
+
+SERVICE_NAME = "ihelp"
+
+
+def _label_key(labels: dict) -> tuple:
+    return tuple(sorted((key, str(value)) for key, value in labels.items()))
+
+
+class Histogram:
+    """
+    Cumulative histogram of observed values over fixed bucket bounds.
+    """
+
+    def __init__(self, buckets: tuple = LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+
+class MetricsRegistry:
+    """
+    Thread-safe in-process store of counters and histograms, keyed by metric
+    name and labels, rendered in the Prometheus text format.
+
+    Example:
+        registry.count("crawl_pages_total")
+        registry.observe("http_request_seconds", 0.12, status=200)
+    """
+
+    def __init__(self):
+        self._counters = {}  # name -> label key -> value
+        self._histograms = {}  # name -> label key -> Histogram
+        self._collectors = []
+        self._lock = threading.Lock()
+
+    def count(self, name: str, value: float = 1, **labels):
+        """
+        Add `value` to a counter.
+        """
+        key = _label_key(labels)
+        with self._lock:
+            series = self._counters.setdefault(name, {})
+            series[key] = series.get(key, 0) + value
+
+    def observe(self, name: str, value: float, **labels):
+        """
+        Record a value, typically a duration in seconds, in a histogram.
+        """
+        key = _label_key(labels)
+        with self._lock:
+            series = self._histograms.setdefault(name, {})
+            if key not in series:
+                series[key] = Histogram()
+            series[key].observe(value)
+
+    def register_collector(self, collect):
+        """
+        Register a callable returning extra (name, labels, value) gauge samples,
+        read each time the metrics are rendered.
+        """
+        with self._lock:
+            self._collectors.append(collect)
+
+    def snapshot(self) -> dict:
+        """
+        Return the counters and the histogram counts and sums as plain dictionaries.
+        """
+        with self._lock:
+            counters = {
+                name: {key: value for key, value in series.items()}
+                for name, series in self._counters.items()
+            }
+            histograms = {
+                name: {key: (h.count, h.sum) for key, h in series.items()}
+                for name, series in self._histograms.items()
+            }
+        return {"counters": counters, "histograms": histograms}
+
+    def render(self) -> str:
+        """
+        Render every metric in the Prometheus text exposition format.
+        """
+
+        def labels_text(key, extra=()):
+            pairs = [*key, *extra]
+            if not pairs:
+                return ""
+            escaped = (
+                (k, v.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n"))
+                for k, v in pairs
+            )
+            return "{" + ",".join(f'{k}="{v}"' for k, v in escaped) + "}"
+
+        lines = []
+        with self._lock:
+            for name, series in sorted(self._counters.items()):
+                lines.append(f"# TYPE {name} counter")
+                for key, value in series.items():
+                    lines.append(f"{name}{labels_text(key)} {value}")
+
+            for name, series in sorted(self._histograms.items()):
+                lines.append(f"# TYPE {name} histogram")
+                for key, histogram in series.items():
+                    cumulative = 0
+                    for bound, count in zip(histogram.buckets, histogram.counts):
+                        cumulative += count
+                        le = (("le", str(bound)),)
+                        lines.append(f"{name}_bucket{labels_text(key, le)} {cumulative}")
+                    le = (("le", "+Inf"),)
+                    lines.append(f"{name}_bucket{labels_text(key, le)} {histogram.count}")
+                    lines.append(f"{name}_sum{labels_text(key)} {histogram.sum}")
+                    lines.append(f"{name}_count{labels_text(key)} {histogram.count}")
+            collectors = list(self._collectors)
+
+        gauges = {}
+        for collect in collectors:
+            try:
+                for name, labels, value in collect():
+                    gauges.setdefault(name, []).append((_label_key(labels), value))
+            except Exception as e:
+                log.error(f"Metrics collector failed: {e}")
+        for name, samples in sorted(gauges.items()):
+            lines.append(f"# TYPE {name} gauge")
+            lines.extend(f"{name}{labels_text(key)} {value}" for key, value in samples)
+
+        return "\n".join(lines) + "\n"
+
+
+registry = MetricsRegistry()
+
+count = registry.count
+observe = registry.observe
+
+
+class _TraceFile:
+    """
+    Appends finished spans to a file as OTLP/JSON lines, one span per line, in
+    the format read by the OpenTelemetry Collector's file receiver.
+    """
+
+    def __init__(self, path: str):
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._file = open(path, "a", encoding="utf-8")
+        self._lock = threading.Lock()
+
+    def export(self, span: dict):
+        record = {
+            "resourceSpans": [
+                {
+                    "resource": {
+                        "attributes": [
+                            {"key": "service.name", "value": {"stringValue": SERVICE_NAME}}
+                        ]
+                    },
+                    "scopeSpans": [{"scope": {"name": __name__}, "spans": [span]}],
+                }
+            ]
+        }
+        line = json.dumps(record, ensure_ascii=False) + "\n"
+        with self._lock:
+            self._file.write(line)
+            self._file.flush()
+
+
+_trace_file = None
+_trace_file_lock = threading.Lock()
+
+
+def _get_trace_file():
+    """
+    Open the file named by TRACE_FILE on first use, or return None if it is unset.
+
+    The variable is read lazily so that a .env file loaded after import applies.
+    """
+    global _trace_file
+
+    with _trace_file_lock:
+        if _trace_file is None:
+            path = os.getenv("TRACE_FILE")
+            _trace_file = _TraceFile(path) if path else False
+        return _trace_file or None
+
+
+# (trace ID, span ID) of the span running in the current context
+_current_span = contextvars.ContextVar("current_span", default=None)
+
+
+def _attribute(key: str, value) -> dict:
+    if isinstance(value, bool):
+        return {"key": key, "value": {"boolValue": value}}
+    if isinstance(value, int):
+        return {"key": key, "value": {"intValue": str(value)}}
+    if isinstance(value, float):
+        return {"key": key, "value": {"doubleValue": value}}
+    return {"key": key, "value": {"stringValue": str(value)}}
+
+
+@contextmanager
+def span(name: str, **attributes):
+    """
+    Time a unit of work: its duration is recorded in the `span_duration_seconds`
+    histogram, labelled with the span name and status, and the span is exported
+    to TRACE_FILE if set. Spans opened inside the block become its children.
+
+    Attributes can be added while the span runs through the yielded dictionary.
+
+    Example:
+        with span("llm.chat", model=model) as attributes:
+            response = llm.chat(messages)
+            attributes["completion_tokens"] = 120
+    """
+    parent = _current_span.get()
+    trace_id = parent[0] if parent else f"{random.getrandbits(128):032x}"
+    span_id = f"{random.getrandbits(64):016x}"
+    token = _current_span.set((trace_id, span_id))
+    started_ns, started = time.time_ns(), time.perf_counter()
+    error = None
+    try:
+        yield attributes
+    except BaseException as e:
+        error = e
+        raise
+    finally:
+        _current_span.reset(token)
+        seconds = time.perf_counter() - started
+        status = "error" if error is not None else "ok"
+        registry.observe("span_duration_seconds", seconds, span=name, status=status)
+
+        trace_file = _get_trace_file()
+        if trace_file is not None:
+            record = {
+                "traceId": trace_id,
+                "spanId": span_id,
+                "name": name,
+                "kind": 1,
+                "startTimeUnixNano": str(started_ns),
+                "endTimeUnixNano": str(started_ns + int(seconds * 1e9)),
+                "attributes": [_attribute(k, v) for k, v in attributes.items()],
+                "status": {"code": 2, "message": str(error)} if error else {"code": 1},
+            }
+            if parent:
+                record["parentSpanId"] = parent[1]
+            try:
+                trace_file.export(record)
+            except OSError as e:
+                log.error(f"Failed to export span '{name}': {e}")
+
+
+_server = None
+_server_lock = threading.Lock()
+
+
+def start_metrics_server(port: int = None, host: str = None):
+    """
+    Serve the metrics for Prometheus at GET /metrics from a background thread.
+
+    Does nothing if no port is configured; the server is started once per process.
+
+    Args:
+        port (int): The port to listen on, defaults to the METRICS_PORT variable.
+        host (str): The interface to listen on, defaults to METRICS_HOST or 127.0.0.1.
+
+    Returns:
+        ThreadingHTTPServer: The running server, or None if it is disabled.
+    """
+    global _server
+
+    port = port if port is not None else os.getenv("METRICS_PORT")
+    host = host or os.getenv("METRICS_HOST", "127.0.0.1")
+    if port is None or port == "":
+        return None
+
+    with _server_lock:
+        if _server is not None:
+            return _server
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            disable_nagle_algorithm = True
+
+            def do_GET(self):
+                if self.path != "/metrics":
+                    self.send_error(404)
+                    return
+                body = registry.render().encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        try:
+            _server = ThreadingHTTPServer((host, int(port)), Handler)
+        except OSError as e:
+            # Another process, e.g. a previous Streamlit session, owns the port
+            log.error(f"Metrics endpoint unavailable on port {port}: {e}")
+            return None
+        _server.daemon_threads = True
+        threading.Thread(target=_server.serve_forever, daemon=True).start()
+        log.info(f"Serving metrics on http://{host}:{_server.server_address[1]}/metrics")
+        return _server
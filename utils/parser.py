@@ -1,15 +1,152 @@
+import re
 import json
+from utils.templates import validate_action, validate_intent
 from utils.logger import get_logger
 
 log = get_logger(__name__)
 
+CODE_FENCE = re.compile(r"```(?:json|JSON)?\s*\n?(.*?)(?:```|$)", re.DOTALL)
+
+# Python and JavaScript literals that LLMs emit in place of JSON ones
+LITERALS = {"True": "true", "False": "false", "None": "null", "undefined": "null"}
+
+SMART_QUOTES = str.maketrans({"“": '"', "”": '"', "‘": "'", "’": "'"})
+
+
+def extract_json(text: str) -> str:
+    """
+    Extract the JSON value from an LLM response that wraps it in a code fence or
+    surrounds it with prose.
+
+    Args:
+        text (str): The raw LLM response.
+
+    Returns:
+        str: The text from the first "{" or "[" to its matching bracket, or to the
+            end of the text if the value is truncated.
+    """
+    fenced = CODE_FENCE.search(text)
+    if fenced and fenced.group(1).lstrip()[:1] in ("{", "["):
+        text = fenced.group(1)
+
+    starts = [index for index in (text.find("{"), text.find("[")) if index >= 0]
+    if not starts:
+        return text.strip()
+    start = min(starts)
+
+    depth, in_string, escape = 0, False, False
+    for index in range(start, len(text)):
+        char = text[index]
+        if in_string:
+            if escape:
+                escape = False
+            elif char == "\\":
+                escape = True
+            elif char == '"':
+                in_string = False
+        elif char == '"':
+            in_string = True
+        elif char in "{[":
+            depth += 1
+        elif char in "}]":
+            depth -= 1
+            if depth == 0:
+                return text[start : index + 1]
+    return text[start:]
+
+
+def repair_json(text: str) -> str:
+    """
+    Repair the defects LLMs commonly introduce into JSON.
+
+    Outside of strings, removes comments and trailing commas, replaces Python and
+    JavaScript literals, and converts single-quoted strings; raw newlines inside
+    strings are escaped, and a truncated value has its string and brackets closed.
+
+    Args:
+        text (str): The JSON text to repair.
+
+    Returns:
+        str: The repaired JSON text.
+    """
+    text = text.translate(SMART_QUOTES)
+    out, stack = [], []
+    quote, escape = None, False
+    index = 0
+
+    while index < len(text):
+        char = text[index]
+
+        if quote:
+            if escape:
+                escape = False
+                if char == "'":
+                    out.pop()  # \' is not a JSON escape
+            elif char == "\\":
+                escape = True
+            elif char == quote:
+                char, quote = '"', None
+            elif char == '"':
+                char = '\\"'  # A double quote inside a single-quoted string
+            elif char == "\n":
+                char = "\\n"
+            out.append(char)
+            index += 1
+            continue
+
+        if char in "\"'":
+            quote = char
+            out.append('"')
+        elif text.startswith("//", index):
+            index = text.find("\n", index)
+            index = len(text) if index < 0 else index
+            continue
+        elif text.startswith("/*", index):
+            end = text.find("*/", index + 2)
+            index = len(text) if end < 0 else end + 2
+            continue
+        elif char in "{[":
+            stack.append("}" if char == "{" else "]")
+            out.append(char)
+        elif char in "}]":
+            # Drop a trailing comma before the closing bracket
+            while out and out[-1].isspace():
+                out.pop()
+            if out and out[-1] == ",":
+                out.pop()
+            if stack:
+                stack.pop()
+            out.append(char)
+        elif char.isalpha() or char == "_":
+            word = re.match(r"[A-Za-z_][A-Za-z0-9_]*", text[index:]).group(0)
+            index += len(word)
+            if text[index:].lstrip().startswith(":"):
+                out.append(f'"{word}"')  # An unquoted object key
+            else:
+                out.append(LITERALS.get(word, word))
+            continue
+        else:
+            out.append(char)
+        index += 1
+
+    # Close whatever a truncated response left open
+    if quote:
+        out.append('"')
+    while out and (out[-1].isspace() or out[-1] in ",:"):
+        out.pop()
+    out.extend(reversed(stack))
+    return "".join(out)
+
 
 def parse_json_code(json_code):
     """
     Parse a JSON string into a Python dictionary.
 
+    The string is parsed as is first; if that fails, the JSON is extracted from any
+    code fence or surrounding prose and repaired before parsing again.
+
     Args:
-        json_code (str): The extracted JSON string.
+        json_code (str): The extracted JSON string, or a raw LLM response.
 
     Returns:
         dict: Parsed JSON as a Python dictionary or None if parsing fails.
@@ -18,6 +155,237 @@ def parse_json_code(json_code):
         parsed_json = json.loads(json_code)
         log.info("JSON successfully parsed.")
         return parsed_json
-    except json.JSONDecodeError as e:
-        log.error(f"JSON parsing error: {e}")
-        return None
+    except (json.JSONDecodeError, TypeError) as e:
+        if not isinstance(json_code, str):
+            log.error(f"JSON parsing error: {e}")
+            return None
+        error = e
+
+    candidate = extract_json(json_code)
+    for attempt in _truncations(candidate):
+        try:
+            parsed_json = json.loads(repair_json(attempt))
+        except json.JSONDecodeError:
+            continue
+        if len(attempt) < len(candidate):
+            log.warning(f"Dropped {len(candidate) - len(attempt)} trailing characters.")
+        log.info(f"JSON parsed after repair ({error.msg}).")
+        return parsed_json
+
+    log.error(f"JSON parsing error: {error}")
+    return None
+
+
+def _truncations(text: str, limit: int = 20):
+    """
+    Yield the text, then the text cut before each of its last `limit` commas outside
+    strings, so that a response truncated mid-item keeps its complete items.
+    """
+    yield text
+
+    commas, quote, escape = [], None, False
+    for index, char in enumerate(text):
+        if quote:
+            if escape:
+                escape = False
+            elif char == "\\":
+                escape = True
+            elif char == quote:
+                quote = None
+        elif char in "\"'":
+            quote = char
+        elif char == ",":
+            commas.append(index)
+
+    for index in reversed(commas[-limit:]):
+        yield text[:index]
+
+
+def validate_intents_and_actions(data: dict) -> tuple:
+    """
+    Validate the new intents and actions of an LLM response item by item.
+
+    Args:
+        data (dict): The parsed response, with "new_intents" and "new_actions" lists.
+
+    Returns:
+        tuple: A tuple containing:
+            - The valid intents.
+            - The valid actions.
+            - The errors of the invalid items, as (key, position, reason) tuples.
+    """
+    results = {"new_intents": [], "new_actions": []}
+    errors = []
+    validators = {"new_intents": validate_intent, "new_actions": validate_action}
+    for key, validate in validators.items():
+        items = data.get(key, [])
+        if not isinstance(items, list):
+            errors.append((key, None, "not a list"))
+            continue
+        for position, item in enumerate(items):
+            reason = validate(item)
+            if reason:
+                errors.append((key, position, reason))
+            else:
+                results[key].append(item)
+    return results["new_intents"], results["new_actions"], errors
+
+
+class StreamingJSONParser:
+    """
+    Incrementally parses a streamed JSON response, returning each complete object
+    of the watched arrays as soon as its closing brace arrives.
+
+    Example:
+        parser = StreamingJSONParser(["new_intents", "new_actions"])
+        for delta in stream_prompt(prompt):
+            for key, item in parser.feed(delta):
+                print(key, item)
+    """
+
+    def __init__(self, keys: list):
+        """
+        Args:
+            keys (list): The object keys whose array items are returned.
+        """
+        self.keys = set(keys)
+        self.errors = []
+        self._text = ""
+        self._stack = []  # (bracket, key) of the open containers
+        self._started = False
+        self._in_string = False
+        self._escape = False
+        self._string_start = None
+        self._last_string = None
+        self._key_start = None
+        self._pending_key = None
+        self._item_start = None
+
+    @property
+    def text(self) -> str:
+        """
+        The whole text consumed so far.
+        """
+        return self._text
+
+    def append(self, chunk: str):
+        """
+        Add the next piece of the response to `text` without parsing it, e.g. once
+        incremental parsing has failed and the whole response is parsed at the end.
+        """
+        self._text += chunk
+
+    def feed(self, chunk: str) -> list:
+        """
+        Consume the next piece of the response.
+
+        Args:
+            chunk (str): The next piece of the streamed text.
+
+        Returns:
+            list: The (key, item) pairs of the items completed by this piece. Items
+                that cannot be parsed are recorded in `errors` instead.
+        """
+        items = []
+        offset = len(self._text)
+        self._text += chunk
+
+        for position, char in enumerate(chunk, start=offset):
+            if not self._started:
+                if char not in "{[":
+                    continue
+                self._started = True
+
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif char == "\\":
+                    self._escape = True
+                elif char == '"':
+                    self._in_string = False
+                    self._last_string = (self._string_start, position)
+                continue
+
+            if char == '"':
+                self._in_string, self._string_start = True, position + 1
+            elif char == ":":
+                # Only a colon directly inside an object separates a key
+                if self._stack and self._stack[-1][0] == "{" and self._key_start is not None:
+                    self._pending_key = self._key(position)
+            elif char == ",":
+                self._pending_key = None
+                self._key_start = position + 1
+            elif char in "{[":
+                parent = self._stack[-1] if self._stack else None
+                if char == "{" and self._watched(parent):
+                    self._item_start = position
+                self._stack.append((char, self._pending_key))
+                self._pending_key = None
+                self._key_start = position + 1
+            elif char in "}]" and self._stack:
+                self._stack.pop()
+                parent = self._stack[-1] if self._stack else None
+                if char == "}" and self._item_start is not None and self._watched(parent):
+                    items.extend(self._parse_item(parent[1], position))
+
+        return items
+
+    def _key(self, colon: int) -> str:
+        # The quoted string before the colon, or the bare word LLMs sometimes emit
+        if self._last_string is not None and self._last_string[0] > self._key_start:
+            start, end = self._last_string
+            return self._text[start:end]
+        return self._text[self._key_start : colon].strip().strip("'")
+
+    def _watched(self, container) -> bool:
+        return bool(container) and container[0] == "[" and container[1] in self.keys
+
+    def _parse_item(self, key: str, end: int) -> list:
+        text = self._text[self._item_start : end + 1]
+        self._item_start = None
+        try:
+            return [(key, json.loads(repair_json(text)))]
+        except json.JSONDecodeError as e:
+            self.errors.append((key, text, str(e)))
+            return []
+
+
+def parse_stream(chunks, keys: list):
+    """
+    Parse the watched array items out of a streamed JSON response as they complete.
+
+    Args:
+        chunks (iterable): The streamed pieces of the response.
+        keys (list): The object keys whose array items are returned.
+
+    Yields:
+        tuple: (key, item) pairs in response order.
+    """
+    parser = StreamingJSONParser(keys)
+    yielded = dict.fromkeys(keys, 0)
+    failed = False
+    for chunk in chunks:
+        if failed:
+            parser.append(chunk)
+            continue
+        try:
+            items = parser.feed(chunk)
+        except Exception as e:
+            log.warning(f"Incremental parsing stopped ({e}), parsing the whole response.")
+            failed = True
+            continue
+        for key, item in items:
+            yielded[key] += 1
+            yield key, item
+    for key, _, error in parser.errors:
+        log.error(f"Skipped an unparsable item of '{key}': {error}")
+
+    if failed or not any(yielded.values()):
+        # Fall back to extracting and repairing the whole response
+        data = parse_json_code(parser.text) if parser.text.strip() else None
+        if isinstance(data, dict):
+            for key in keys:
+                items = data.get(key)
+                if isinstance(items, list):
+                    for item in items[yielded[key] :]:
+                        yield key, item
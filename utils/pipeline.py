@@ -0,0 +1,234 @@
+import os
+import json
+import hashlib
+import threading
+from urllib.parse import urlparse
+from utils.executor import StageExecutor
+from utils.metrics import span
+from utils.manifest import SiteManifest
+from utils.scraper import scrape_website, summarize_website
+from utils.vector_index import VectorIndex
+from utils.ibm_waston import (
+    reuse_or_create_workspace,
+    load_predefined_intents_and_actions,
+    get_intents_and_actions,
+    generate_intents_and_actions,
+    generate_watson_workspace_json,
+)
+from utils.artifacts import get_artifact_store, site_key
+from utils.logger import get_logger
+
+log = get_logger(__name__)
+
+# Directory holding one checkpoint per website built headlessly
+CHECKPOINT_DIR = os.getenv("CHECKPOINT_DIR", "samples/checkpoints")
+
+# Pipeline stages reported with timings, in dependency order
+STAGES = ("crawl", "summarize", "workspace", "intents", "upload", "export")
+
+
+def _checkpoint_path(checkpoint_dir: str, url: str) -> str:
+    key = hashlib.sha256(url.encode("utf-8")).hexdigest()[:16]
+    return os.path.join(checkpoint_dir, f"{urlparse(url).netloc}-{key}.json")
+
+
+def load_checkpoint(url: str, checkpoint_dir: str = CHECKPOINT_DIR) -> dict:
+    """
+    Load the saved progress of a website build, or a fresh state if there is none.
+
+    Args:
+        url (str): The website URL.
+        checkpoint_dir (str): The directory holding the checkpoints.
+
+    Returns:
+        dict: The build state, including its completed stages and their outputs.
+    """
+    try:
+        with open(_checkpoint_path(checkpoint_dir, url), "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {"url": url, "status": "pending", "completed": [], "timings": {}}
+
+
+def save_checkpoint(state: dict, checkpoint_dir: str = CHECKPOINT_DIR):
+    """
+    Persist the progress of a website build.
+
+    Args:
+        state (dict): The build state returned by load_checkpoint().
+        checkpoint_dir (str): The directory holding the checkpoints.
+    """
+    os.makedirs(checkpoint_dir, exist_ok=True)
+    with open(_checkpoint_path(checkpoint_dir, state["url"]), "w", encoding="utf-8") as f:
+        json.dump(state, f, indent=2, ensure_ascii=False)
+
+
+def build_assistant(
+    url: str, checkpoint_dir: str = CHECKPOINT_DIR, restart: bool = False
+) -> dict:
+    """
+    Build the Watson Assistant for a website without the Streamlit UI.
+
+    Runs the same stages as the app: crawl and summarize the website, create its
+    workspace, generate and upload intents and actions, and export the workspace
+    JSON. Stages run as soon as their inputs exist, so a new workspace is created
+    once the start page has given the website title, while the rest of the site
+    is crawled; a workspace that may be reused waits for the crawl to tell whether
+    the site changed. Each completed stage is checkpointed, so a failed or
+    interrupted build resumes from its unfinished stages, and a finished build
+    is not repeated.
+
+    Args:
+        url (str): The website URL.
+        checkpoint_dir (str): The directory holding the checkpoints.
+        restart (bool): Whether to ignore the checkpoint and build from scratch.
+
+    Returns:
+        dict: The build state: status, title, workspace ID, per-stage timings in
+            seconds and the error message if the build failed.
+    """
+    if restart:
+        state = {"url": url, "status": "pending", "completed": [], "timings": {}}
+    else:
+        state = load_checkpoint(url, checkpoint_dir)
+
+    if state["status"] == "done":
+        log.info(f"Skipping {url}, already built.")
+        return state
+
+    manifest = SiteManifest.load(url)
+    index = VectorIndex()
+    results = state.setdefault("results", {})
+    state["status"] = "running"
+    state.pop("error", None)
+    lock = threading.Lock()
+
+    def crawl():
+        try:
+            pages, title = scrape_website(
+                url,
+                manifest=manifest,
+                index=index,
+                on_title=lambda title: stages.provide("title", title),
+            )
+        except Exception as e:
+            stages.fail("title", e)
+            raise
+        if not pages:
+            pages.close()
+            error = RuntimeError("Unable to fetch website content.")
+            stages.fail("title", error)
+            raise error
+        state["title"] = title
+        return pages, title
+
+    def previous_build(crawl):
+        # Reuse the previous intents, actions and workspace if nothing changed
+        return manifest.load_intents_and_actions() if manifest.unchanged else None
+
+    def summarize(crawl):
+        pages, title = crawl
+        with pages:
+            summary = summarize_website(url, pages, manifest=manifest)
+        if not summary:
+            raise RuntimeError("Unable to summarize website content.")
+        get_artifact_store().put(site_key(title, url), "summary", summary)
+        return summary
+
+    def workspace(title, previous=None):
+        return reuse_or_create_workspace(
+            title,
+            f"I'm an IBM Watson Assistant for {title}",
+            workspace_id=manifest.workspace_id if previous else None,
+        )
+
+    def intents(summary, templates, previous):
+        if previous:
+            return previous
+        # A resumed build skips the crawl, so use the index it saved
+        site_index = index if len(index) else VectorIndex.load(url)
+        return get_intents_and_actions(summary, templates=templates, index=site_index)
+
+    def upload(workspace, intents):
+        workspace_id, reused = workspace
+        if reused:
+            return []
+        return generate_intents_and_actions(
+            intents=intents[0], actions=intents[1], workspace_id=workspace_id
+        )
+
+    def export(crawl, workspace, intents, upload):
+        title, workspace_id = crawl[1], workspace[0]
+        assistant_json = generate_watson_workspace_json(
+            intents=intents[0],
+            actions=intents[1],
+            workspace_name=title,
+            workspace_description=f"I'm an IBM Watson Assistant for {title}",
+        )
+        # The build only counts as done once its files are on disk
+        store = get_artifact_store()
+        store.put(site_key(title, url), "assistant", assistant_json).written.result()
+        manifest.save(title=title, workspace_id=workspace_id)
+
+    graph = {
+        "previous_build": (previous_build, ["crawl"]),
+        "summarize": (summarize, ["crawl"]),
+        "workspace": (
+            workspace,
+            ["title", "previous_build"] if manifest.workspace_id else ["title"],
+        ),
+        "intents": (intents, ["summarize", "templates", "previous_build"]),
+        "upload": (upload, ["workspace", "intents"]),
+        "export": (export, ["crawl", "workspace", "intents", "upload"]),
+    }
+
+    def checkpointed(name, func):
+        def run(*args):
+            result = func(*args)
+            with lock:
+                results[name] = result
+                state["completed"].append(name)
+                save_checkpoint(state, checkpoint_dir)
+            return result
+
+        return run
+
+    with span("build", url=url), StageExecutor() as stages:
+        stages.submit("templates", load_predefined_intents_and_actions)
+
+        # The crawl is only needed until the stages derived from it are checkpointed
+        if "summarize" in results and "previous_build" in results:
+            stages.provide("crawl", (None, state["title"]))
+            stages.provide("title", state["title"])
+        else:
+            stages.submit("crawl", crawl)
+
+        for name, (func, deps) in graph.items():
+            if name in results:
+                stages.provide(name, results[name])
+            else:
+                stages.submit(name, checkpointed(name, func), deps=deps)
+
+        try:
+            stages.result("export")
+        except Exception:
+            state["status"] = "failed"
+            state["error"] = "; ".join(
+                f"{name}: {error}" for name, error in stages.errors.items()
+            )
+
+    state["timings"].update(
+        {name: stages.timings[name] for name in STAGES if name in stages.timings}
+    )
+    if "workspace" in results:
+        state["workspace_id"] = results["workspace"][0]
+    state["upload_errors"] = results.get("upload")
+
+    if state["status"] == "failed":
+        log.error(f"Build failed for {url}: {state['error']}")
+    else:
+        state["status"] = "done"
+        log.info(f"Built assistant for {url} in {sum(state['timings'].values()):.1f}s")
+
+    save_checkpoint(state, checkpoint_dir)
+    return state
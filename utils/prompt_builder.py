@@ -0,0 +1,196 @@
+import os
+import json
+from utils.metrics import count
+from utils.tokenizer import count_tokens
+from utils.logger import get_logger
+
+log = get_logger(__name__)
+
+# Maximum number of input tokens of a built prompt
+PROMPT_TOKEN_BUDGET = int(os.getenv("PROMPT_TOKEN_BUDGET", "8000"))
+
+# How templates are written into prompts: "names" (names, example counts and
+# missing fields), "compact" (minified JSON) or "full" (indented JSON)
+PROMPT_TEMPLATE_FORMAT = os.getenv("PROMPT_TEMPLATE_FORMAT", "names")
+
+TRIM_MARKER = " [...]"
+
+
+def serialize_intents(intents: list, format: str = PROMPT_TEMPLATE_FORMAT) -> str:
+    """
+    Write intent templates into a prompt.
+
+    Args:
+        intents (list): The intent templates.
+        format (str): "names", "compact" or "full", see PROMPT_TEMPLATE_FORMAT.
+
+    Returns:
+        str: The serialized intents.
+    """
+    if format == "full":
+        return json.dumps(intents, indent=2)
+    if format == "compact":
+        return json.dumps(intents, separators=(",", ":"), ensure_ascii=False)
+
+    lines = []
+    for intent in intents:
+        examples = len(intent.get("examples") or [])
+        lines.append(
+            f"- {intent['intent']}: "
+            + (f"{examples} examples" if examples else "no examples")
+        )
+    return "\n".join(lines)
+
+
+def serialize_actions(actions: list, format: str = PROMPT_TEMPLATE_FORMAT) -> str:
+    """
+    Write action templates into a prompt.
+
+    Args:
+        actions (list): The action templates.
+        format (str): "names", "compact" or "full", see PROMPT_TEMPLATE_FORMAT.
+
+    Returns:
+        str: The serialized actions.
+    """
+    if format == "full":
+        return json.dumps(actions, indent=2)
+    if format == "compact":
+        return json.dumps(actions, separators=(",", ":"), ensure_ascii=False)
+
+    lines = []
+    for action in actions:
+        line = f"- {action['action_name']}: {action.get('conditions') or 'no conditions'}"
+        if not action.get("output_text"):
+            line += ", no output_text"
+        lines.append(line)
+    return "\n".join(lines)
+
+
+def trim_to_tokens(text: str, budget: int) -> str:
+    """
+    Shorten a text to at most `budget` tokens, keeping whole lines while they fit
+    and cutting the first line that does not at a word boundary.
+
+    Args:
+        text (str): The text to shorten.
+        budget (int): The maximum number of tokens.
+
+    Returns:
+        str: The text, marked with TRIM_MARKER if it was shortened.
+    """
+    if count_tokens(text) <= budget:
+        return text
+
+    budget -= count_tokens(TRIM_MARKER)
+    kept, used = [], 0
+    for line in text.split("\n"):
+        tokens = count_tokens(line) + 1
+        if used + tokens <= budget:
+            kept.append(line)
+            used += tokens
+            continue
+
+        # Keep as many words of this line as still fit
+        words = line.split(" ")
+        low, high = 0, len(words)
+        while low < high:
+            middle = (low + high + 1) // 2
+            if count_tokens(" ".join(words[:middle])) <= budget - used:
+                low = middle
+            else:
+                high = middle - 1
+        if low:
+            kept.append(" ".join(words[:low]))
+        break
+
+    return "\n".join(kept).rstrip() + TRIM_MARKER
+
+
+class PromptBuilder:
+    """
+    Assembles a prompt from named sections and keeps it under a token budget.
+
+    Sections added with trim=True are shortened, last added first, when the
+    prompt is over budget; the others are kept whole. Each section can carry
+    the baseline text it replaces, such as the indented JSON of a compactly
+    serialized section, so that the input tokens saved are reported per call.
+
+    Example:
+        builder = PromptBuilder(budget=4000)
+        builder.add("instructions", "Summarize the website.")
+        builder.add("content", content, trim=True)
+        prompt = builder.build()
+    """
+
+    def __init__(self, budget: int = PROMPT_TOKEN_BUDGET, name: str = "prompt"):
+        """
+        Args:
+            budget (int): The maximum number of tokens of the built prompt.
+            name (str): The name of the prompt in logs and metrics.
+        """
+        self.budget = budget
+        self.name = name
+        self.sections = []  # [name, text, trim, baseline]
+        self.stats = {}
+
+    def add(self, name: str, text: str, trim: bool = False, baseline: str = None):
+        """
+        Append a section to the prompt.
+
+        Args:
+            name (str): The name of the section, used in the savings report.
+            text (str): The text of the section.
+            trim (bool): Whether the section may be shortened to fit the budget.
+            baseline (str): The text the section replaces, if it is a shortened form.
+        """
+        self.sections.append([name, text.strip(), trim, baseline])
+        return self
+
+    def build(self) -> str:
+        """
+        Join the sections, trimming the trimmable ones if the prompt is over budget.
+
+        Returns:
+            str: The prompt. Its token counts and savings are left in `stats`.
+        """
+        tokens = [count_tokens(text) + 2 for _, text, _, _ in self.sections]
+        baseline = sum(
+            count_tokens(base) + 2 if base is not None else used
+            for (_, _, _, base), used in zip(self.sections, tokens)
+        )
+
+        over = sum(tokens) - self.budget
+        trimmed = []
+        for position in reversed(range(len(self.sections))):
+            name, text, trim, _ = self.sections[position]
+            if over <= 0:
+                break
+            if not trim:
+                continue
+            shortened = trim_to_tokens(text, max(0, tokens[position] - over - 2))
+            saved = tokens[position] - (count_tokens(shortened) + 2)
+            self.sections[position][1] = shortened
+            tokens[position] -= saved
+            over -= saved
+            trimmed.append(name)
+
+        total = sum(tokens)
+        if over > 0:
+            log.warning(
+                f"The {self.name} is {over} tokens over its budget of {self.budget} tokens."
+            )
+
+        self.stats = {
+            "tokens": total,
+            "baseline_tokens": baseline,
+            "saved_tokens": baseline - total,
+            "trimmed": trimmed,
+        }
+        count("llm_prompt_tokens_saved_total", max(0, baseline - total), prompt=self.name)
+        log.info(
+            f"Built {self.name}: {total} tokens, {baseline - total} saved of {baseline} "
+            f"({(baseline - total) / max(baseline, 1):.0%})"
+            + (f", trimmed {', '.join(trimmed)}" if trimmed else "")
+        )
+        return "\n\n".join(text for _, text, _, _ in self.sections if text)
@@ -1,20 +1,22 @@
 import os
+import time
+import itertools
+import threading
 from dataclasses import dataclass
-from typing import Optional
-from llama_index.llms.together import TogetherLLM
-from llama_index.core.llms import ChatMessage, MessageRole
 from dotenv import load_dotenv
+from utils.llm_cache import get_llm_cache
+from utils.metrics import count, observe, span
+from utils.tokenizer import count_tokens
+from utils.resilience import LLM_HEDGE_AFTER, get_provider
 from utils.logger import get_logger
 
 log = get_logger(__name__)
 
 # Load environment variables early on
 load_dotenv()
-TOGETHER_API_KEY = os.getenv("TOGETHER_API_KEY")
 
-if not TOGETHER_API_KEY or TOGETHER_API_KEY == "":
-    log.error("TOGETHER_API_KEY is not set in the environment variables.")
-    raise ValueError("TOGETHER_API_KEY is required but not found.")
+# Price of a million prompt or completion tokens in USD, used for the cost counter
+LLM_PRICE_PER_MILLION_TOKENS = float(os.getenv("LLM_PRICE_PER_MILLION_TOKENS", "0.18"))
 
 
 @dataclass
@@ -25,25 +27,208 @@ class UserPrompt:
 
 # Singleton to reuse the TogetherLLM instance
 class LLMClient:
-    _instance: Optional[TogetherLLM] = None
+    _instance = None
+    _lock = threading.Lock()
 
     @classmethod
-    def get_instance(cls, model: str) -> TogetherLLM:
-        """Return the singleton instance of the LLM client."""
-        if cls._instance is None or cls._instance.model != model:
-            cls._instance = TogetherLLM(model=model, api_key=TOGETHER_API_KEY)
-        return cls._instance
+    def get_instance(cls, model: str):
+        """
+        Return the singleton instance of the LLM client, creating it on first use.
+
+        llama_index is only imported here, so importing this module stays cheap.
+
+        Raises:
+            ValueError: If TOGETHER_API_KEY is not set.
+        """
+        with cls._lock:
+            if cls._instance is None or cls._instance.model != model:
+                api_key = os.getenv("TOGETHER_API_KEY")
+                if not api_key:
+                    log.error("TOGETHER_API_KEY is not set in the environment variables.")
+                    raise ValueError("TOGETHER_API_KEY is required but not found.")
+
+                from llama_index.llms.together import TogetherLLM
+
+                cls._instance = TogetherLLM(model=model, api_key=api_key)
+            return cls._instance
+
+
+def _chat_messages(text: str) -> list:
+    """
+    Wrap a prompt into the chat messages sent to the LLM.
+    """
+    from llama_index.core.llms import ChatMessage, MessageRole
+
+    return [ChatMessage(role=MessageRole.USER, content=text)]
+
+
+def _record_usage(model: str, prompt: str, completion: str, raw=None) -> dict:
+    """
+    Count the prompt and completion tokens of an LLM call and their cost.
+
+    The provider's reported usage is used when the raw response carries it,
+    otherwise the tokens are counted locally.
+
+    Returns:
+        dict: The prompt and completion token counts.
+    """
+    usage = raw.get("usage") if isinstance(raw, dict) else getattr(raw, "usage", None)
+    if usage is not None and not isinstance(usage, dict):
+        usage = vars(usage)
+    usage = usage or {}
+    prompt_tokens = usage.get("prompt_tokens") or count_tokens(prompt)
+    completion_tokens = usage.get("completion_tokens") or count_tokens(completion)
+
+    count("llm_prompt_tokens_total", prompt_tokens, model=model)
+    count("llm_completion_tokens_total", completion_tokens, model=model)
+    cost = (prompt_tokens + completion_tokens) * LLM_PRICE_PER_MILLION_TOKENS / 1e6
+    count("llm_cost_dollars_total", cost, model=model)
+    return {"prompt_tokens": prompt_tokens, "completion_tokens": completion_tokens}
+
+
+def _log_response(result: str, usage: dict):
+    log.info(
+        f"LLM response: {len(result or '')} characters, "
+        f"{usage['prompt_tokens']} prompt and {usage['completion_tokens']} completion tokens"
+    )
+    log.debug(f"Raw response from LLM: {result}")
+
+
+def _open_stream(llm, messages) -> tuple:
+    """
+    Start a streamed chat and wait for its first chunk, so that a failure to
+    connect or an overloaded provider surfaces here and can be retried.
+
+    Returns:
+        tuple: The first chunk (None for an empty response) and the rest of the stream.
+    """
+    stream = iter(llm.stream_chat(messages))
+    return next(stream, None), stream
+
+
+def _open_cache():
+    """
+    Return the LLM response cache, or None if it cannot be opened, in which case
+    prompts are sent to the LLM without caching.
+    """
+    try:
+        return get_llm_cache()
+    except Exception as e:
+        log.error(f"LLM cache unavailable, calling the LLM without it: {e}")
+        return None
+
+
+def _cached_response(cache, model: str, text: str):
+    if cache is None:
+        return None
+    cached = cache.get(model, text)
+    if cached is not None:
+        log.info(f"LLM cache hit ({cache.hits} hits, {cache.misses} misses)")
+        count("llm_cache_hits_total", model=model)
+    return cached
 
 
 def process_prompt(input: UserPrompt):
+    model = input.model
+
+    # Identical prompts are answered from the response cache
+    cache = _open_cache()
+    cached = _cached_response(cache, model, input.text)
+    if cached is not None:
+        return cached
+
     try:
-        model = input.model
         llm = LLMClient.get_instance(model)
-        messages = [ChatMessage(role=MessageRole.USER, content=input.text)]
-        resp = llm.chat(messages)
-        result = resp.message.content
-        log.info(f"Raw response from LLM: {result}")
-        return result
+        messages = _chat_messages(input.text)
+        with span("llm.chat", model=model) as attributes:
+            resp = get_provider("together").call(
+                llm.chat, messages, hedge_after=LLM_HEDGE_AFTER
+            )
+            result = resp.message.content
+            usage = _record_usage(model, input.text, result or "", resp.raw)
+            attributes.update(usage)
+        _log_response(result, usage)
     except Exception as e:
         log.error(f"Error processing prompt: {e}")
         return None
+
+    if result:
+        _cache_response(cache, model, input.text, result)
+    return result
+
+
+def _cache_response(cache, model: str, text: str, result: str):
+    # A response is never lost because it could not be cached
+    if cache is None:
+        return
+    try:
+        cache.set(model, text, result)
+    except Exception as e:
+        log.warning(f"Failed to cache the LLM response: {e}")
+
+
+def forget_response(input: UserPrompt):
+    """
+    Evict the cached response to a prompt, for callers that rejected it (e.g. it
+    is not valid JSON), so that a retry asks the LLM again instead of replaying it.
+
+    Args:
+        input (UserPrompt): The prompt whose response was rejected.
+    """
+    try:
+        get_llm_cache().delete(input.model, input.text)
+    except Exception as e:
+        log.warning(f"Failed to evict the LLM response: {e}")
+
+
+def stream_prompt(input: UserPrompt):
+    """
+    Send a prompt to the LLM and yield the response text as it is generated.
+
+    Cached responses are yielded in a single piece. The complete response is
+    cached once the stream finishes.
+
+    Args:
+        input (UserPrompt): The prompt to send.
+
+    Yields:
+        str: Successive pieces of the response text.
+
+    Raises:
+        Exception: The LLM error if the stream cannot be opened or breaks off, so
+            that a partial response is never taken for a complete one.
+    """
+    model = input.model
+
+    cache = _open_cache()
+    cached = _cached_response(cache, model, input.text)
+    if cached is not None:
+        yield cached
+        return
+
+    parts, chunk = [], None
+    try:
+        llm = LLMClient.get_instance(model)
+        messages = _chat_messages(input.text)
+        started = time.perf_counter()
+        # The span covers the time to the first chunk; it must not stay open across yields
+        with span("llm.stream_chat", model=model):
+            first, stream = get_provider("together").call(
+                _open_stream, llm, messages, hedge_after=LLM_HEDGE_AFTER
+            )
+        for chunk in itertools.chain([first] if first else [], stream):
+            if chunk.delta:
+                parts.append(chunk.delta)
+                yield chunk.delta
+        observe("llm_stream_seconds", time.perf_counter() - started, model=model)
+    except Exception as e:
+        log.error(f"Error streaming prompt after {len(parts)} pieces: {e}")
+        raise
+
+    result = "".join(parts)
+    # The last chunk of a stream carries the usage, if the provider reports it
+    usage = _record_usage(model, input.text, result, getattr(chunk, "raw", None))
+    _log_response(result, usage)
+
+    if result:
+        _cache_response(cache, model, input.text, result)
@@ -0,0 +1,423 @@
+import os
+import time
+import random
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from email.utils import parsedate_to_datetime
+from utils.metrics import registry
+from utils.logger import get_logger
+
+log = get_logger(__name__)
+
+# Attempts per call, including the first one
+RETRY_MAX_ATTEMPTS = int(os.getenv("RETRY_MAX_ATTEMPTS", "4"))
+
+# Consecutive calls that fail after all their retries open a provider's circuit,
+# which then stays open this long
+CIRCUIT_FAILURE_THRESHOLD = int(os.getenv("CIRCUIT_FAILURE_THRESHOLD", "5"))
+CIRCUIT_RESET_SECONDS = float(os.getenv("CIRCUIT_RESET_SECONDS", "30"))
+
+# Seconds after which a slow LLM call is hedged with a second request, 0 disables hedging.
+# A hedged call may be billed twice, so hedging is opt-in.
+LLM_HEDGE_AFTER = float(os.getenv("LLM_HEDGE_AFTER", "0"))
+
+# Rate limited: the provider is up, so these never count towards opening the circuit
+RATE_LIMITED_STATUS = 429
+
+# HTTP statuses worth retrying: timeouts, rate limits and transient server errors
+RETRYABLE_STATUSES = {408, 425, 429, 500, 502, 503, 504}
+
+# Exception class names of transient network failures across the SDKs in use
+TRANSIENT_ERRORS = {
+    "ConnectionError",
+    "Timeout",
+    "ReadTimeout",
+    "ConnectTimeout",
+    "APIConnectionError",
+    "APITimeoutError",
+    "TimeoutError",
+}
+
+
+class CircuitOpenError(Exception):
+    """
+    Raised instead of calling a provider whose circuit is open.
+    """
+
+
+def _response(error: Exception):
+    """
+    Return the HTTP response attached to an SDK exception, if any.
+    """
+    # A requests.Response with an error status is falsy, so test for None explicitly
+    for attr in ("response", "http_response"):
+        response = getattr(error, attr, None)
+        if response is not None and getattr(response, "headers", None) is not None:
+            return response
+    return None
+
+
+def status_code(error: Exception):
+    """
+    Return the HTTP status of an SDK exception (requests, openai, ibm-cloud-sdk-core), if any.
+    """
+    for attr in ("status_code", "code", "http_status"):
+        value = getattr(error, attr, None)
+        if isinstance(value, int):
+            return value
+    return getattr(_response(error), "status_code", None)
+
+
+def retry_after(error: Exception):
+    """
+    Return the delay in seconds requested by the Retry-After header of an error's response.
+    """
+    response = _response(error)
+    value = response.headers.get("Retry-After") if response is not None else None
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+def is_retryable(error: Exception) -> bool:
+    """
+    Whether an error is transient: a retryable HTTP status or a network failure.
+    """
+    status = status_code(error)
+    if status is not None:
+        return status in RETRYABLE_STATUSES
+    return any(cls.__name__ in TRANSIENT_ERRORS for cls in type(error).__mro__)
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket: allows `rate` calls per second on average, with bursts
+    of up to `burst` calls. Callers block until a token is available.
+    """
+
+    def __init__(self, rate: float, burst: int):
+        self.rate = rate
+        self.burst = burst
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def pause(self, seconds: float):
+        """
+        Hold back every caller for `seconds`, e.g. when the provider asked to retry later.
+        """
+        with self._lock:
+            self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+            self._tokens = 0.0
+
+    def acquire(self) -> float:
+        """
+        Take a token, waiting for one if necessary.
+
+        Returns:
+            float: The number of seconds spent waiting.
+        """
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                if now >= self._paused_until:
+                    elapsed = now - max(self._updated, self._paused_until)
+                    self._tokens = min(self.burst, self._tokens + elapsed * self.rate)
+                    self._updated = now
+                    if self._tokens >= 1:
+                        self._tokens -= 1
+                        return waited
+                    delay = (1 - self._tokens) / self.rate
+                else:
+                    delay = self._paused_until - now
+            time.sleep(delay)
+            waited += delay
+
+
+class CircuitBreaker:
+    """
+    Stops calls to a failing provider: after `failure_threshold` consecutive
+    failed calls the circuit opens and calls fail fast for `reset_timeout` seconds,
+    then a single trial call decides whether it closes again.
+    """
+
+    def __init__(self, failure_threshold: int, reset_timeout: float):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = "closed"
+        self._failures = 0
+        self._opened_at = 0.0
+        self._trial = False
+        self._lock = threading.Lock()
+
+    def allow(self) -> bool:
+        """
+        Whether a call may be made now.
+        """
+        with self._lock:
+            if self.state == "open":
+                if time.monotonic() - self._opened_at < self.reset_timeout:
+                    return False
+                self.state, self._trial = "half_open", False
+            if self.state == "half_open":
+                if self._trial:
+                    return False
+                self._trial = True
+            return True
+
+    def record_success(self):
+        with self._lock:
+            self.state, self._failures, self._trial = "closed", 0, False
+
+    def record_failure(self) -> bool:
+        """
+        Count a failed call.
+
+        Returns:
+            bool: Whether this failure opened the circuit.
+        """
+        with self._lock:
+            self._failures += 1
+            if self.state == "half_open" or self._failures >= self.failure_threshold:
+                opened = self.state != "open"
+                self.state, self._opened_at, self._trial = "open", time.monotonic(), False
+                return opened
+            return False
+
+
+_hedge_pool = None
+_hedge_pool_lock = threading.Lock()
+
+
+def _get_hedge_pool() -> ThreadPoolExecutor:
+    global _hedge_pool
+
+    with _hedge_pool_lock:
+        if _hedge_pool is None:
+            _hedge_pool = ThreadPoolExecutor(max_workers=32)
+        return _hedge_pool
+
+
+def _discard(future):
+    """
+    Release the result of a hedged call that lost the race, such as an open stream.
+    """
+    if future.cancelled() or future.exception() is not None:
+        return
+    result = future.result()
+    for value in result if isinstance(result, tuple) else (result,):
+        close = getattr(value, "close", None)
+        if callable(close):
+            try:
+                close()
+            except Exception as e:
+                log.debug(f"Failed to close a hedged result: {e}")
+
+
+class Provider:
+    """
+    Resilient access to one external API: every call takes a rate-limit token,
+    transient failures are retried with exponential backoff and full jitter
+    (at least as long as the provider's Retry-After), a circuit breaker fails
+    fast while the provider is down, and slow calls can be hedged.
+
+    Only calls that still fail after all their retries count towards opening
+    the circuit, and rate limiting (429) never does: a burst of rate limits
+    slows callers down instead of failing them all.
+
+    Example:
+        response = get_provider("together").call(llm.chat, messages, hedge_after=30)
+    """
+
+    def __init__(
+        self,
+        name: str,
+        rate: float,
+        burst: int,
+        max_attempts: int = RETRY_MAX_ATTEMPTS,
+        base_delay: float = 0.5,
+        max_delay: float = 30.0,
+    ):
+        self.name = name
+        self.bucket = TokenBucket(rate, burst)
+        self.breaker = CircuitBreaker(CIRCUIT_FAILURE_THRESHOLD, CIRCUIT_RESET_SECONDS)
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self._metrics = dict.fromkeys(
+            (
+                "calls",
+                "successes",
+                "failures",
+                "retries",
+                "rejected",
+                "circuit_opens",
+                "hedges",
+                "hedge_wins",
+            ),
+            0,
+        )
+        self._metrics["throttled_seconds"] = 0.0
+        self._lock = threading.Lock()
+
+    def _count(self, metric: str, amount=1):
+        with self._lock:
+            self._metrics[metric] += amount
+
+    @property
+    def metrics(self) -> dict:
+        """
+        A snapshot of the provider's counters and its circuit state.
+        """
+        with self._lock:
+            return {**self._metrics, "circuit": self.breaker.state}
+
+    def backoff(self, attempt: int, error: Exception = None) -> float:
+        """
+        The delay before retry number `attempt` (0-based) of a failed call.
+        """
+        delay = random.uniform(0, min(self.max_delay, self.base_delay * 2**attempt))
+        requested = retry_after(error) if error is not None else None
+        return max(delay, min(requested, self.max_delay)) if requested else delay
+
+    def _attempt(self, func, args, kwargs, hedge_after):
+        self._count("throttled_seconds", self.bucket.acquire())
+        if not hedge_after:
+            return func(*args, **kwargs)
+
+        pool = _get_hedge_pool()
+        first = pool.submit(func, *args, **kwargs)
+        if wait([first], timeout=hedge_after).done:
+            return first.result()
+
+        self._count("hedges")
+        self.bucket.acquire()
+        second = pool.submit(func, *args, **kwargs)
+        pending = {first, second}
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is None or not pending:
+                    if future is second and future.exception() is None:
+                        self._count("hedge_wins")
+                    # The losing request cannot be interrupted, but its result is closed
+                    for loser in pending:
+                        loser.add_done_callback(_discard)
+                    return future.result()
+
+    def call(self, func, *args, hedge_after: float = None, **kwargs):
+        """
+        Call a provider API function with rate limiting, retries and the circuit breaker.
+
+        Args:
+            func (callable): The API function.
+            *args: Positional arguments for func.
+            hedge_after (float): If set, a call still running after this many seconds
+                is raced against a second identical call, and the first to succeed
+                wins. The loser's result is closed if it can be, e.g. a stream.
+            **kwargs: Keyword arguments for func.
+
+        Returns:
+            The result of func.
+
+        Raises:
+            CircuitOpenError: If the provider's circuit is open.
+            Exception: The last error of func, once retries are exhausted or for
+                errors that are not transient.
+        """
+        if not self.breaker.allow():
+            self._count("rejected")
+            raise CircuitOpenError(
+                f"{self.name} is unavailable after repeated failures, "
+                f"retrying in up to {self.breaker.reset_timeout:.0f}s."
+            )
+
+        for attempt in range(self.max_attempts):
+            self._count("calls")
+            try:
+                result = self._attempt(func, args, kwargs, hedge_after)
+            except Exception as e:
+                if not is_retryable(e):
+                    # The request itself is wrong; the provider is healthy
+                    self.breaker.record_success()
+                    self._count("failures")
+                    raise
+
+                requested = retry_after(e)
+                if requested:
+                    self.bucket.pause(min(requested, self.max_delay))
+
+                if attempt == self.max_attempts - 1:
+                    self._count("failures")
+                    if status_code(e) == RATE_LIMITED_STATUS:
+                        self.breaker.record_success()
+                    elif self.breaker.record_failure():
+                        self._count("circuit_opens")
+                        log.error(f"Circuit for {self.name} opened: {e}")
+                    raise
+
+                delay = self.backoff(attempt, e)
+                self._count("retries")
+                log.warning(
+                    f"{self.name} call failed ({e}), retry {attempt + 1} in {delay:.1f}s"
+                )
+                time.sleep(delay)
+            else:
+                self.breaker.record_success()
+                self._count("successes")
+                return result
+
+
+# Default request rates of the providers, overridable as <NAME>_RATE_LIMIT / <NAME>_BURST
+PROVIDER_RATES = {"together": (10.0, 10), "watson": (10.0, 20)}
+
+_providers = {}
+_providers_lock = threading.Lock()
+
+
+def get_provider(name: str) -> Provider:
+    """
+    Return the process-wide resilience wrapper of a provider.
+
+    Args:
+        name (str): The provider name, e.g. "together" or "watson".
+
+    Returns:
+        Provider: The provider, shared by every thread of the process.
+    """
+    with _providers_lock:
+        if name not in _providers:
+            rate, burst = PROVIDER_RATES.get(name, (10.0, 10))
+            rate = float(os.getenv(f"{name.upper()}_RATE_LIMIT", rate))
+            burst = int(os.getenv(f"{name.upper()}_BURST", burst))
+            _providers[name] = Provider(name, rate, burst)
+        return _providers[name]
+
+
+def resilience_metrics() -> dict:
+    """
+    Return the metrics of every provider used so far, keyed by provider name.
+    """
+    with _providers_lock:
+        providers = list(_providers.values())
+    return {provider.name: provider.metrics for provider in providers}
+
+
+def _collect_metrics():
+    for provider, metrics in resilience_metrics().items():
+        circuit = metrics.pop("circuit")
+        yield "provider_circuit_open", {"provider": provider}, int(circuit != "closed")
+        for name, value in metrics.items():
+            yield f"provider_{name}", {"provider": provider}, value
+
+
+registry.register_collector(_collect_metrics)
@@ -1,11 +1,11 @@
-import tldextract
-import requests
-from bs4 import BeautifulSoup
-import streamlit as st
-from urllib.parse import urljoin, urlparse
-from utils import required_intents
-from utils.writer import write_to_file
-from utils.ibm_waston import UserPrompt, process_prompt
+from utils.crawler import CrawlConfig, iter_pages
+from utils.dedup import NearDuplicateIndex
+from utils.extractor import BoilerplateFilter
+from utils.manifest import SiteManifest
+from utils.spool import PageRecord, PageSpool
+from utils.vector_index import VectorIndex
+from utils.artifacts import Artifact, get_artifact_store, site_key
+from utils.summarizer import summarize_pages
 from utils.logger import get_logger
 
 log = get_logger(__name__)
@@ -22,133 +22,173 @@ def extract_domain_without_tld(url):
         str: The domain name without the TLD.
     """
     try:
+        import tldextract  # Deferred, loading its suffix list is slow
+
         ext = tldextract.extract(url)
         return ext.domain
     except Exception as e:
         return None
 
 
-def scrape_website_recursive(
+def scrape_website(
     url: str,
-    visited: set = None,
-    aggregated_content: str = "",
+    config: CrawlConfig = None,
+    manifest: SiteManifest = None,
+    index: VectorIndex = None,
+    on_title=None,
 ) -> tuple:
     """
-    Recursively scrape all pages linked from the given URL and append content to a single file.
+    Crawl all pages linked from the given URL and spool their content to disk.
+
+    Pages are written to the spool as they are fetched, so the crawl never holds
+    the whole site in memory; the spool is read back lazily by summarize_website().
 
     Args:
         url (str): The starting URL of the website.
-        visited (set): A set to keep track of visited URLs to avoid duplication.
-        aggregated_content (str): Accumulated content from all pages.
+        config (CrawlConfig): Crawl limits (pages, depth and concurrency).
+        manifest (SiteManifest): If given, the crawled pages are compared against it.
+        index (VectorIndex): If given, the page chunks are added to it as they are
+            crawled, and it is saved for the website.
+        on_title (callable): Called with the website title as soon as the start
+            page has been fetched, while the rest of the site is still crawled.
 
     Returns:
         tuple: A tuple containing:
-            - The aggregated content from all the pages scraped.
+            - The PageSpool of crawled page records, empty if the start page failed.
+              The caller should close() it once the content has been used.
             - The main title of the website.
     """
-    if visited is None:
-        visited = set()
+    duplicates = NearDuplicateIndex()
+    # Drop content blocks repeated across pages, such as banners and taglines
+    boilerplate = BoilerplateFilter()
+    pages = PageSpool()
+    title = None
+
+    for page in iter_pages(url, config, duplicates):
+        if title is None:
+            title = _site_title(url, page.title)
+            if on_title is not None:
+                on_title(title)
+        if page.replaces:
+            # A near-duplicate with a preferred URL supersedes a page already kept
+            pages.discard(page.replaces)
+            if index is not None:
+                index.remove_page(page.replaces)
+        text = " ".join(boilerplate.filter(page.blocks))
+        pages.append(PageRecord(url=page.url, title=page.title, text=text, hash=page.hash))
+        if index is not None:
+            index.add_page(page.url, page.title, text)
+
+    if not pages:
+        log.error(f"Failed to fetch the start page: {url}")
+        return pages, None
+
+    stats = duplicates.stats
+    log.info(
+        f"Dropped {stats['duplicates']} of {stats['pages']} pages of {url} as "
+        f"near-duplicates, saving {stats['bytes_saved']} bytes "
+        f"(~{stats['tokens_saved']} tokens)."
+    )
+    if boilerplate.dropped_bytes:
+        log.info(f"Dropped {boilerplate.dropped_bytes} bytes of repeated content.")
 
-    if url in visited:
-        log.info(f"Already visited: {url}")
-        return aggregated_content, None
+    if manifest:
+        manifest.compare(pages)
+        manifest.data["dedup"] = stats
 
-    log.info(f"Scraping URL: {url}")
-    visited.add(url)
+    if index is not None:
+        index.save(url)
+
+    return pages, title
 
-    try:
-        # Make a GET request to fetch the content of the page
-        response = requests.get(url, timeout=10, verify=False)
-        if response.status_code != 200:
-            log.error(
-                f"Failed to fetch URL: {url}. Status code: {response.status_code}"
-            )
-            return aggregated_content, None
-
-        soup = BeautifulSoup(response.content, "html.parser")
-
-        # Extract page title
-        title = soup.title.string.strip() if soup.title else "Untitled_Page"
-
-        # Extract all text content
-        paragraphs = soup.find_all("p")
-        page_content = " ".join([para.get_text().strip() for para in paragraphs])
-
-        # Page content
-        pg_content = f"Title: {title}\n{page_content}\n\n"
-
-        # Aggregate the content from this page
-        aggregated_content += pg_content
-
-        # Find all links on the page
-        links = {urljoin(url, a["href"]) for a in soup.find_all("a", href=True)}
-
-        # Filter links to include only those in the same domain and exclude unwanted types
-        domain = urlparse(url).netloc
-        links = {
-            link
-            for link in links
-            if urlparse(link).netloc == domain
-            and not any(
-                link.endswith(ext) for ext in (".jpg", ".png", ".gif", ".jpeg", ".bmp")
-            )
-        }
-
-        # Recursively scrape each link
-        for link in links:
-            if link not in visited:
-                aggregated_content, _ = scrape_website_recursive(
-                    link, visited, aggregated_content
-                )
-
-    except requests.RequestException as e:
-        log.error(f"Request error while fetching URL: {url}. Error: {e}")
-    except Exception as e:
-        log.error(f"Unexpected error while scraping URL: {url}. Error: {e}")
 
+def _site_title(url: str, title: str) -> str:
+    """
+    The website title from its start page's title, or its domain if that is too long.
+    """
     if len(title) > 64:
-        title = extract_domain_without_tld(url)
+        return extract_domain_without_tld(url)
+    return title
+
+
+def summarize_website(
+    url: str, pages, manifest: SiteManifest = None, stream: bool = False
+):
+    """
+    Summarizes scraped website content, reusing the last build's summary if the site
+    is unchanged, or else the summaries of the page chunks that did not change.
+
+    Args:
+        url (str): The URL of the website.
+        pages (PageSpool): The page records returned by scrape_website().
+        manifest (SiteManifest): The website's crawl manifest, already compared with the crawl.
+        stream (bool): Whether to return the summary as a generator of text pieces
+            that streams the final summarization step. A reused summary is
+            always returned as a string.
+
+    Returns:
+        str: The summarized content, or None if summarization failed.
+    """
+    if manifest and manifest.unchanged:
+        summary = manifest.load_summary()
+        if summary:
+            log.info(f"No changes since the last build of {url}, reusing its summary.")
+            return summary
+
+    summary = summarize_pages(
+        pages, stream=stream, map_results=manifest.map_results if manifest else None
+    )
+
+    if not summary:
+        log.error("Failed to summarize the website content.")
+        return None
 
-    return aggregated_content, title
+    return summary
 
 
-def fetch_and_summarize_content(url: str):
+def fetch_and_summarize_content(
+    url: str, manifest: SiteManifest = None, stream: bool = False
+):
     """
     Scrapes the content of the provided URL and generates a summary.
     Args:
         url (str): The URL to scrape and summarize.
+        manifest (SiteManifest): The website's crawl manifest. If the site has not
+            changed since its last build, the saved summary is reused.
+        stream (bool): Whether to return the summary as a generator of text pieces
+            (see summarize_website).
     Returns:
         tuple: A tuple containing the summarized content and the website title.
     """
-    content, title = scrape_website_recursive(url)
+    pages, title = scrape_website(url, manifest=manifest)
 
-    if not content:
-        log.error("Failed to fetch content from the provided URL.")
-        return None, None
-
-    prompt = UserPrompt(
-        text=f""""
-        Ensure to provide a detailed summary of the following content, highlighting the {', '.join(required_intents)}: {content}\n.
+    with pages:
+        if not pages:
+            log.error("Failed to fetch content from the provided URL.")
+            return None, None
 
-        Please return your response in the Markdown format. Only use the english language.
-        """
-    )
-    summary = process_prompt(prompt)
+        summary = summarize_website(url, pages, manifest=manifest, stream=stream)
 
     if not summary:
-        log.error("Failed to summarize the website content.")
         return None, None
 
     return summary, title
 
 
-def save_summary_markdown(data, filename):
+def save_summary_markdown(data, filename, url: str = None) -> Artifact:
     """
-    Save the website summary as a markdown file and provide a Streamlit download link.
+    Save the website summary as a markdown file in the artifact store, in the background.
 
     Args:
-        summary (str): Summarized content of the website.
-        workspace_name (str): Name of the workspace (used for the filename).
+        data (str): Summarized content of the website.
+        filename (str): The website title (used for the file path).
+        url (str): The website URL, which keeps sites with the same title apart.
+
+    Returns:
+        Artifact: The stored summary, whose bytes the download buttons serve.
     """
-    file_path = write_to_file(data, filename, file_type="md")
-    st.info(f"File saved successfully: `{file_path}`")
+    artifact = get_artifact_store().put(site_key(filename, url), "summary", data)
+    import streamlit as st
+
+    st.info(f"Saving summary to `{artifact.path}`")
+    return artifact
@@ -0,0 +1,122 @@
+import os
+import json
+import tempfile
+import threading
+import weakref
+from dataclasses import asdict, dataclass
+
+
+@dataclass
+class PageRecord:
+    url: str
+    title: str
+    text: str
+    hash: str
+
+
+def _remove(path: str):
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+
+class PageSpool:
+    """
+    Append-only spool of crawled page records, kept in a temporary JSON-lines file
+    instead of memory so that large sites are never held as one string.
+
+    Records are appended as pages arrive and read back lazily, one at a time, by
+    iterating over the spool; it can be iterated any number of times, and single
+    records can be read back by URL with select(). A record can be discarded
+    later, e.g. when a near-duplicate page replaces it. The file is removed by
+    close(), or when the spool is garbage collected.
+
+    Example:
+        with PageSpool() as pages:
+            pages.append(PageRecord(url, title, text, hash))
+            for page in pages:
+                print(page.title)
+    """
+
+    def __init__(self, directory: str = None):
+        """
+        Args:
+            directory (str): Where to create the spool file, defaults to the system
+                temporary directory.
+        """
+        fd, self.path = tempfile.mkstemp(prefix="pages-", suffix=".jsonl", dir=directory)
+        self._file = os.fdopen(fd, "wb")
+        self._lock = threading.Lock()
+        self._finalizer = weakref.finalize(self, _remove, self.path)
+        self.count = 0
+        self.bytes_written = 0
+        self._discarded = set()
+        self._offsets = {}  # byte offset of the record of each URL
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def __len__(self) -> int:
+        return self.count - len(self._discarded)
+
+    def append(self, record: PageRecord):
+        """
+        Write a page record to the end of the spool.
+        """
+        line = (json.dumps(asdict(record), ensure_ascii=False) + "\n").encode("utf-8")
+        with self._lock:
+            self._file.write(line)
+            self._offsets[record.url] = self.bytes_written
+            self.count += 1
+            self.bytes_written += len(line)
+
+    def discard(self, url: str):
+        """
+        Leave the record of a URL out of later iterations.
+        """
+        with self._lock:
+            self._discarded.add(url)
+
+    def __iter__(self):
+        """
+        Read the page records back lazily, in the order they were appended.
+        """
+        with self._lock:
+            self._file.flush()
+            count = self.count
+            discarded = set(self._discarded)
+
+        with open(self.path, "r", encoding="utf-8") as f:
+            for _, line in zip(range(count), f):
+                record = PageRecord(**json.loads(line))
+                if record.url not in discarded:
+                    yield record
+
+    def select(self, urls):
+        """
+        Read the records of the given URLs back lazily, in the order the URLs are
+        given. Discarded records are skipped.
+        """
+        with self._lock:
+            self._file.flush()
+            discarded = set(self._discarded)
+
+        with open(self.path, "rb") as f:
+            for url in urls:
+                if url in discarded:
+                    continue
+                f.seek(self._offsets[url])
+                yield PageRecord(**json.loads(f.readline()))
+
+    def close(self):
+        """
+        Delete the spool file. The spool cannot be used afterwards.
+        """
+        with self._lock:
+            if not self._file.closed:
+                self._file.close()
+        self._finalizer()
@@ -0,0 +1,338 @@
+import os
+import re
+import math
+import hashlib
+from collections import deque
+from dataclasses import dataclass, field
+from itertools import chain
+from concurrent.futures import ThreadPoolExecutor
+from utils import required_intents
+from utils.prompt_processor import UserPrompt, process_prompt, stream_prompt
+from utils.tokenizer import count_tokens
+from utils.logger import get_logger
+
+log = get_logger(__name__)
+
+# Maximum number of content tokens sent in a single summarization prompt
+SUMMARY_CHUNK_TOKENS = int(os.getenv("SUMMARY_CHUNK_TOKENS", "8000"))
+
+# Maximum number of summarization prompts in flight, to stay within rate limits
+SUMMARY_CONCURRENCY = int(os.getenv("SUMMARY_CONCURRENCY", "4"))
+
+# Share of the chunk budget a page group is sized for, leaving room for it to grow
+SUMMARY_GROUP_FILL = 0.75
+
+# Every page of the aggregated crawl content starts with a "Title: " line
+PAGE_BOUNDARY = re.compile(r"\n\n(?=Title: )")
+
+
+@dataclass
+class MapResults:
+    """
+    The chunk summaries of a site's map step, kept across builds so that a rebuild
+    only summarizes the chunks whose pages changed.
+
+    Pages are spread over `groups` page groups by a hash of their URL, and every
+    group is chunked on its own, so a changed page only changes the chunks of its
+    group. Summaries are keyed by a hash of their chunk's text.
+    """
+
+    groups: int = 0
+    summaries: dict = field(default_factory=dict)
+
+
+def split_pages(content: str) -> list:
+    """
+    Split aggregated crawl content back into one text per page.
+
+    Args:
+        content (str): The aggregated content of all crawled pages.
+
+    Returns:
+        list: The non-empty page texts, in crawl order.
+    """
+    return [page.strip() for page in PAGE_BOUNDARY.split(content) if page.strip()]
+
+
+def _split_oversized(text: str, budget: int) -> list:
+    """
+    Split a single text that exceeds the token budget into word-aligned pieces.
+    """
+    pieces, words, used = [], [], 0
+    for word in text.split():
+        word_tokens = count_tokens(word) + 1
+        if words and used + word_tokens > budget:
+            pieces.append(" ".join(words))
+            words, used = [], 0
+        words.append(word)
+        used += word_tokens
+    if words:
+        pieces.append(" ".join(words))
+    return pieces
+
+
+def iter_chunks(texts, budget: int = SUMMARY_CHUNK_TOKENS):
+    """
+    Pack texts into chunks of at most `budget` tokens without splitting a text,
+    unless that text alone is larger than the budget.
+
+    Texts are consumed lazily, so only the chunk being filled is held in memory.
+
+    Args:
+        texts (iterable): The texts to pack, e.g. pages or partial summaries.
+        budget (int): The maximum number of tokens per chunk.
+
+    Yields:
+        str: The chunks, each a single string.
+    """
+    current, used = [], 0
+    for text in texts:
+        tokens = count_tokens(text)
+        if tokens > budget:
+            pieces = _split_oversized(text, budget)
+        else:
+            pieces = [text]
+
+        for piece in pieces:
+            piece_tokens = tokens if len(pieces) == 1 else count_tokens(piece)
+            if current and used + piece_tokens > budget:
+                yield "\n\n".join(current)
+                current, used = [], 0
+            current.append(piece)
+            used += piece_tokens
+
+    if current:
+        yield "\n\n".join(current)
+
+
+def chunk_texts(texts: list, budget: int = SUMMARY_CHUNK_TOKENS) -> list:
+    """
+    Pack texts into token-budgeted chunks, see iter_chunks().
+
+    Returns:
+        list: The chunks, each a single string.
+    """
+    return list(iter_chunks(texts, budget))
+
+
+def _summarize_chunk(chunk: str):
+    """
+    Map step: summarize one chunk of website pages.
+    """
+    prompt = UserPrompt(
+        text=f"""
+        Summarize the following pages of a website. Keep every fact related to the {', '.join(required_intents)},
+        such as names, dates, contact details, services and locations.
+
+        {chunk}
+
+        Please return your response in the Markdown format. Only use the english language.
+        """
+    )
+    return process_prompt(prompt)
+
+
+def _merge_summaries(chunk: str):
+    """
+    Reduce step: merge several partial summaries of the same website.
+    """
+    prompt = UserPrompt(
+        text=f"""
+        The following are partial summaries of different pages of the same website.
+        Merge them into a single summary, removing repetition but keeping every fact related to the {', '.join(required_intents)}.
+
+        {chunk}
+
+        Please return your response in the Markdown format. Only use the english language.
+        """
+    )
+    return process_prompt(prompt)
+
+
+def _run_parallel(func, chunks) -> list:
+    """
+    Apply a summarization step to every chunk concurrently, dropping failed results.
+
+    Chunks are pulled from the iterable only as prompts complete, so at most
+    SUMMARY_CONCURRENCY chunks are in memory at once.
+    """
+    if isinstance(chunks, list) and len(chunks) == 1:
+        results = [func(chunks[0])]
+    else:
+        results, pending = [], deque()
+        with ThreadPoolExecutor(max_workers=SUMMARY_CONCURRENCY) as pool:
+            for chunk in chunks:
+                if len(pending) >= SUMMARY_CONCURRENCY:
+                    results.append(pending.popleft().result())
+                pending.append(pool.submit(func, chunk))
+            results.extend(future.result() for future in pending)
+
+    failed = results.count(None)
+    if failed:
+        log.error(f"{failed} of {len(results)} summarization prompts failed.")
+    return [result for result in results if result]
+
+
+def _chunk_key(chunk: str) -> str:
+    return hashlib.sha256(chunk.encode("utf-8")).hexdigest()
+
+
+def _page_group(url: str, groups: int) -> int:
+    return int(hashlib.sha256(url.encode("utf-8")).hexdigest()[:8], 16) % groups
+
+
+def _group_count(tokens: int, budget: int, previous: int) -> int:
+    """
+    The number of page groups for a site, keeping the previous build's count
+    unless the site has grown or shrunk so much that its groups no longer fit.
+    """
+    needed = max(1, math.ceil(tokens / (budget * SUMMARY_GROUP_FILL)))
+    return previous if needed <= previous <= 2 * needed else needed
+
+
+def _page_text(page) -> str:
+    return f"Title: {page.title}\n{page.text}".strip()
+
+
+def _map_grouped(pages, budget: int, map_results: MapResults):
+    """
+    Map step of summarize_pages() reusing the chunk summaries of the last build.
+
+    Returns:
+        list: The chunk summaries, or None if the site fits into a single prompt.
+    """
+    urls, tokens = [], 0
+    for page in pages:
+        urls.append(page.url)
+        tokens += count_tokens(_page_text(page))
+    if tokens <= budget:
+        return None
+
+    groups = _group_count(tokens, budget, map_results.groups)
+    members = [[] for _ in range(groups)]
+    for url in sorted(urls):
+        members[_page_group(url, groups)].append(url)
+
+    previous, current = map_results.summaries, {}
+
+    def summarize(chunk):
+        key = _chunk_key(chunk)
+        summary = previous.get(key) or _summarize_chunk(chunk)
+        if summary:
+            current[key] = summary
+        return summary
+
+    chunks = (
+        chunk
+        for group in members
+        for chunk in iter_chunks((_page_text(page) for page in pages.select(group)), budget)
+    )
+    log.info(f"Summarizing website content in {groups} page groups.")
+    partials = _run_parallel(summarize, chunks)
+    reused = len(set(current) & set(previous))
+    log.info(
+        f"Summarized {len(partials)} chunks of website content, "
+        f"{reused} reused from the last build."
+    )
+
+    map_results.groups, map_results.summaries = groups, current
+    return partials
+
+
+def _reduce(partials: list, budget: int, stream: bool):
+    """
+    Reduce step: merge partial summaries until they fit into the final prompt,
+    then summarize them once more.
+    """
+    while len(partials) > 1 and count_tokens("\n\n".join(partials)) > budget:
+        groups = chunk_texts(partials, budget)
+        if len(groups) >= len(partials):
+            break
+        log.info(f"Merging {len(partials)} partial summaries into {len(groups)}.")
+        partials = _run_parallel(_merge_summaries, groups)
+
+    if not partials:
+        return None
+
+    content = "\n\n".join(partials)
+    prompt = UserPrompt(
+        text=f""""
+        Ensure to provide a detailed summary of the following content, highlighting the {', '.join(required_intents)}: {content}\n.
+
+        Please return your response in the Markdown format. Only use the english language.
+        """
+    )
+    return stream_prompt(prompt) if stream else process_prompt(prompt)
+
+
+def _summarize_texts(texts, budget: int, stream: bool):
+    """
+    Summarize page texts with a map-reduce pipeline, see summarize_pages().
+    """
+    chunks = iter_chunks(texts, budget)
+    first, second = next(chunks, None), next(chunks, None)
+
+    if second is None:
+        partials = [first] if first else []
+    else:
+        log.info("Summarizing website content in chunks.")
+        partials = _run_parallel(_summarize_chunk, chain((first, second), chunks))
+        log.info(f"Summarized {len(partials)} chunks of website content.")
+
+    return _reduce(partials, budget, stream)
+
+
+def summarize_pages(
+    pages,
+    budget: int = SUMMARY_CHUNK_TOKENS,
+    stream: bool = False,
+    map_results: MapResults = None,
+):
+    """
+    Summarize the pages of a website with a map-reduce pipeline.
+
+    Pages are read lazily and packed into token-budgeted chunks, each chunk is
+    summarized in parallel as soon as it is full, and the partial summaries are
+    merged level by level until they fit into a single final prompt. Small sites
+    take a single prompt. Only the chunks in flight are held in memory, so pages
+    can be streamed from a crawl spool.
+
+    With `map_results`, pages are chunked by page group instead of crawl order (see
+    MapResults), the chunks summarized by the last build are reused, and
+    `map_results` is updated in place with the summaries of this build.
+
+    Args:
+        pages (iterable): The page records (title and text), e.g. a PageSpool.
+        budget (int): The maximum number of content tokens per prompt.
+        stream (bool): Whether to stream the final summary instead of waiting for it.
+        map_results (MapResults): The map results of the last build, which needs
+            the pages to be a PageSpool.
+
+    Returns:
+        str: The Markdown summary of the website, or None if summarization failed.
+            When streaming, a generator of summary text pieces is returned instead.
+    """
+    if map_results is not None:
+        partials = _map_grouped(pages, budget, map_results)
+        if partials is not None:
+            return _reduce(partials, budget, stream)
+
+    return _summarize_texts((_page_text(page) for page in pages), budget, stream)
+
+
+def summarize_content(
+    content: str, budget: int = SUMMARY_CHUNK_TOKENS, stream: bool = False
+):
+    """
+    Summarize aggregated website content, see summarize_pages().
+
+    Args:
+        content (str): The aggregated content of all crawled pages.
+        budget (int): The maximum number of content tokens per prompt.
+        stream (bool): Whether to stream the final summary instead of waiting for it.
+
+    Returns:
+        str: The Markdown summary of the website, or None if summarization failed.
+            When streaming, a generator of summary text pieces is returned instead.
+    """
+    return _summarize_texts(split_pages(content), budget, stream)
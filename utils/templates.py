@@ -0,0 +1,237 @@
+import os
+import json
+import time
+import threading
+from utils.logger import get_logger
+
+log = get_logger(__name__)
+
+# Directories of the predefined intent and action templates
+INTENTS_DIR = os.getenv("TEMPLATE_INTENTS_DIR", "samples/intents")
+ACTIONS_DIR = os.getenv("TEMPLATE_ACTIONS_DIR", "samples/actions")
+
+# Industry vertical whose templates are added to the common ones, e.g. "healthcare"
+TEMPLATE_VERTICAL = os.getenv("TEMPLATE_VERTICAL") or None
+
+# Seconds between checks of the template files for changes
+TEMPLATE_RELOAD_INTERVAL = float(os.getenv("TEMPLATE_RELOAD_INTERVAL", "5"))
+
+
+def validate_intent(intent) -> str:
+    """
+    Check an intent template against the Watson intent schema.
+
+    Returns:
+        str: The reason the template is invalid, or None if it is valid.
+    """
+    if not isinstance(intent, dict):
+        return "not an object"
+    if not isinstance(intent.get("intent"), str) or not intent["intent"]:
+        return "missing 'intent' name"
+    examples = intent.get("examples", [])
+    if not isinstance(examples, list) or not all(
+        isinstance(example, dict) and isinstance(example.get("text"), str)
+        for example in examples
+    ):
+        return "'examples' must be a list of {\"text\": ...} objects"
+    return None
+
+
+def validate_action(action) -> str:
+    """
+    Check an action template against the dialog node schema.
+
+    Returns:
+        str: The reason the template is invalid, or None if it is valid.
+    """
+    if not isinstance(action, dict):
+        return "not an object"
+    if not isinstance(action.get("action_name"), str) or not action["action_name"]:
+        return "missing 'action_name'"
+    for key in ("conditions", "output_text"):
+        if not isinstance(action.get(key, ""), str):
+            return f"'{key}' must be a string"
+    return None
+
+
+class TemplateRegistry:
+    """
+    In-memory registry of the intent and action templates, loaded once and indexed by name.
+
+    JSON files directly in the intents and actions directories hold the common
+    templates; files in a subdirectory belong to the industry vertical named after
+    it (e.g. samples/intents/healthcare/). Templates are validated when loaded and
+    invalid ones are skipped with an error.
+
+    Files are checked for changes at most every `reload_interval` seconds, using
+    their modification times, and only changed files are parsed again, so lookups
+    do no disk I/O and large template libraries reload cheaply.
+    """
+
+    def __init__(
+        self,
+        intents_dir: str = INTENTS_DIR,
+        actions_dir: str = ACTIONS_DIR,
+        reload_interval: float = TEMPLATE_RELOAD_INTERVAL,
+    ):
+        self.dirs = {"intent": intents_dir, "action": actions_dir}
+        self.reload_interval = reload_interval
+        self._files = {}  # path -> (mtime_ns, size, kind, vertical, templates)
+        self._sets = {}  # vertical -> (intents, actions)
+        # kind -> vertical -> name -> template
+        self._indexes = {"intent": {}, "action": {}}
+        self._checked = None
+        self._lock = threading.Lock()
+
+    def _scan(self) -> dict:
+        found = {}
+        for kind, root in self.dirs.items():
+            if not os.path.isdir(root):
+                continue
+            for directory, subdirs, filenames in os.walk(root):
+                subdirs.sort()
+                vertical = os.path.relpath(directory, root)
+                vertical = None if vertical == "." else vertical.split(os.sep)[0]
+                for filename in sorted(filenames):
+                    if filename.endswith(".json"):
+                        path = os.path.join(directory, filename)
+                        try:
+                            stat = os.stat(path)
+                        except OSError:
+                            # Removed since the walk, e.g. by an editor saving it
+                            continue
+                        found[path] = (stat.st_mtime_ns, stat.st_size, kind, vertical)
+        return found
+
+    def _load_file(self, path: str, kind: str) -> list:
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                content = json.load(f)
+        except (OSError, ValueError) as e:
+            log.error(f"Skipping unreadable template file {path}: {e}")
+            return []
+
+        if not isinstance(content, list):
+            log.error(f"Skipping template file {path}: expected a list of {kind}s")
+            return []
+
+        validate = validate_intent if kind == "intent" else validate_action
+        templates = []
+        for position, template in enumerate(content):
+            error = validate(template)
+            if error:
+                log.error(f"Skipping {kind} #{position} in {path}: {error}")
+            else:
+                templates.append(template)
+        return templates
+
+    def _refresh(self):
+        now, first = time.monotonic(), self._checked is None
+        if not first and now - self._checked < self.reload_interval:
+            return
+        self._checked = now
+
+        found = self._scan()
+        previous = {path: cached[:2] for path, cached in self._files.items()}
+        if not first and previous == {path: f[:2] for path, f in found.items()}:
+            return
+
+        files, reloaded = {}, 0
+        for path, (mtime, size, kind, vertical) in found.items():
+            cached = self._files.get(path)
+            if cached and cached[:2] == (mtime, size):
+                files[path] = cached
+            else:
+                files[path] = (mtime, size, kind, vertical, self._load_file(path, kind))
+                reloaded += 1
+
+        self._files = files
+        self._build_indexes()
+        log.info(f"Loaded {reloaded} of {len(files)} template files.")
+
+    def _build_indexes(self):
+        # A later template with the same name replaces an earlier one in place
+        indexes = {"intent": {}, "action": {}}
+        for _, _, kind, vertical, templates in self._files.values():
+            key = "intent" if kind == "intent" else "action_name"
+            index = indexes[kind].setdefault(vertical, {})
+            for template in templates:
+                index[template[key]] = template
+        self._indexes = indexes
+        self._sets = {}
+
+    def _merged(self, kind: str, vertical: str) -> dict:
+        # A vertical's templates override the common ones of the same name
+        merged = dict(self._indexes[kind].get(None, {}))
+        if vertical:
+            merged.update(self._indexes[kind].get(vertical, {}))
+        return merged
+
+    def _lookup(self, kind: str, name: str, vertical: str):
+        template = self._indexes[kind].get(vertical, {}).get(name) if vertical else None
+        if template is None:
+            template = self._indexes[kind].get(None, {}).get(name)
+        return template
+
+    def templates(self, vertical: str = TEMPLATE_VERTICAL) -> tuple:
+        """
+        Return the templates available to a vertical: the common ones plus its own,
+        which replace common templates of the same name.
+
+        Args:
+            vertical (str): The industry vertical, or None for the common templates only.
+
+        Returns:
+            tuple: A tuple containing the intent templates and the action templates.
+        """
+        with self._lock:
+            self._refresh()
+            if vertical not in self._sets:
+                self._sets[vertical] = (
+                    list(self._merged("intent", vertical).values()),
+                    list(self._merged("action", vertical).values()),
+                )
+            intents, actions = self._sets[vertical]
+        return list(intents), list(actions)
+
+    def intent(self, name: str, vertical: str = TEMPLATE_VERTICAL):
+        """
+        Look up an intent template by name, or None if there is none.
+        """
+        with self._lock:
+            self._refresh()
+            return self._lookup("intent", name, vertical)
+
+    def action(self, name: str, vertical: str = TEMPLATE_VERTICAL):
+        """
+        Look up an action template by name, or None if there is none.
+        """
+        with self._lock:
+            self._refresh()
+            return self._lookup("action", name, vertical)
+
+    @property
+    def verticals(self) -> list:
+        """
+        The verticals that have templates of their own.
+        """
+        with self._lock:
+            self._refresh()
+            names = set(self._indexes["intent"]) | set(self._indexes["action"])
+        return sorted(name for name in names if name)
+
+
+_registry = None
+_registry_lock = threading.Lock()
+
+
+def get_template_registry() -> TemplateRegistry:
+    """
+    Return the process-wide template registry.
+    """
+    global _registry
+
+    with _registry_lock:
+        if _registry is None:
+            _registry = TemplateRegistry()
+        return _registry
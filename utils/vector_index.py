@@ -0,0 +1,305 @@
+import os
+import re
+import json
+import hashlib
+import threading
+import numpy as np
+from urllib.parse import urlparse
+from utils import required_intents
+from utils.discovery import INTENT_KEYWORDS
+from utils.logger import get_logger
+
+log = get_logger(__name__)
+
+# Directory holding one vector index per website
+INDEX_DIR = os.getenv("INDEX_DIR", "samples/indexes")
+
+# "hashing" for the built-in embedder, or the name of a sentence-transformers model
+EMBEDDING_MODEL = os.getenv("EMBEDDING_MODEL", "hashing")
+
+# Number of page chunks retrieved per required intent
+RETRIEVAL_TOP_K = int(os.getenv("RETRIEVAL_TOP_K", "3"))
+
+# Number of words per indexed page chunk
+CHUNK_WORDS = 150
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+
+
+class HashingEmbedder:
+    """
+    Dependency-free embedder: word unigrams and bigrams hashed into a fixed number
+    of signed buckets, weighted sublinearly and L2-normalized.
+    """
+
+    def __init__(self, dim: int = 512):
+        self.dim = dim
+        self.name = f"hashing-{dim}"
+
+    def _features(self, text: str) -> dict:
+        words = TOKEN_PATTERN.findall(text.lower())
+        counts = {}
+        for feature in words + [f"{a} {b}" for a, b in zip(words, words[1:])]:
+            counts[feature] = counts.get(feature, 0) + 1
+        return counts
+
+    def embed(self, texts: list) -> np.ndarray:
+        """
+        Embed texts into unit vectors.
+
+        Args:
+            texts (list): The texts to embed.
+
+        Returns:
+            np.ndarray: A (len(texts), dim) float32 matrix.
+        """
+        vectors = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for row, text in enumerate(texts):
+            for feature, count in self._features(text).items():
+                digest = hashlib.blake2b(feature.encode("utf-8"), digest_size=8).digest()
+                value = int.from_bytes(digest, "big")
+                sign = 1.0 if value >> 63 else -1.0
+                vectors[row, value % self.dim] += sign * (1.0 + np.log(count))
+
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        return vectors / np.maximum(norms, 1e-12)
+
+
+class SentenceTransformerEmbedder:
+    """
+    Embedder backed by a local sentence-transformers model.
+    """
+
+    def __init__(self, model_name: str):
+        from sentence_transformers import SentenceTransformer
+
+        self._model = SentenceTransformer(model_name)
+        self.name = model_name
+
+    def embed(self, texts: list) -> np.ndarray:
+        vectors = self._model.encode(texts, normalize_embeddings=True)
+        return np.asarray(vectors, dtype=np.float32)
+
+
+_embedder = None
+_lock = threading.Lock()
+
+
+def get_embedder():
+    """
+    Return the process-wide embedder selected by EMBEDDING_MODEL.
+
+    Falls back to the hashing embedder if sentence-transformers is not installed.
+    """
+    global _embedder
+
+    with _lock:
+        if _embedder is None:
+            if EMBEDDING_MODEL == "hashing":
+                _embedder = HashingEmbedder()
+            else:
+                try:
+                    _embedder = SentenceTransformerEmbedder(EMBEDDING_MODEL)
+                except ImportError:
+                    log.warning(
+                        "sentence-transformers is not installed, "
+                        "using the hashing embedder."
+                    )
+                    _embedder = HashingEmbedder()
+        return _embedder
+
+
+def chunk_page(title: str, text: str, words: int = CHUNK_WORDS) -> list:
+    """
+    Split a page into chunks of at most `words` words, each prefixed with the page title.
+    """
+    tokens = text.split()
+    return [
+        f"{title}: {' '.join(tokens[start:start + words])}"
+        for start in range(0, len(tokens), words)
+    ]
+
+
+class VectorIndex:
+    """
+    Cosine-similarity index over the page chunks of one website, held as a NumPy matrix.
+
+    Chunks are added page by page during the crawl and embedded in batches; the
+    index is saved per site, so later builds and resumed runs can reuse it.
+
+    Example:
+        index = VectorIndex()
+        index.add_page(url, title, text)
+        for score, chunk in index.search("How can I contact you?", k=3):
+            print(score, chunk["url"])
+    """
+
+    def __init__(self, embedder=None):
+        """
+        Args:
+            embedder: The embedder, defaults to get_embedder().
+        """
+        self.embedder = embedder or get_embedder()
+        self.chunks = []  # [{"url": ..., "text": ...}] per row of the matrix
+        self._blocks = []
+        self._pending = []
+        self._vectors = None
+
+    def __len__(self) -> int:
+        return len(self.chunks) + len(self._pending)
+
+    def add_page(self, url: str, title: str, text: str):
+        """
+        Queue the chunks of a page for embedding.
+        """
+        for chunk in chunk_page(title, text):
+            self._pending.append({"url": url, "text": chunk})
+        if len(self._pending) >= 256:
+            self._flush()
+
+    def remove_page(self, url: str):
+        """
+        Remove the chunks of a page, e.g. one replaced by a near-duplicate.
+        """
+        self._pending = [chunk for chunk in self._pending if chunk["url"] != url]
+        keep = [row for row, chunk in enumerate(self.chunks) if chunk["url"] != url]
+        if len(keep) < len(self.chunks):
+            self._blocks = [np.vstack(self._blocks)[keep]]
+            self.chunks = [self.chunks[row] for row in keep]
+            self._vectors = None
+
+    def _flush(self):
+        if self._pending:
+            self._blocks.append(self.embedder.embed([c["text"] for c in self._pending]))
+            self.chunks.extend(self._pending)
+            self._pending = []
+            self._vectors = None
+
+    @property
+    def vectors(self) -> np.ndarray:
+        """
+        The (chunks, dim) matrix of unit chunk vectors.
+        """
+        self._flush()
+        if self._vectors is None:
+            self._vectors = (
+                np.vstack(self._blocks)
+                if self._blocks
+                else np.zeros((0, 1), dtype=np.float32)
+            )
+            self._blocks = [self._vectors]
+        return self._vectors
+
+    def search(self, query: str, k: int = RETRIEVAL_TOP_K) -> list:
+        """
+        Find the chunks most similar to a query.
+
+        Args:
+            query (str): The query text.
+            k (int): The number of chunks to return.
+
+        Returns:
+            list: Up to k (score, chunk) pairs, best first.
+        """
+        vectors = self.vectors
+        if not len(vectors):
+            return []
+
+        scores = vectors @ self.embedder.embed([query])[0]
+        k = min(k, len(scores))
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        return [(float(scores[i]), self.chunks[i]) for i in top]
+
+    @staticmethod
+    def path_for(url: str) -> str:
+        """
+        Build the index file path (without extension) for a website URL.
+        """
+        key = hashlib.sha256(url.encode("utf-8")).hexdigest()[:16]
+        return os.path.join(INDEX_DIR, f"{urlparse(url).netloc}-{key}")
+
+    def save(self, url: str):
+        """
+        Persist the index of a website.
+        """
+        path = self.path_for(url)
+        os.makedirs(INDEX_DIR, exist_ok=True)
+        np.save(f"{path}.npy", self.vectors)
+        with open(f"{path}.json", "w", encoding="utf-8") as f:
+            json.dump({"embedder": self.embedder.name, "chunks": self.chunks}, f)
+        log.info(f"Saved vector index of {len(self.chunks)} chunks for {url}")
+
+    @classmethod
+    def load(cls, url: str, embedder=None):
+        """
+        Load the saved index of a website.
+
+        Returns:
+            VectorIndex: The index, or None if it is missing or was built with
+                another embedder.
+        """
+        index = cls(embedder)
+        path = cls.path_for(url)
+        try:
+            with open(f"{path}.json", "r", encoding="utf-8") as f:
+                meta = json.load(f)
+            vectors = np.load(f"{path}.npy")
+        except (OSError, ValueError):
+            return None
+
+        if meta.get("embedder") != index.embedder.name:
+            return None
+        if len(vectors) != len(meta["chunks"]):
+            return None
+
+        index.chunks = meta["chunks"]
+        index._vectors = vectors
+        index._blocks = [vectors]
+        return index
+
+
+def intent_query(intent: str, templates: tuple = None) -> str:
+    """
+    Build the retrieval query of a required intent from its name, its path keywords
+    and, if there is one, its template's description and examples.
+    """
+    parts = [intent.replace("_", " "), *sorted(INTENT_KEYWORDS.get(intent, ()))]
+    for template in templates[0] if templates else []:
+        if template.get("intent") == intent:
+            parts.append(template.get("description", ""))
+            parts.extend(
+                example.get("text", "") for example in template.get("examples", [])
+            )
+    return " ".join(part for part in parts if part)
+
+
+def retrieve_intent_context(
+    index: VectorIndex, templates: tuple = None, k: int = RETRIEVAL_TOP_K
+) -> dict:
+    """
+    Retrieve the page chunks most relevant to each required intent.
+
+    Args:
+        index (VectorIndex): The website's index.
+        templates (tuple): The (intents, actions) templates, used to enrich the queries.
+        k (int): The number of chunks per intent.
+
+    Returns:
+        dict: The chunk texts per required intent, best first. A chunk retrieved
+            for several intents is only listed under the one it matches best, and
+            chunks that share nothing with an intent's query are left out.
+    """
+    matches = [
+        (score, intent, chunk["text"])
+        for intent in required_intents
+        for score, chunk in index.search(intent_query(intent, templates), k)
+        if score > 0
+    ]
+
+    context, seen = {intent: [] for intent in required_intents}, set()
+    for _, intent, text in sorted(matches, key=lambda match: -match[0]):
+        if text not in seen:
+            seen.add(text)
+            context[intent].append(text)
+    return context
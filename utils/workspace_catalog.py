@@ -0,0 +1,231 @@
+import os
+import json
+import time
+import tempfile
+import threading
+from utils.logger import get_logger
+
+log = get_logger(__name__)
+
+# Workspaces requested per page when listing the account's workspaces
+PAGE_LIMIT = 100
+
+
+def format_workspace(workspace: dict) -> dict:
+    """
+    Convert a workspace of the Watson API into the catalog's entry format.
+    """
+    return {
+        "id": workspace.get("workspace_id"),
+        "name": workspace.get("name"),
+        "description": workspace.get("description", "No description provided"),
+        "created": workspace.get("created", ""),
+        "updated": workspace.get("updated", ""),
+    }
+
+
+class WorkspaceCatalog:
+    """
+    Local index of the account's Watson workspaces, by ID and by name.
+
+    The catalog is loaded with a paginated listing and reused for `ttl` seconds,
+    so lookups are dictionary operations instead of API calls. Workspaces this
+    process creates, renames or deletes are applied to the index directly, and
+    invalidate() forces the next lookup to reload it. If a path is given, the
+    index is saved there and a fresh enough saved index is used at startup. An
+    index is only saved once it holds a listing, and with the time of that
+    listing, so local changes never make a partial or stale index look fresh.
+
+    Example:
+        catalog = WorkspaceCatalog(lambda cursor: api.list_workspaces(cursor=cursor))
+        catalog.get(workspace_id)
+    """
+
+    def __init__(self, fetch_page, ttl: float = 30, path: str = None):
+        """
+        Args:
+            fetch_page (callable): Called with a page cursor (None for the first
+                page), returns the list_workspaces API response.
+            ttl (float): Seconds the loaded index is reused.
+            path (str): The file the index is persisted to, or None.
+        """
+        self.fetch_page = fetch_page
+        self.ttl = ttl
+        self.path = path
+        self._by_id = {}
+        self._by_name = {}
+        self._expires = 0.0
+        # Wall-clock time of the listing the index holds, None until there is one
+        self._listed_at = None
+        # Workspaces put (dict) or removed (None) while a listing is in progress
+        self._journal = None
+        self._lock = threading.Lock()
+        self._refresh_lock = threading.Lock()
+        if path:
+            self._load()
+
+    def _index(self, workspaces: list, expires: float, listed_at: float):
+        # Called with the lock held
+        self._listed_at = listed_at
+        self._by_id = {workspace["id"]: workspace for workspace in workspaces}
+        self._by_name = {}
+        for workspace in workspaces:
+            self._by_name.setdefault(workspace["name"], []).append(workspace)
+        self._expires = expires
+
+    def _load(self):
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                saved = json.load(f)
+            age = time.time() - saved["saved_at"]
+            workspaces = saved["workspaces"]
+        except (OSError, ValueError, KeyError, TypeError):
+            return
+        if 0 <= age < self.ttl:
+            with self._lock:
+                self._index(
+                    workspaces, time.monotonic() + self.ttl - age, saved["saved_at"]
+                )
+            log.info(f"Loaded {len(workspaces)} workspaces from {self.path}")
+
+    def _save(self):
+        if not self.path:
+            return
+        with self._lock:
+            if self._listed_at is None:
+                # Only workspaces put before any listing, not the whole account
+                return
+            workspaces = list(self._by_id.values())
+            data = {"saved_at": self._listed_at, "workspaces": workspaces}
+        directory = os.path.dirname(self.path) or "."
+        try:
+            os.makedirs(directory, exist_ok=True)
+            fd, temp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(data, f)
+            os.replace(temp_path, self.path)
+        except OSError as e:
+            log.error(f"Failed to save the workspace catalog to {self.path}: {e}")
+
+    def refresh(self):
+        """
+        Reload every page of the account's workspaces into the index.
+
+        Workspaces put or removed while the pages are listed are applied on top
+        of the listing, which may have been read before they changed.
+
+        Raises:
+            Exception: The API error if a page cannot be fetched; the index is left unchanged.
+        """
+        with self._refresh_lock:
+            self._reload()
+
+    def _reload(self):
+        # Called with the refresh lock held
+        with self._lock:
+            self._journal = {}
+        try:
+            listed_at = time.time()
+            workspaces, cursor, pages = {}, None, 0
+            while True:
+                response = self.fetch_page(cursor)
+                for workspace in response.get("workspaces", []):
+                    workspace = format_workspace(workspace)
+                    workspaces[workspace["id"]] = workspace
+                pages += 1
+                cursor = (response.get("pagination") or {}).get("next_cursor")
+                if not cursor:
+                    break
+
+            with self._lock:
+                for workspace_id, workspace in self._journal.items():
+                    if workspace is None:
+                        workspaces.pop(workspace_id, None)
+                    else:
+                        workspaces[workspace_id] = {
+                            **workspaces.get(workspace_id, {}),
+                            **workspace,
+                        }
+                self._index(
+                    list(workspaces.values()), time.monotonic() + self.ttl, listed_at
+                )
+        finally:
+            with self._lock:
+                self._journal = None
+        log.info(f"Listed {len(workspaces)} workspaces in {pages} pages.")
+        self._save()
+
+    def _ensure_fresh(self):
+        if time.monotonic() < self._expires:
+            return
+        # One thread reloads; the others wait for it and use its result
+        with self._refresh_lock:
+            if time.monotonic() >= self._expires:
+                self._reload()
+
+    def all(self) -> list:
+        """
+        Return every workspace of the account.
+        """
+        self._ensure_fresh()
+        with self._lock:
+            return list(self._by_id.values())
+
+    def get(self, workspace_id: str):
+        """
+        Look up a workspace by ID, or None if there is none.
+        """
+        self._ensure_fresh()
+        with self._lock:
+            return self._by_id.get(workspace_id)
+
+    def find(self, name: str) -> list:
+        """
+        Look up the workspaces with a name; names are not unique in Watson.
+        """
+        self._ensure_fresh()
+        with self._lock:
+            return list(self._by_name.get(name, []))
+
+    def put(self, workspace: dict):
+        """
+        Add or update a workspace in the index, after it was created or renamed.
+        """
+        with self._lock:
+            if self._journal is not None:
+                self._journal[workspace["id"]] = {
+                    **(self._journal.get(workspace["id"]) or {}),
+                    **workspace,
+                }
+            previous = self._by_id.get(workspace["id"])
+            if previous is not None:
+                workspace = {**previous, **workspace}
+                self._by_name[previous["name"]] = [
+                    ws for ws in self._by_name.get(previous["name"], [])
+                    if ws["id"] != workspace["id"]
+                ]
+            self._by_id[workspace["id"]] = workspace
+            self._by_name.setdefault(workspace["name"], []).append(workspace)
+        self._save()
+
+    def remove(self, workspace_id: str):
+        """
+        Drop a workspace from the index, after it was deleted.
+        """
+        with self._lock:
+            if self._journal is not None:
+                self._journal[workspace_id] = None
+            workspace = self._by_id.pop(workspace_id, None)
+            if workspace is not None:
+                self._by_name[workspace["name"]] = [
+                    ws for ws in self._by_name.get(workspace["name"], [])
+                    if ws["id"] != workspace_id
+                ]
+        self._save()
+
+    def invalidate(self):
+        """
+        Make the next lookup reload the index from Watson.
+        """
+        with self._lock:
+            self._expires = 0.0
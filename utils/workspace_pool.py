@@ -0,0 +1,232 @@
+import os
+import time
+import uuid
+import threading
+from collections import deque
+from datetime import datetime, timezone
+from concurrent.futures import ThreadPoolExecutor
+from utils.ibm_waston import (
+    create_workspace,
+    delete_workspace,
+    list_workspaces,
+    rename_workspace,
+)
+from utils.logger import get_logger
+
+log = get_logger(__name__)
+
+# Maximum number of workspaces of the account, e.g. 5 on the Lite plan
+WORKSPACE_QUOTA = int(os.getenv("WORKSPACE_QUOTA", "5"))
+
+# Seconds after its assignment or last update during which a workspace is never recycled
+WORKSPACE_RECYCLE_GRACE = float(os.getenv("WORKSPACE_RECYCLE_GRACE", "3600"))
+
+# Whether pre-creating a spare workspace may recycle one at the quota; builds always may
+WORKSPACE_POOL_RECYCLE = os.getenv("WORKSPACE_POOL_RECYCLE", "0") == "1"
+
+# Name prefix of the pre-created workspaces
+POOL_PREFIX = "ihelp-pool-"
+
+# Description prefix of the workspaces built by this app; only these are recycled
+MANAGED_DESCRIPTION = "I'm an IBM Watson Assistant for "
+
+QUOTA_ERROR = "Maximum workspaces limit exceeded"
+
+
+class WorkspacePool:
+    """
+    Keeps empty Watson workspaces ready so that builds do not wait for one to be created.
+
+    acquire() hands out a pre-created workspace, renamed after the website, and
+    refills the pool in the background. When a build needs a workspace and the
+    account is at its quota, the least recently updated workspace built by this
+    app is deleted to make room; pre-created, recently assigned or updated, and
+    foreign workspaces are never deleted. Refilling stops at the quota instead of
+    recycling, unless WORKSPACE_POOL_RECYCLE is set.
+    Pre-created workspaces are recognized by their name, so a restarted process
+    picks up the pool of the previous one.
+
+    Example:
+        workspace_id = get_workspace_pool().acquire(title, description)
+    """
+
+    def __init__(self, size: int = 1, quota: int = WORKSPACE_QUOTA):
+        """
+        Args:
+            size (int): The number of empty workspaces kept ready.
+            quota (int): The maximum number of workspaces of the account.
+        """
+        self.size = size
+        self.quota = quota
+        self._warm = deque()
+        self._assigned = {}  # workspace ID -> time it was handed to a build
+        self._discovered = False
+        self._refilling = False
+        self._lock = threading.Lock()
+        self._background = ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="workspace-pool"
+        )
+
+    def _discover(self, workspaces: list):
+        # Called with the lock held
+        if self._discovered:
+            return
+        self._discovered = True
+        known = set(self._warm)
+        self._warm.extend(
+            workspace["id"]
+            for workspace in workspaces
+            if (workspace["name"] or "").startswith(POOL_PREFIX)
+            and workspace["id"] not in known
+        )
+
+    def acquire(self, site_title: str, site_description: str) -> str:
+        """
+        Assign a workspace to a build, preferably a pre-created one.
+
+        Args:
+            site_title (str): The title of the website, the workspace's new name.
+            site_description (str): The workspace's new description.
+
+        Returns:
+            str: The workspace ID.
+        """
+        # Watson limits names to 64 and descriptions to 128 characters
+        name, description = site_title[:64], site_description[:128]
+
+        with self._lock:
+            if not self._discovered and self.size:
+                self._discover(list_workspaces())
+            workspace_id = self._warm.popleft() if self._warm else None
+
+        if workspace_id is not None:
+            try:
+                rename_workspace(workspace_id, name, description)
+                log.info(f"Assigned pre-created workspace {workspace_id} to '{name}'.")
+            except Exception as e:
+                log.error(f"Failed to assign pre-created workspace {workspace_id}: {e}")
+                workspace_id = None
+
+        if workspace_id is None:
+            workspace_id = self._create(name, description)
+
+        with self._lock:
+            self._assigned[workspace_id] = time.monotonic()
+        self.refill()
+        return workspace_id
+
+    def _create(self, name: str, description: str) -> str:
+        try:
+            return create_workspace(name, description)
+        except Exception as e:
+            if QUOTA_ERROR not in str(e) or not self.recycle():
+                raise
+        return create_workspace(name, description)
+
+    def recycle(self) -> dict:
+        """
+        Delete the least recently updated workspace built by this app to free quota.
+
+        Returns:
+            dict: The deleted workspace, or None if no workspace could be recycled.
+        """
+        now = time.monotonic()
+        with self._lock:
+            protected = set(self._warm) | {
+                workspace_id
+                for workspace_id, assigned in self._assigned.items()
+                if now - assigned < WORKSPACE_RECYCLE_GRACE
+            }
+
+        # The update time also protects the builds of a previous process
+        candidates = [
+            workspace
+            for workspace in list_workspaces()
+            if (workspace["description"] or "").startswith(MANAGED_DESCRIPTION)
+            and workspace["id"] not in protected
+            and _age(workspace["updated"] or workspace["created"])
+            >= WORKSPACE_RECYCLE_GRACE
+        ]
+        if not candidates:
+            log.warning("No workspace can be recycled to stay under the quota.")
+            return None
+
+        oldest = min(candidates, key=lambda ws: ws["updated"] or ws["created"] or "")
+        if not delete_workspace(oldest["id"]):
+            return None
+        log.info(f"Recycled workspace '{oldest['name']}' ({oldest['id']}).")
+        return oldest
+
+    def refill(self):
+        """
+        Top up the pre-created workspaces in the background.
+        """
+        with self._lock:
+            if self._refilling or len(self._warm) >= self.size:
+                return
+            self._refilling = True
+        self._background.submit(self._refill)
+
+    def _refill(self):
+        try:
+            workspaces = list_workspaces()
+            with self._lock:
+                self._discover(workspaces)
+            total = len(workspaces)
+
+            while True:
+                with self._lock:
+                    if len(self._warm) >= self.size:
+                        break
+                if total >= self.quota:
+                    # A spare workspace is not worth deleting a built one for
+                    if not WORKSPACE_POOL_RECYCLE or not self.recycle():
+                        break
+                    total -= 1
+
+                workspace_id = create_workspace(
+                    f"{POOL_PREFIX}{uuid.uuid4().hex[:8]}",
+                    "Pre-created workspace, not yet assigned to a website",
+                )
+                total += 1
+                with self._lock:
+                    self._warm.append(workspace_id)
+                log.info(f"Pre-created workspace {workspace_id}.")
+        except Exception as e:
+            log.error(f"Failed to refill the workspace pool: {e}")
+        finally:
+            with self._lock:
+                self._refilling = False
+
+
+def _age(timestamp: str) -> float:
+    """
+    Seconds since a Watson timestamp such as "2024-11-19T10:00:00.123Z", or
+    infinity if it is missing or cannot be parsed.
+    """
+    try:
+        updated = datetime.fromisoformat(timestamp)
+        return (datetime.now(timezone.utc) - updated).total_seconds()
+    except (TypeError, ValueError):
+        return float("inf")
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_workspace_pool() -> WorkspacePool:
+    """
+    Return the process-wide workspace pool, starting to fill it on first use.
+
+    Its size, the number of empty workspaces kept ready, is read from the
+    WORKSPACE_POOL_SIZE environment variable when the pool is created; 0
+    disables pre-creation.
+    """
+    global _pool
+
+    with _pool_lock:
+        if _pool is None:
+            _pool = WorkspacePool(size=int(os.getenv("WORKSPACE_POOL_SIZE", "1")))
+            _pool.refill()
+        return _pool